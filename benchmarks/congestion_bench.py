@@ -0,0 +1,76 @@
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+from server.module_agent.module_agent import Box
+from server.routing.reservation_router import HOP_TIME, ReservationRouter
+from server.routing.router import Router
+from simulator.scheduler.virtual_time_loop import VirtualTimeLoop
+
+# plant throughput (delivered boxes per hour) with static shortest paths vs.
+# congestion aware routes (reservations), on the world 1 layout
+# (abstract model of the handoffs on simulated time: each module hands over one box
+# at a time, taking HOP_TIME, boxes wait in front of busy modules
+# and ask the router for their next hop whenever they are handed over)
+# python -m benchmarks.congestion_bench
+
+DURATION: float = 8 * 3600  # s, simulated
+BOX_COUNTS = [1, 4, 8, 16, 32]
+
+
+async def move_box(
+    router: Router,
+    box: Box,
+    location: str,
+    modules: Dict[str, asyncio.Lock],
+    deliveries: List[float],
+) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        assert box.current_target is not None
+        async with modules[location]:  # (waiting in front of the module)
+            _, next_module = router.route(
+                box.name, location, box.current_target, loop.time()
+            )
+            await asyncio.sleep(HOP_TIME)
+        location = next_module
+        if location == box.current_target:
+            deliveries.append(loop.time())
+        box.update_location(location)
+
+
+def measure_throughput(router: Router, box_count: int) -> float:
+    random.seed(box_count)
+    loop = VirtualTimeLoop()
+    modules = {name: asyncio.Lock() for name in router.names}
+    deliveries: List[float] = []
+    for k in range(box_count):
+        location = random.choice(router.names)
+        box = Box("box_" + str(k), router.names)
+        box.current_target = location
+        box.update_location(location)  # (first target)
+        loop.create_task(move_box(router, box, location, modules, deliveries))
+    loop.advance(DURATION)
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_idle()
+    loop.close()
+    return len(deliveries) / (DURATION / 3600)
+
+
+if __name__ == "__main__":
+    for box_count in BOX_COUNTS:
+        start = time.perf_counter()
+        static = measure_throughput(Router(), box_count)
+        reservations = measure_throughput(ReservationRouter(), box_count)
+        print(
+            ("boxes: " + str(box_count)).ljust(10)
+            + "boxes / h, static: "
+            + str(round(static, 1))
+            + ", reservations: "
+            + str(round(reservations, 1))
+            + " ("
+            + str(round(time.perf_counter() - start, 1))
+            + " s)"
+        )
@@ -0,0 +1,85 @@
+import timeit
+from typing import Any, Callable, Tuple
+
+import numpy as np
+
+from simulator.space.collidable_element import CollidableElement, Rectangle
+from simulator.space.collision_checker import check_collision_point_shape
+from simulator.space.element import (
+    ARRAY,
+    Element,
+    Vector,
+    get_rot_0_359,
+    get_rotated_position,
+    rotate_xy,
+    xy2arr,
+)
+from simulator.space.moving_element import MovingElement
+
+# micro-benchmark of per-call costs of element transformations
+# python -m benchmarks.element_transform_bench
+
+NUMBER = 100_000
+
+
+def legacy_get_rotated_position(position: ARRAY, angle_deg: float) -> ARRAY:
+    # numpy scalar version (before the scalar fast path)
+    x = position[0]
+    y = position[1]
+    angle_rad = np.deg2rad(angle_deg)
+    x_new = x * np.cos(angle_rad) + y * np.sin(angle_rad)
+    y_new = -1 * x * np.sin(angle_rad) + y * np.cos(angle_rad)
+    return xy2arr(Vector(x_new, y_new))
+
+
+def legacy_get_global_coordinates(element: Element[Any]) -> Tuple[ARRAY, float]:
+    # uncached numpy version (before the scalar fast path)
+    if element._parent is None:
+        return element.position, element.rotation
+    parent_gl_pos, parent_gl_rot = legacy_get_global_coordinates(element._parent)
+    gl_pos = parent_gl_pos + legacy_get_rotated_position(
+        element.position, parent_gl_rot
+    )
+    return gl_pos, get_rot_0_359(parent_gl_rot + element.rotation)
+
+
+def get_global_xy_rot_uncached(element: Element[Any]) -> Tuple[float, float, float]:
+    element.invalidate_global_coord_cache()
+    return element.get_global_xy_rot()
+
+
+def measure(name: str, function: Callable[[], Any]) -> None:
+    seconds = timeit.timeit(function, number=NUMBER)
+    print(name.ljust(44) + str(round(seconds / NUMBER * 1e9)).rjust(8) + " ns/call")
+
+
+if __name__ == "__main__":
+    position = xy2arr(Vector(1, 2))
+    measure(
+        "rotate position (before, numpy)",
+        lambda: legacy_get_rotated_position(position, 30),
+    )
+    measure(
+        "rotate position (get_rotated_position)",
+        lambda: get_rotated_position(position, 30),
+    )
+    measure("rotate position (rotate_xy)", lambda: rotate_xy(1.0, 2.0, 30))
+
+    origin = MovingElement(name="origin")
+    e1 = MovingElement(parent=origin, position=Vector(1, 1), rotation=90)
+    e2 = MovingElement(parent=e1, position=Vector(0, 1), rotation=45)
+    e3 = MovingElement(parent=e2, position=Vector(1, 0), rotation=10)
+    measure(
+        "global coords, depth 3 (before, numpy)",
+        lambda: legacy_get_global_coordinates(e3),
+    )
+    measure("global coords, depth 3 (uncached)", lambda: get_global_xy_rot_uncached(e3))
+    measure("global coords, depth 3 (cached)", e3.get_global_xy_rot)
+
+    shape = CollidableElement(
+        parent=origin, position=Vector(5, 5), rotation=30, shape=Rectangle(4, 1)
+    )
+    point = CollidableElement(parent=origin, position=Vector(5.5, 5))
+    measure(
+        "point/shape collision check", lambda: check_collision_point_shape(point, shape)
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import random
+import time
+from typing import List
+
+from instances.instance_1.instance_1 import World1
+from server.module_agent.module_agent import Box, ModuleAgent
+from server.routing.router import Router
+from simulator.module_level.module_level import ControlMode, create_controls
+from simulator.scheduler.scheduler import Scheduler
+from simulator.scheduler.virtual_time_loop import VirtualTimeLoop
+
+# simulated time per hop of one box on the sample layout (C control code, physics):
+# serial handoffs vs. pipelined handoffs (next module reserved and forward command
+# queued while the box is received)
+# python -m benchmarks.handoff_bench
+
+DURATION: float = 600  # s, simulated
+
+
+def measure_hops(pipelined: bool) -> List[float]:
+    # simulated times of all box arrivals
+    random.seed(0)  # (box targets)
+    world = World1()
+    tts = sum(world.modules, [])
+    controls = create_controls(tts, ControlMode.IN_PROCESS)
+    loop = VirtualTimeLoop()
+    router = Router()
+    agents: dict = {}
+    for tt in tts:
+        connection = controls.get_connections()[tt.name]
+        ModuleAgent(tt.name, connection, router, agents, pipelined)
+    arrivals: List[float] = []
+
+    class RecordingBox(Box):
+        def update_location(self, location: str):
+            arrivals.append(loop.time())
+            super().update_location(location)
+
+    box = RecordingBox("box_1", router.names)
+    box.current_target = "t_2_3"
+    agents[tts[0].name].handled_box = box
+    tts[0].spawn_box()
+    loop.create_task(agents[tts[0].name].forward_box_async())
+    scheduler = Scheduler(world, [loop, controls], sub_steps=2)
+    try:
+        scheduler.run(DURATION)
+    finally:
+        controls.terminate()
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.run_until_idle()
+        loop.close()
+    return arrivals
+
+
+if __name__ == "__main__":
+    for pipelined in (False, True):
+        start = time.perf_counter()
+        arrivals = measure_hops(pipelined)
+        print(
+            ("pipelined" if pipelined else "serial").ljust(10)
+            + "hops: "
+            + str(len(arrivals))
+            + ", per hop: "
+            + str(round((arrivals[-1] - arrivals[0]) / (len(arrivals) - 1), 3))
+            + " s (simulated, "
+            + str(round(time.perf_counter() - start, 1))
+            + " s wall)"
+        )
@@ -0,0 +1,82 @@
+import asyncio
+import contextlib
+import io
+import random
+import time
+from typing import Dict, List
+
+from module_control.emulation.module_stub import ModuleStub
+from server.module_agent.inbound_queue import DispatchPolicy
+from server.module_agent.module_agent import Box, ModuleAgent
+from server.routing.router import Router, get_map
+from simulator.scheduler.virtual_time_loop import VirtualTimeLoop
+
+# load test of the agent layer: hundreds of concurrent boxes on a large grid,
+# modules emulated by stubs (fixed handoff times, no C code, no physics),
+# per dispatch policy of the inbound queues
+# python -m benchmarks.load_bench
+
+GRID = (48, 48)
+BOXES = 300
+DURATION: float = 1800  # s, simulated
+DUE_TIME = (60, 600)  # s, after a box got its target (earliest due dispatch)
+
+
+def run(policy: DispatchPolicy) -> str:
+    random.seed(0)
+    loop = VirtualTimeLoop()
+    router = Router(get_map(*GRID, is_excluded=lambda x, y: False))
+    agents: Dict[str, ModuleAgent] = {}
+    for name in router.names:
+        ModuleAgent(name, ModuleStub(loop), router, agents, policy=policy)
+    deliveries: List[float] = []  # (lateness, s)
+
+    class DueBox(Box):
+        def update_location(self, location: str):
+            if location == self.current_target:
+                deliveries.append(max(0.0, loop.time() - self.due))
+                self.due = loop.time() + random.uniform(*DUE_TIME)
+            super().update_location(location)
+
+    for k, name in enumerate(random.sample(router.names, BOXES)):
+        box = DueBox("box_" + str(k), router.names, due=random.uniform(*DUE_TIME))
+        box.current_target = name
+        box.update_location(name)  # (first target)
+        agents[name].handled_box = box
+        loop.create_task(agents[name].forward_box_async())
+    deliveries.clear()  # (first targets)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # (agent logs)
+        loop.advance(DURATION)
+        utilization = [
+            agent.get_occupied_time(loop.time()) / DURATION for agent in agents.values()
+        ]
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.run_until_idle()
+    loop.close()
+    return (
+        policy.value.ljust(26)
+        + "delivered / h: "
+        + str(round(len(deliveries) / (DURATION / 3600)))
+        + ", mean lateness: "
+        + str(round(sum(deliveries) / max(len(deliveries), 1), 1))
+        + " s, utilization: mean "
+        + str(round(100 * sum(utilization) / len(utilization), 1))
+        + " %, max "
+        + str(round(100 * max(utilization), 1))
+        + " %, max queue: "
+        + str(max(agent.inbound.max_length for agent in agents.values()))
+        + ", deadlocks: "
+        + str(sum(agent.deadlocks for agent in agents.values()))
+        + " ("
+        + str(round(time.perf_counter() - start, 1))
+        + " s wall)"
+    )
+
+
+if __name__ == "__main__":
+    print(str(GRID[0]) + "x" + str(GRID[1]) + " modules, " + str(BOXES) + " boxes")
+    for policy in DispatchPolicy:
+        print(run(policy))
@@ -0,0 +1,47 @@
+import statistics
+import time
+from multiprocessing import Process
+from typing import List
+
+from module_control.emulation.clock import ClockMode, LockstepClock, create_clock
+
+# round-trip latency of one controller tick (release + ack) per clock mode,
+# with an empty module loop
+# python -m benchmarks.lockstep_latency_bench
+
+TICKS = 20_000
+
+
+def echo(clock: LockstepClock) -> None:
+    while True:
+        clock.wait_release()
+        clock.ack()
+
+
+def measure(mode: ClockMode) -> List[float]:
+    clock = create_clock(mode)
+    proc = Process(target=echo, args=(clock,), daemon=True)
+    proc.start()
+    latencies = []
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        clock.release(tick)
+        clock.wait_ack()
+        latencies.append(time.perf_counter() - start)
+    proc.terminate()
+    return latencies[100:]  # (warm-up)
+
+
+if __name__ == "__main__":
+    for mode in ClockMode:
+        latencies = sorted(measure(mode))
+        print(
+            mode.value.ljust(16)
+            + "mean: "
+            + str(round(statistics.mean(latencies) * 1e6, 1))
+            + " us, p50: "
+            + str(round(latencies[len(latencies) // 2] * 1e6, 1))
+            + " us, p99: "
+            + str(round(latencies[int(len(latencies) * 0.99)] * 1e6, 1))
+            + " us"
+        )
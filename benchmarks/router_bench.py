@@ -0,0 +1,72 @@
+import random
+import time
+
+import networkx as nx  # type: ignore
+
+from server.routing.router import Router, get_map
+
+# next hop lookups: precomputed table vs. shortest path search per lookup (networkx),
+# on the sample layout and larger grids (10 % of the modules removed),
+# plus runtime changes (disable + enable a module, mean over some modules: incremental,
+# a full rebuild if most routes are affected) vs. the initial build
+# python -m benchmarks.router_bench
+
+LOOKUPS = 2_000
+CHANGES = 5
+GRIDS = [(6, 3), (32, 32), (64, 64)]
+
+
+def networkx_next_hop(router: Router, frm: str, to: str) -> str:
+    return nx.shortest_path(router.graph, frm, to)[1]
+
+
+def measure_lookups(router: Router, pairs, lookup) -> float:
+    start = time.perf_counter()
+    for frm, to in pairs:
+        lookup(frm, to)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for grid_x, grid_y in GRIDS:
+        holes = {
+            (random.randint(1, grid_x), random.randint(1, grid_y))
+            for _ in range(grid_x * grid_y // 10)
+        }
+        mapp = get_map(grid_x, grid_y, lambda x, y: (x, y) in holes)
+        start = time.perf_counter()
+        router = Router(mapp)
+        build_time = time.perf_counter() - start
+
+        # (connected pairs only)
+        largest = max(nx.connected_components(router.graph), key=len)
+        names = [n for n in router.names if n in largest]
+        pairs = [tuple(random.sample(names, 2)) for _ in range(LOOKUPS)]
+        table = measure_lookups(router, pairs, router.get_next_direction)
+        search = measure_lookups(
+            router, pairs, lambda frm, to: networkx_next_hop(router, frm, to)
+        )
+        changed = random.sample(names, CHANGES)
+        start = time.perf_counter()
+        for module in changed:
+            router.disable_module(module)
+            router.enable_module(module)
+        change_time = (time.perf_counter() - start) / CHANGES
+
+        print(
+            (str(grid_x) + "x" + str(grid_y)).ljust(8)
+            + "modules: "
+            + str(len(mapp))
+            + ", build: "
+            + str(round(build_time * 1000, 1))
+            + " ms, table: "
+            + str(round(router.next_hops.nbytes / 1e6, 2))
+            + " MB, lookup: "
+            + str(round(table * 1e6, 2))
+            + " us (networkx: "
+            + str(round(search * 1e6, 1))
+            + " us), disable + enable module: "
+            + str(round(change_time * 1000, 1))
+            + " ms"
+        )
@@ -0,0 +1,54 @@
+import statistics
+import time
+from multiprocessing import Pipe, Process
+from typing import Any, Callable, List, Tuple
+
+from module_control.emulation.clock import SharedMemoryClock
+from module_control.emulation.ring_buffer import RingPipe
+
+# cost of one serial command + reply per controller tick (as in the module agent
+# handshakes), with a shared memory clock and an otherwise empty module loop
+# python -m benchmarks.serial_bench
+
+TICKS = 20_000
+
+
+def echo_pipe(clock: SharedMemoryClock, connection: Any) -> None:
+    while True:
+        clock.wait_release()
+        if connection.poll(timeout=0):
+            connection.send(connection.recv())
+        clock.ack()
+
+
+def echo_ring(clock: SharedMemoryClock, connection: Any) -> None:
+    while True:
+        clock.wait_release()
+        b = connection.read_byte()
+        if b != -1:
+            connection.send(b)
+        clock.ack()
+
+
+def measure(pipe: Callable[[], Tuple[Any, Any]], echo: Callable[..., None]) -> float:
+    clock = SharedMemoryClock()
+    parent_connection, child_connection = pipe()
+    proc = Process(target=echo, args=(clock, child_connection), daemon=True)
+    proc.start()
+    latencies: List[float] = []
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        parent_connection.send(tick % 8)
+        clock.release(1)
+        clock.wait_ack()
+        assert parent_connection.poll() and parent_connection.recv() == tick % 8
+        latencies.append(time.perf_counter() - start)
+    proc.terminate()
+    return statistics.mean(latencies[100:])  # (warm-up)
+
+
+if __name__ == "__main__":
+    pipe = measure(Pipe, echo_pipe)
+    ring = measure(RingPipe, echo_ring)
+    print("pipe: " + str(round(pipe * 1e6, 1)) + " us/tick")
+    print("ring buffer: " + str(round(ring * 1e6, 1)) + " us/tick")
@@ -0,0 +1,43 @@
+import time
+
+from instances.instance_1.instance_1 import World1
+from module_control.emulation.clock import ClockMode
+from simulator.module_level.module_level import (
+    ControllerGroup,
+    ControllerPool,
+    Module2ControlParent,
+    WorkerPool,
+)
+
+# time until the module controls of the sample layout completed their first tick:
+# one fresh process per module vs. a pre-started worker pool (assign + recycle)
+# python -m benchmarks.startup_bench
+
+RUNS = 3
+
+
+def report(name: str, seconds: float) -> None:
+    print(name.ljust(24) + str(round(seconds * 1000, 1)) + " ms")
+
+
+if __name__ == "__main__":
+    for _ in range(RUNS):
+        tts = sum(World1().modules, [])
+        start = time.perf_counter()
+        group = ControllerGroup(
+            [Module2ControlParent(tt, ClockMode.SHARED_MEMORY) for tt in tts]
+        )
+        group.loop(0)
+        report("process per module", time.perf_counter() - start)
+        group.terminate()
+
+    worker_pool = WorkerPool()
+    print("worker pool startup - " + worker_pool.startup.report())
+    for _ in range(RUNS):
+        tts = sum(World1().modules, [])
+        start = time.perf_counter()
+        pool = ControllerPool(tts, worker_pool=worker_pool)
+        pool.loop(0)
+        report("warm worker pool", time.perf_counter() - start)
+        pool.terminate()
+    worker_pool.shutdown()
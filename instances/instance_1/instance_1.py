@@ -1,9 +1,10 @@
 # sample test layout
 # control code works in arbitrary layouts, so more versions can be created to provide different test scenarios
 
-from typing import List
+from typing import List, Optional
 
 from simulator.modules.turntable import WIDTH, TurnTable
+from simulator.space.broad_phase import CELL_SIZE
 from simulator.space.element import Vector
 from simulator.space.world import World
 
@@ -18,8 +19,10 @@ def excluded(x, y):
 
 
 class World1(World):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(
+        self, cell_size: Optional[float] = CELL_SIZE, transform_store: bool = False
+    ) -> None:
+        super().__init__(cell_size=cell_size, transform_store=transform_store)
         self.modules: List[List[TurnTable]] = [
             [
                 TurnTable(
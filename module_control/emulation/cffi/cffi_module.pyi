@@ -1,4 +1,6 @@
 # type-stub for functions offered by the C control shared object
 # appearently, there is no simple way to generate this from a .h-file?
+def max_instances() -> int: ...
+def select_instance(instance: int) -> None: ...
 def setup() -> None: ...
 def loop() -> None: ...
@@ -1,96 +1,256 @@
-# runs in a sub-process of the emulation environment
+# runs in a sub-process of the emulation environment (or in-process)
 # calls C control code
 # wires Python implementations for forward-declared C functions
 
 import os
+import time
 from multiprocessing.connection import Connection
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
 
+from module_control.emulation.clock import LockstepClock
+from module_control.emulation.process_image import Input, Output, ProcessImage
+from module_control.emulation.ring_buffer import RingConnection
 
-class AIV:  # array index values
-    SIZE = 5  # tbd...
-    LIGHT_BARRIER = 0
-    ENDLAGE_0 = 1
-    ENDLAGE_90 = 2
-    ROTATION = 3
-    TRANSLATION = 4
 
+class InstanceIO:
+    # sensors / actors / serial line of one module, as seen by the C control code
+    name: str
 
-def int_2_bool(value: int) -> bool:
-    return True if value > 0 else False
+    def light_barrier(self) -> bool:
+        raise NotImplementedError()
 
+    def endlage_0(self) -> bool:
+        raise NotImplementedError()
 
-def start(
-    clock_connection: Connection,
-    ack_connection: Connection,
-    shared_array,  #  shared_array for read / write
-    serial_connection: Connection,
-    name: str,
-):
-    print(name + " running with pid: " + str(os.getpid()))  # debug attach
+    def endlage_90(self) -> bool:
+        raise NotImplementedError()
+
+    def set_rotation(self, dir: int) -> None:
+        raise NotImplementedError()
+
+    def set_translation(self, dir: int) -> None:
+        raise NotImplementedError()
+
+    def serial_read(self) -> int:
+        # byte or -1 if nothing to read
+        raise NotImplementedError()
+
+    def serial_write(self, b: int) -> None:
+        raise NotImplementedError()
+
+
+class ModuleInstance(InstanceIO):
+    # one emulated module hosted by a module process:
+    # its part of the (shared) process image + serial line to the parent
+    def __init__(
+        self,
+        image: ProcessImage,
+        index: int,  # of the module in the process image
+        serial_connection: RingConnection,
+        name: str,
+    ) -> None:
+        self.image = image
+        self.index = index
+        self.serial_connection = serial_connection
+        self.name = name
+
+    def light_barrier(self) -> bool:
+        return self.image.read_input(self.index, Input.LIGHT_BARRIER)
+
+    def endlage_0(self) -> bool:
+        return self.image.read_input(self.index, Input.ENDLAGE_0)
+
+    def endlage_90(self) -> bool:
+        return self.image.read_input(self.index, Input.ENDLAGE_90)
 
-    from module_control.emulation.cffi.cffi_module import ffi
+    def set_rotation(self, dir: int) -> None:
+        self.image.write_output(self.index, Output.ROTATION, dir)
 
+    def set_translation(self, dir: int) -> None:
+        self.image.write_output(self.index, Output.TRANSLATION, dir)
+
+    def serial_read(self) -> int:
+        b = self.serial_connection.read_byte()  # (-1 if nothing to read)
+        # print(self.name + " - serial read: " + str(b))
+        return b
+
+    def serial_write(self, b: int) -> None:
+        # print(self.name + " - serial write: " + str(b))
+        self.serial_connection.send(b)
+
+
+class _Selection:
+    # instance currently running its C loop (target of all callbacks)
+    host: Optional["InstanceHost"] = None
+    io: Optional[InstanceIO] = None
+
+
+_free_instance_ids: Optional[List[int]] = None  # (C states of this process)
+
+
+def load_module() -> Any:
+    # compiled C control code (imported once per process, inherited by forked workers)
     if TYPE_CHECKING:
         import module_control.emulation.cffi.cffi_module as cffi_module
     else:
         from module_control.emulation.cffi.cffi_module import lib as cffi_module
+    return cffi_module
+
 
-    # setup everything
-    millis = 0
+def _register_callbacks() -> None:
+    # extern "Python" functions can be attached only once per process
+    from module_control.emulation.cffi.cffi_module import ffi  # type: ignore
+
+    def io() -> InstanceIO:
+        assert _Selection.io is not None
+        return _Selection.io
 
     @ffi.def_extern()
     def _light_barrier() -> bool:
-        return shared_array[AIV.LIGHT_BARRIER]
+        return io().light_barrier()
 
     @ffi.def_extern()
     def _endlage_0() -> bool:
-        return shared_array[AIV.ENDLAGE_0]
+        return io().endlage_0()
 
     @ffi.def_extern()
     def _endlage_90() -> bool:
-        return shared_array[AIV.ENDLAGE_90]
+        return io().endlage_90()
 
     @ffi.def_extern()
     def _set_rotation(dir: int) -> None:
-        shared_array[AIV.ROTATION] = dir
+        io().set_rotation(dir)
 
     @ffi.def_extern()
     def _set_translation(dir: int) -> None:
-        shared_array[AIV.TRANSLATION] = dir
+        io().set_translation(dir)
 
     @ffi.def_extern()
     def _millis() -> int:
-        return millis
+        assert _Selection.host is not None
+        return _Selection.host.millis
 
     @ffi.def_extern()
     def _serial_read() -> int:
-        if serial_connection.poll(timeout=0):
-            b = serial_connection.recv()  # tbd: read only one byte at a time
-            # print(name + " - serial read: " + str(b))
-            return b
-        return -1
+        return io().serial_read()
 
     @ffi.def_extern()
     def _serial_write(b: int) -> None:
-        # print(name + " - serial write: " + str(b))
-        serial_connection.send(b)
+        io().serial_write(b)
 
     @ffi.def_extern()
     def _log(message: int) -> None:
-        # print(name + " - log: " + str(ffi.string(message)))
+        # print(io().name + " - log: " + str(ffi.string(message)))
         pass
 
     @ffi.def_extern()
     def _throw_exception() -> None:
         raise RuntimeError("module control error")
 
-    ### run module
 
-    cffi_module.setup()
+def _allocate_instance_ids(count: int) -> List[int]:
+    global _free_instance_ids
+    if _free_instance_ids is None:
+        _register_callbacks()
+        _free_instance_ids = list(range(load_module().max_instances()))
+        _free_instance_ids.reverse()
+    if count > len(_free_instance_ids):
+        raise ValueError("too many instances: " + str(count))
+    return [_free_instance_ids.pop() for _ in range(count)]
+
+
+class InstanceHost:
+    # runs the C control code of several modules in this process,
+    # one after the other per tick (each with its own C state)
+    def __init__(self, instances: Sequence[InstanceIO]) -> None:
+        self.instances = list(instances)
+        self.instance_ids = _allocate_instance_ids(len(self.instances))
+        self.cffi_module = load_module()
+        self.millis = 0
+        for instance_id, instance in zip(self.instance_ids, self.instances):
+            self._select(instance_id, instance)
+            self.cffi_module.setup()
+
+    def _select(self, instance_id: int, instance: InstanceIO) -> None:
+        _Selection.host = self
+        _Selection.io = instance
+        self.cffi_module.select_instance(instance_id)
+
+    def loop(self, passed_time_ms: int) -> None:
+        self.millis += passed_time_ms
+        for instance_id, instance in zip(self.instance_ids, self.instances):
+            self._select(instance_id, instance)
+            self.cffi_module.loop()
+
+    def close(self) -> None:
+        # C states can be reused by other hosts
+        assert _free_instance_ids is not None
+        _free_instance_ids.extend(reversed(self.instance_ids))
+        self.instance_ids = []
+        self.instances = []
+
+
+def start(
+    clock: LockstepClock,
+    image: ProcessImage,
+    index: int,
+    serial_connection: RingConnection,
+    name: str,
+):
+    start_worker(clock, [ModuleInstance(image, index, serial_connection, name)], name)
+
+
+def start_worker(
+    clock: LockstepClock,
+    instances: Sequence[InstanceIO],
+    name: str,
+):
+    # runs the C control code of all given modules
+    print(name + " running with pid: " + str(os.getpid()))  # debug attach
+
+    host = InstanceHost(instances)
+
+    ### run modules
+
+    while True:
+        passed_time_ms = clock.wait_release()  # blocks
+        if passed_time_ms is None:
+            break
+        host.loop(passed_time_ms)
+        clock.ack()
+    host.close()
+    clock.ack()
+
+
+def start_pool_worker(
+    clock: LockstepClock,
+    control_connection: Connection,
+    slots: Sequence[Tuple[ProcessImage, int, RingConnection]],  # (image, index, serial)
+    name: str,
+):
+    # pre-started worker: gets warm (C module loaded) before any module is assigned,
+    # then runs assigned modules until recycled, for any number of assignments
+    print(name + " running with pid: " + str(os.getpid()))  # debug attach
+
+    start = time.perf_counter()
+    InstanceHost([]).close()  # loads the C module, registers the callbacks
+    control_connection.send(time.perf_counter() - start)  # ready
 
     while True:
-        passed_time_ms: int = clock_connection.recv()  # blocks
-        millis += passed_time_ms
-        cffi_module.loop()
-        ack_connection.send(True)
+        assignment: List[Tuple[int, str]] = control_connection.recv()  # (slot, name)
+        host = InstanceHost(
+            [
+                ModuleInstance(*slots[slot], module_name)
+                for slot, module_name in assignment
+            ]
+        )
+        control_connection.send(True)  # all modules set up
+
+        while True:
+            passed_time_ms = clock.wait_release()  # blocks
+            if passed_time_ms is None:  # (recycled)
+                break
+            host.loop(passed_time_ms)
+            clock.ack()
+        host.close()
+        clock.ack()
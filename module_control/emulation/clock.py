@@ -0,0 +1,95 @@
+# lockstep clock between the simulation (parent) and a module control process (child):
+# the parent releases the child with the passed time, the child runs one loop
+# and acknowledges, then the parent continues
+# (stop: released without a loop, e.g. to end the assignment of a pool worker)
+
+from enum import Enum
+from multiprocessing import Pipe, RawValue, Semaphore
+from typing import Optional
+
+
+class ClockMode(Enum):
+    PIPE = "pipe"  # pickled messages via 2 pipes
+    SHARED_MEMORY = "shared_memory"  # shared int + 2 semaphores (no pickling)
+
+
+class LockstepClock:
+    # parent side:
+    def release(self, passed_time_ms: int) -> None:
+        # passes control to the module process
+        raise NotImplementedError()
+
+    def wait_ack(self) -> None:
+        # blocks until the module process finished its loop
+        raise NotImplementedError()
+
+    def stop(self) -> None:
+        # passes control without passed time (acknowledged as well)
+        raise NotImplementedError()
+
+    # child side:
+    def wait_release(self) -> Optional[int]:
+        # blocks until released, returns the passed time (None: stopped)
+        raise NotImplementedError()
+
+    def ack(self) -> None:
+        raise NotImplementedError()
+
+
+class PipeClock(LockstepClock):
+    def __init__(self) -> None:
+        self._clock_parent, self._clock_child = Pipe()
+        self._ack_parent, self._ack_child = Pipe()
+
+    def release(self, passed_time_ms: int) -> None:
+        self._clock_parent.send(passed_time_ms)
+
+    def wait_ack(self) -> None:
+        self._ack_parent.recv()
+
+    def stop(self) -> None:
+        self._clock_parent.send(None)
+
+    def wait_release(self) -> Optional[int]:
+        return self._clock_child.recv()
+
+    def ack(self) -> None:
+        self._ack_child.send(True)
+
+
+class SharedMemoryClock(LockstepClock):
+    # semaphore post/wait also orders the memory accesses to the shared value
+    def __init__(self) -> None:
+        self._passed_time_ms = RawValue("i", 0)
+        self._stopped = RawValue("b", False)
+        self._released = Semaphore(0)
+        self._acked = Semaphore(0)
+
+    def release(self, passed_time_ms: int) -> None:
+        self._passed_time_ms.value = passed_time_ms
+        self._released.release()
+
+    def wait_ack(self) -> None:
+        self._acked.acquire()
+
+    def stop(self) -> None:
+        self._stopped.value = True
+        self._released.release()
+
+    def wait_release(self) -> Optional[int]:
+        self._released.acquire()
+        if self._stopped.value:
+            self._stopped.value = False
+            return None
+        return self._passed_time_ms.value
+
+    def ack(self) -> None:
+        self._acked.release()
+
+
+def create_clock(mode: ClockMode) -> LockstepClock:
+    if mode == ClockMode.PIPE:
+        return PipeClock()
+    if mode == ClockMode.SHARED_MEMORY:
+        return SharedMemoryClock()
+    raise ValueError("unknown clock mode: " + str(mode))
@@ -0,0 +1,37 @@
+# in-process replacement of a multiprocessing Pipe (same send/poll/recv interface)
+# messages are passed through deques without pickling
+# (append/popleft are thread-safe, e.g. for agents running in an event loop thread)
+
+import time
+from collections import deque
+from typing import Any, Deque, Tuple
+
+POLL_INTERVAL: float = 0.001  # s, while waiting for messages
+
+
+class LocalConnection:
+    def __init__(self, inbox: Deque[Any], outbox: Deque[Any]) -> None:
+        self._inbox = inbox
+        self._outbox = outbox
+
+    def send(self, obj: Any) -> None:
+        self._outbox.append(obj)
+
+    def poll(self, timeout: float = 0.0) -> bool:
+        deadline = time.perf_counter() + timeout
+        while len(self._inbox) == 0:
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def recv(self) -> Any:
+        while len(self._inbox) == 0:  # blocks
+            time.sleep(POLL_INTERVAL)
+        return self._inbox.popleft()
+
+
+def LocalPipe() -> Tuple[LocalConnection, LocalConnection]:
+    a_to_b: Deque[Any] = deque()
+    b_to_a: Deque[Any] = deque()
+    return LocalConnection(b_to_a, a_to_b), LocalConnection(a_to_b, b_to_a)
@@ -0,0 +1,47 @@
+# emulated module without C control code and physics, for load tests of the agents:
+# confirms receive commands after fixed (event loop) times, a cancel drops the
+# confirmations still due, ignores all other bytes
+# same send/poll/recv interface as a Pipe connection (agent side), never blocks
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, List
+
+ROTATION_TIME: float = 1.0  # s, until ready to receive
+TRANSLATION_TIME: float = 0.5  # s, until received
+MAX_RECEIVE_COMMAND = 3  # (0..3: receive from left, top, right, bottom)
+CONFIRMATION = 10
+CANCEL = 30
+
+
+class ModuleStub:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        rotation_time: float = ROTATION_TIME,
+        translation_time: float = TRANSLATION_TIME,
+    ) -> None:
+        self._loop = loop
+        self._inbox: Deque[Any] = deque()
+        self._due: List[asyncio.TimerHandle] = []  # (confirmations)
+        self.rotation_time = rotation_time
+        self.translation_time = translation_time
+
+    def send(self, obj: Any) -> None:
+        if 0 <= obj <= MAX_RECEIVE_COMMAND:
+            ready = self.rotation_time
+            received = ready + self.translation_time
+            self._due = [
+                self._loop.call_later(ready, self._inbox.append, CONFIRMATION),
+                self._loop.call_later(received, self._inbox.append, CONFIRMATION),
+            ]
+        elif obj == CANCEL:
+            for handle in self._due:
+                handle.cancel()
+            self._due = []
+
+    def poll(self, timeout: float = 0.0) -> bool:
+        return len(self._inbox) > 0
+
+    def recv(self) -> Any:
+        return self._inbox.popleft()
@@ -0,0 +1,73 @@
+# PLC-style process image of all emulated modules in shared memory:
+# inputs (sensors) bit-packed, INPUT_BITS per module,
+# outputs (actuators) as int8, OUTPUT_SIZE per module
+# (written by one side only, accesses are ordered by the lockstep clock)
+
+from multiprocessing import RawArray
+
+
+class Input:  # bit offsets within the inputs of a module
+    LIGHT_BARRIER = 0
+    ENDLAGE_0 = 1
+    ENDLAGE_90 = 2
+
+
+INPUT_BITS: int = 3
+
+
+class Output:  # offsets within the outputs of a module
+    ROTATION = 0
+    TRANSLATION = 1
+
+
+OUTPUT_SIZE: int = 2
+
+
+class ProcessImage:
+    def __init__(self, size: int) -> None:
+        # size: number of modules
+        if size < 1:
+            raise ValueError("invalid size: " + str(size))
+        self.size = size
+        self.inputs = RawArray("B", (size * INPUT_BITS + 7) // 8)
+        self.outputs = RawArray("b", size * OUTPUT_SIZE)
+
+    def _check(self, module: int) -> None:
+        if not 0 <= module < self.size:
+            raise IndexError("invalid module: " + str(module))
+
+    # inputs (written by the simulation):
+    def read_input(self, module: int, input: int) -> bool:
+        bit = module * INPUT_BITS + input
+        return (self.inputs[bit >> 3] >> (bit & 7)) & 1 == 1
+
+    def read_inputs(self, module: int) -> int:
+        # all inputs of a module as bit mask
+        inputs = 0
+        for input in range(INPUT_BITS):
+            if self.read_input(module, input):
+                inputs |= 1 << input
+        return inputs
+
+    def toggle_inputs(self, module: int, changed: int) -> None:
+        # flips the inputs set in the changed mask, leaves all other bits untouched
+        self._check(module)
+        offset = module * INPUT_BITS
+        while changed:
+            input = changed.bit_length() - 1
+            bit = offset + input
+            self.inputs[bit >> 3] ^= 1 << (bit & 7)
+            changed ^= 1 << input
+
+    # outputs (written by the module controls):
+    def read_output(self, module: int, output: int) -> int:
+        return self.outputs[module * OUTPUT_SIZE + output]
+
+    def write_output(self, module: int, output: int, value: int) -> None:
+        self.outputs[module * OUTPUT_SIZE + output] = value
+
+    def clear(self, module: int) -> None:
+        # (only while the module is not running)
+        self.toggle_inputs(module, self.read_inputs(module))
+        for output in range(OUTPUT_SIZE):
+            self.write_output(module, output, 0)
@@ -0,0 +1,155 @@
+# emulated serial line between module agent (parent) and module control (child):
+# one single-producer/single-consumer byte ring buffer in shared memory per direction
+# reading/writing needs no pickling and no syscall
+# (head/tail are only ever increased, head by the consumer, tail by the producer;
+# data is written before the tail is increased)
+# publishing head/tail by plain stores relies on the other process seeing the
+# stores in program order (total store order, x86), there are no atomics in python:
+# on other architectures head/tail are published and read under a lock (barrier)
+
+import platform
+import time
+from multiprocessing import Lock, RawArray, RawValue
+from typing import Any, Optional, Tuple
+
+CAPACITY: int = 64  # bytes, per direction
+POLL_INTERVAL: float = 0.001  # s, while waiting for data / free space
+ORDERED_STORES = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686")
+
+
+class RingBuffer:
+    def __init__(
+        self, capacity: int = CAPACITY, ordered_stores: bool = ORDERED_STORES
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("invalid capacity: " + str(capacity))
+        self.capacity = capacity
+        self._data = RawArray("B", capacity)
+        self._head = RawValue("Q", 0)  # next byte to read
+        self._tail = RawValue("Q", 0)  # next byte to write
+        self._lock: Optional[Any] = None if ordered_stores else Lock()
+
+    def __len__(self) -> int:
+        # bytes available for reading
+        return self._load(self._tail) - self._load(self._head)
+
+    def _load(self, index: Any) -> int:
+        # head/tail as published by the other side
+        if self._lock is None:
+            return index.value
+        with self._lock:
+            return index.value
+
+    def _store(self, index: Any, value: int) -> None:
+        # (after the data was written / read)
+        if self._lock is None:
+            index.value = value
+            return
+        with self._lock:
+            index.value = value
+
+    def _get_view(self) -> memoryview:
+        # (created per call: memoryviews can not be passed to other processes)
+        return memoryview(self._data).cast("B")
+
+    # producer side:
+    def write(self, data: bytes) -> int:
+        # non-blocking, returns number of bytes written (limited by free space)
+        tail = self._tail.value
+        count = min(len(data), self.capacity - (tail - self._load(self._head)))
+        start = tail % self.capacity
+        first = min(count, self.capacity - start)  # (until the end of the buffer)
+        view = self._get_view()
+        view[start : start + first] = data[:first]
+        view[: count - first] = data[first:count]
+        self._store(self._tail, tail + count)
+        return count
+
+    def write_byte(self, b: int) -> bool:
+        # non-blocking, False if full
+        tail = self._tail.value
+        if tail - self._load(self._head) >= self.capacity:
+            return False
+        self._data[tail % self.capacity] = b
+        self._store(self._tail, tail + 1)
+        return True
+
+    # consumer side:
+    def read(self, max_bytes: int = CAPACITY) -> bytes:
+        # non-blocking, returns up to max_bytes (empty if nothing to read)
+        head = self._head.value
+        count = min(max_bytes, self._load(self._tail) - head)
+        start = head % self.capacity
+        first = min(count, self.capacity - start)
+        view = self._get_view()
+        data = view[start : start + first].tobytes() + view[: count - first].tobytes()
+        self._store(self._head, head + count)
+        return data
+
+    def clear(self) -> None:
+        # (only while neither side is reading or writing)
+        self._store(self._head, self._load(self._tail))
+
+    def read_byte(self) -> int:
+        # non-blocking, byte or -1 if nothing to read
+        head = self._head.value
+        if self._load(self._tail) == head:
+            return -1
+        b = self._data[head % self.capacity]
+        self._store(self._head, head + 1)
+        return b
+
+
+class RingConnection:
+    # one end of a serial link, same send/poll/recv interface as a Pipe connection
+    # (messages are single bytes), plus bulk read/write
+    def __init__(self, inbox: RingBuffer, outbox: RingBuffer) -> None:
+        self._inbox = inbox
+        self._outbox = outbox
+
+    def send(self, b: int) -> None:
+        # blocks while the line is full
+        if not 0 <= b <= 255:
+            raise ValueError("not a byte: " + str(b))
+        while not self._outbox.write_byte(b):
+            time.sleep(POLL_INTERVAL)
+
+    def poll(self, timeout: float = 0.0) -> bool:
+        deadline = time.perf_counter() + timeout
+        while len(self._inbox) == 0:
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def recv(self) -> int:
+        while True:  # blocks
+            b = self._inbox.read_byte()
+            if b != -1:
+                return b
+            time.sleep(POLL_INTERVAL)
+
+    def read_byte(self) -> int:
+        # non-blocking, byte or -1 if nothing to read
+        return self._inbox.read_byte()
+
+    def write(self, data: bytes) -> int:
+        # non-blocking, returns number of bytes written
+        return self._outbox.write(data)
+
+    def read(self, max_bytes: int = CAPACITY) -> bytes:
+        # non-blocking
+        return self._inbox.read(max_bytes)
+
+    def clear(self) -> None:
+        # drops all data in both directions (only while the line is not used)
+        self._inbox.clear()
+        self._outbox.clear()
+
+
+def RingPipe(
+    capacity: int = CAPACITY, ordered_stores: bool = ORDERED_STORES
+) -> Tuple[RingConnection, RingConnection]:
+    a_to_b = RingBuffer(capacity, ordered_stores)
+    b_to_a = RingBuffer(capacity, ordered_stores)
+    return RingConnection(b_to_a, a_to_b), RingConnection(a_to_b, b_to_a)
@@ -39,16 +39,28 @@ typedef enum
     rot_90 = 1
 } rotation_state;
 
-translation current_translation = no_translation;
-rotation current_rotation = no_rotation;
+// state of one module instance
+// (one process can host many modules, see select_instance)
+typedef struct
+{
+    translation current_translation;
+    rotation current_rotation;
+
+    skill current_skill;
+    direction target_direction;
+    rotation_state target_rotation_state;
+
+    rotation_state current_rotation_state;
 
-skill current_skill = none;
-direction target_direction = left;
-rotation_state target_rotation_state = rot_0;
+    bool ready_to_translate;
 
-rotation_state current_rotation_state = rot_0;
+    int pending_command; // received during a skill, started right after (-1: none)
+} module_state;
 
-bool ready_to_translate = false;
+#define MAX_INSTANCES 1024
+
+module_state states[MAX_INSTANCES];
+module_state *state = &states[0]; // currently selected instance
 
 // extern Python // tbd: move to separate file for simple replacement by actual hardware implementations
 bool _light_barrier();
@@ -70,12 +82,12 @@ bool light_barrier()
 
 void set_translation(translation dir)
 {
-    current_translation = dir;
+    state->current_translation = dir;
     _set_translation(dir);
 }
 void set_rotation(rotation dir)
 {
-    current_rotation = dir;
+    state->current_rotation = dir;
     _set_rotation(dir);
 }
 
@@ -88,10 +100,59 @@ int command_2_skill_map[2] = {receive_from, forward_to};
 int command_2_direction_map[4] = {left, top, right, bottom};
 int direction_2_target_rotation_state_map[4] = {rot_0, rot_90, rot_0, rot_90};
 
-void read_command()
+#define MAX_COMMAND 7
+#define CONFIRMATION 20
+#define CANCEL 30
+
+void cancel_skill()
+{
+    // (e.g. the box is routed to another module before the handoff)
+    set_translation(no_translation);
+    state->current_skill = none;
+    _log("skill cancelled.");
+}
+
+bool read_confirmation()
 {
+    // commands arriving while a skill waits for a confirmation are kept
+    // for the next skill (pipelined handoffs: the agent sends the next command
+    // before the current transfer is finished), a cancel aborts the current skill
     int read = _serial_read();
     if (read == -1)
+    {
+        return false;
+    }
+    if (read <= MAX_COMMAND)
+    {
+        if (state->pending_command != -1)
+        {
+            _log("ERROR: more than one pending command");
+        }
+        state->pending_command = read;
+        return false;
+    }
+    if (read == CANCEL)
+    {
+        cancel_skill();
+        return false;
+    }
+    if (read != CONFIRMATION)
+    {
+        _log("ERROR: unexpected byte while waiting for confirmation");
+        return false;
+    }
+    return true;
+}
+
+void read_command()
+{
+    int read = state->pending_command;
+    state->pending_command = -1;
+    if (read == -1)
+    {
+        read = _serial_read();
+    }
+    if (read == -1)
     {
         return;
     }
@@ -103,38 +164,38 @@ void read_command()
     // 5 -> forward, top
     // 6 -> forward, right
     // 7 -> forward, bottom
-    if(read > 7){
+    if(read > MAX_COMMAND){
         _log("ERROR: Command > 7");
         return;
     }
-    current_skill = command_2_skill_map[read >= 4];
-    target_direction = command_2_direction_map[read % 4];
-    target_rotation_state = direction_2_target_rotation_state_map[target_direction - 1];
-    ready_to_translate = false;
+    state->current_skill = command_2_skill_map[read >= 4];
+    state->target_direction = command_2_direction_map[read % 4];
+    state->target_rotation_state = direction_2_target_rotation_state_map[state->target_direction - 1];
+    state->ready_to_translate = false;
     _log("starting skill..");
 }
 
 void turn_to_target_direction()
 {
-    if (current_rotation != no_rotation)
+    if (state->current_rotation != no_rotation)
     {
         // have we arrived yet?
-        if (((target_rotation_state == rot_0) && _endlage_0()) ||
-            ((target_rotation_state == rot_90) && _endlage_90()))
+        if (((state->target_rotation_state == rot_0) && _endlage_0()) ||
+            ((state->target_rotation_state == rot_90) && _endlage_90()))
         {
             set_rotation(no_rotation);
-            current_rotation_state = target_rotation_state;
+            state->current_rotation_state = state->target_rotation_state;
         }
         return;
     }
     // start rotation
     _log("starting rotation..");
-    if (target_rotation_state == rot_90)
+    if (state->target_rotation_state == rot_90)
     {
         set_rotation(clock_wise);
         return;
     }
-    if (target_rotation_state == rot_0)
+    if (state->target_rotation_state == rot_0)
     {
         set_rotation(counter_clock_wise);
         return;
@@ -144,17 +205,17 @@ void turn_to_target_direction()
 void start_translation()
 {
     _log("staring to translate..");
-    if ((target_direction == right) || (target_direction == bottom))
+    if ((state->target_direction == right) || (state->target_direction == bottom))
     {
-        if (current_skill == forward_to)
+        if (state->current_skill == forward_to)
             set_translation(forward);
         else
             set_translation(backward);
         return;
     }
-    if ((target_direction == left) || (target_direction == top))
+    if ((state->target_direction == left) || (state->target_direction == top))
     {
-        if (current_skill == forward_to)
+        if (state->current_skill == forward_to)
             set_translation(backward);
         else
             set_translation(forward);
@@ -164,33 +225,36 @@ void start_translation()
 
 void check_done()
 {
-    if (current_skill == forward_to)
+    if (state->current_skill == forward_to)
     {
-        int read = _serial_read();
-        if (read != -1)
+        if (read_confirmation())
         {
             set_translation(no_translation);
-            current_skill = none;
+            state->current_skill = none;
             _log("skill done. (forward)");
+            read_command(); // (next skill, if already sent)
         }
         return;
     }
-    if (current_skill == receive_from)
+    if (state->current_skill == receive_from)
     {
         if (light_barrier())
         {
             set_translation(no_translation);
-            current_skill = none;
+            state->current_skill = none;
             _serial_write(10);
             _log("skill done. (receive)");
+            read_command(); // (next skill, if already sent)
+            return;
         }
+        read_confirmation(); // (no confirmation expected: cancel or next command)
         return;
     }
 }
 
 void translate()
 {
-    if (current_translation != no_translation)
+    if (state->current_translation != no_translation)
     {
         check_done();
         return;
@@ -200,42 +264,66 @@ void translate()
 
 void get_ready_to_translate()
 {
-    if (current_skill == receive_from)
+    if (state->current_skill == receive_from)
     {
         _serial_write(10);          // confirm readiness to receipt once
-        ready_to_translate = true; // proceed immediately
+        state->ready_to_translate = true; // proceed immediately
     }
-    if (current_skill == forward_to)
+    if (state->current_skill == forward_to)
     {
-        if (_serial_read() != -1) // wait for confirmation to start translation
+        if (read_confirmation()) // wait for confirmation to start translation
         {
-            ready_to_translate = true; // proceed after confirmation
+            state->ready_to_translate = true; // proceed after confirmation
         }
     }
 }
 
-void setup()
+int max_instances()
+{
+    return MAX_INSTANCES;
+}
+
+void select_instance(int instance)
+{
+    if ((instance < 0) || (instance >= MAX_INSTANCES))
+    {
+        _log("ERROR: invalid instance");
+        _throw_exception();
+        return;
+    }
+    state = &states[instance];
+}
+
+void setup() // (of the selected instance)
 {
+    state->current_translation = no_translation;
+    state->current_rotation = no_rotation;
+    state->current_skill = none;
+    state->target_direction = left;
+    state->target_rotation_state = rot_0;
+    state->current_rotation_state = rot_0;
+    state->ready_to_translate = false;
+    state->pending_command = -1;
 }
 
 void loop() // tbd: loop -> called on interrupt for sensors+communication?
 {
     // 0. wait for command to activate skill
-    if (current_skill == none)
+    if (state->current_skill == none)
     {
         read_command(); // wait for new command to be set
         return;
     }
 
     // 1. get into correct direction
-    if (current_rotation_state != target_rotation_state)
+    if (state->current_rotation_state != state->target_rotation_state)
     {
         turn_to_target_direction();
         return;
     }
 
     // 2. communicate readiness to receive / wait for command to start translation!
-    if (!ready_to_translate)
+    if (!state->ready_to_translate)
     {
         get_ready_to_translate();
         return;
@@ -1,3 +1,5 @@
 // C operations invoked from Python
+int max_instances();
+void select_instance(int instance); // setup/loop act on the selected instance
 void setup();
 void loop();
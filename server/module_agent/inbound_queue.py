@@ -0,0 +1,70 @@
+# boxes waiting to be handed over to a module (one request per sending neighbour)
+# the module admits the next box once it is free, selected by a dispatch policy
+
+import asyncio
+from enum import Enum
+from typing import TYPE_CHECKING, Any, List, Tuple
+
+from server.module_agent.dir import Dir
+from server.routing.router import Router
+
+if TYPE_CHECKING:
+    from server.module_agent.module_agent import Box
+
+
+class DispatchPolicy(Enum):
+    FIFO = "fifo"
+    EARLIEST_DUE = "earliest_due"  # (box due time)
+    SHORTEST_REMAINING_ROUTE = "shortest_remaining_route"  # (hops to the box target)
+
+
+class ReceiveRequest:
+    def __init__(
+        self, sender: str, box: "Box", direction: Dir, time: float, urgent: bool = False
+    ) -> None:
+        self.sender = sender
+        self.box = box
+        self.direction = direction  # (to receive from)
+        self.time = time  # (of the request)
+        self.urgent = urgent  # (box makes way, admitted before all others)
+        self.admitted: "asyncio.Future[None]" = (
+            asyncio.get_running_loop().create_future()
+        )
+
+
+class InboundQueue:
+    def __init__(
+        self, name: str, router: Router, policy: DispatchPolicy = DispatchPolicy.FIFO
+    ) -> None:
+        self.name = name  # (of the receiving module)
+        self.router = router
+        self.policy = policy
+        self.requests: List[ReceiveRequest] = []
+        self.max_length = 0
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def add(self, request: ReceiveRequest) -> None:
+        self.requests.append(request)
+        self.max_length = max(self.max_length, len(self.requests))
+
+    def withdraw(self, request: ReceiveRequest) -> None:
+        self.requests.remove(request)
+
+    def pop(self) -> ReceiveRequest:
+        # next request by policy (ties: first come)
+        request = min(self.requests, key=self._get_key)
+        self.requests.remove(request)
+        return request
+
+    def _get_key(self, request: ReceiveRequest) -> Tuple[bool, Any, float]:
+        rank = not request.urgent  # (urgent requests first)
+        if self.policy == DispatchPolicy.EARLIEST_DUE:
+            return rank, request.box.due, request.time
+        if self.policy == DispatchPolicy.SHORTEST_REMAINING_ROUTE:
+            target = request.box.current_target
+            if target is None or not self.router.is_reachable(self.name, target):
+                return rank, float("inf"), request.time
+            return rank, self.router.get_hops(self.name, target), request.time
+        return rank, 0, request.time
@@ -0,0 +1,82 @@
+# histogram of handshake latencies (e.g. time from a command until its confirmation)
+# fixed buckets, cheap to record and to merge across agents
+
+from typing import Iterable, List, Sequence
+
+BOUNDS_MS: Sequence[float] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms: Sequence[float] = BOUNDS_MS) -> None:
+        if list(bounds_ms) != sorted(bounds_ms):
+            raise ValueError("unsorted bounds: " + str(bounds_ms))
+        self.bounds_ms = list(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)  # (last: above all bounds)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, latency_s: float) -> None:
+        latency_ms = latency_s * 1000
+        bucket = 0
+        while bucket < len(self.bounds_ms) and latency_ms > self.bounds_ms[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.bounds_ms != self.bounds_ms:
+            raise ValueError("different bounds")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count() if self.count() > 0 else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        # upper bound of the bucket containing the q-quantile (max if above all)
+        if not 0 <= q <= 1:
+            raise ValueError("invalid quantile: " + str(q))
+        remaining = q * self.count()
+        for bucket, count in enumerate(self.counts):
+            remaining -= count
+            if remaining <= 0 and count > 0:
+                if bucket < len(self.bounds_ms):
+                    return min(self.bounds_ms[bucket], self.max_ms)
+                break
+        return self.max_ms
+
+    def report(self) -> str:
+        labels = ["<=" + str(b) + " ms" for b in self.bounds_ms]
+        labels.append(">" + str(self.bounds_ms[-1]) + " ms")
+        buckets: List[str] = [
+            label + ": " + str(count)
+            for label, count in zip(labels, self.counts)
+            if count > 0
+        ]
+        return (
+            "count: "
+            + str(self.count())
+            + ", mean: "
+            + str(round(self.mean_ms(), 1))
+            + " ms, p50: <="
+            + str(round(self.percentile_ms(0.5), 1))
+            + " ms, p99: <="
+            + str(round(self.percentile_ms(0.99), 1))
+            + " ms, max: "
+            + str(round(self.max_ms, 1))
+            + " ms ("
+            + ", ".join(buckets)
+            + ")"
+        )
+
+
+def merge_histograms(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return merged
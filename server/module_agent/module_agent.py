@@ -3,19 +3,32 @@
 # and cooperation with neighbour agents to forward/receive boxes
 
 import asyncio, random
+from collections import deque
 from enum import Enum
-from multiprocessing.connection import Connection
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
 from server.module_agent.dir import Dir
+from server.module_agent.inbound_queue import (
+    DispatchPolicy,
+    InboundQueue,
+    ReceiveRequest,
+)
+from server.module_agent.latency_histogram import LatencyHistogram
+from server.routing.reservation_router import HOP_TIME
 from server.routing.router import Router
 
+POLL_INTERVAL: float = 0.025  # s, only for connections without readiness notification
+REROUTE_INTERVAL: float = 1.0  # s, while the target of a box is not reachable
+
 
 class Box:
-    def __init__(self, name: str, targets: List[str]) -> None:
+    def __init__(
+        self, name: str, targets: List[str], due: float = float("inf")
+    ) -> None:
         self.name = name
         self.targets = targets
-        self.current_target = None
+        self.due = due  # (event loop time, earliest due dispatch)
+        self.current_target: Optional[str] = None
         self.generator = self.create_generator()
 
     def update_location(self, location: str):
@@ -24,6 +37,7 @@ class Box:
 
     def get_next_target(self) -> str:
         ts = self.targets.copy()
+        assert self.current_target is not None
         ts.remove(self.current_target)
         return random.choice(ts)
         # alternative to random choice: return next(self.generator)
@@ -36,6 +50,45 @@ class Box:
                 i += 1
 
 
+class ModuleConnection(Protocol):
+    # serial line to the module (e.g. Pipe connection or shared memory ring buffer)
+    def send(self, obj: Any) -> None: ...
+
+    def poll(self, timeout: float = 0.0) -> bool: ...
+
+    def recv(self) -> Any: ...
+
+
+async def wait_readable(connection: ModuleConnection) -> None:
+    # returns as soon as the connection has data to read:
+    # notified by the event loop if possible (virtual time loop, file descriptor),
+    # polling otherwise
+    if connection.poll(timeout=0):
+        return
+    loop = asyncio.get_running_loop()
+    wait_readable_notified = getattr(loop, "wait_readable", None)
+    if wait_readable_notified is not None:
+        await wait_readable_notified(connection)
+        return
+    fileno = getattr(connection, "fileno", None)
+    if fileno is not None:
+        readable = loop.create_future()
+        fd = fileno()
+
+        def on_readable() -> None:
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fd, on_readable)
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        return
+    while not connection.poll(timeout=0):
+        await asyncio.sleep(POLL_INTERVAL)
+
+
 class Skill(Enum):
     RECEIVE_FROM = 1
     FORWARD_TO = 2
@@ -47,13 +100,23 @@ COMMAND_MAP: Dict[Skill, Dict[Dir, int]] = {
 }
 
 
+CANCEL: int = 30  # aborts the current skill of the module
+
+
+def get_opposite(direction: Dir) -> Dir:
+    # (tbd: depend on module orientation)
+    return Dir(((direction.value + 1) % len(Dir)) + 1)
+
+
 class ModuleAgent:
     def __init__(
         self,
         name: str,
-        module_connection: Connection,
+        module_connection: ModuleConnection,
         router: Router,
         agents: Dict[str, "ModuleAgent"],
+        pipelined: bool = False,
+        policy: DispatchPolicy = DispatchPolicy.FIFO,
     ) -> None:
 
         self.name = name
@@ -63,47 +126,296 @@ class ModuleAgent:
         self.agents = agents
         self.agents[self.name] = self
 
-        self.handled_box: Optional[Box] = None
+        self.handled_box: Optional[Box] = None  # (on the module or being received)
+        self.busy = False  # (reserved for a box)
+
+        # boxes of neighbours waiting to be handed over, admitted one at a time
+        self.inbound = InboundQueue(name, router, policy)
+        self.waiting_for: Optional["ModuleAgent"] = None  # (to admit the box)
+        self.request: Optional[ReceiveRequest] = None  # (queued at waiting_for)
+
+        # pipelined handoffs: while a box is received, the module gets its forward
+        # command (started right after the receipt) and the next module is reserved
+        # (prepares to receive ahead of the arrival)
+        self.pipelined = pipelined
+        self.next_hop: Optional[Tuple[Dir, str]] = None  # (forward command sent)
+        self.reservation: Optional[Tuple[Dir, "asyncio.Task[None]"]] = None
+
+        # handshake latencies (s, event loop time) by confirmation
+        self.latencies: Dict[str, LatencyHistogram] = {
+            "ready": LatencyHistogram(),
+            "received": LatencyHistogram(),
+        }
 
-    async def forward_box_async(self):
+        # utilization (s, event loop time)
+        self.occupied_time = 0.0  # (reserved until the box is handed over)
+        self.occupied_since: Optional[float] = None
+        self.admission_wait_time = 0.0  # (box waiting for the next module)
+        self.boxes_received = 0
+        self.deadlocks = 0  # (cyclic waits resolved by this agent)
+
+    async def forward_box_async(self) -> None:
+        if self.next_hop is not None:  # (prepared while receiving)
+            next_dir, next_agent_name = self.next_hop
+            self.next_hop = None
+            if self.is_valid_hop(next_agent_name):
+                await self.forward_to_async(
+                    next_dir, self.agents[next_agent_name], command_sent=True
+                )
+                return
+            # (e.g. neighbour out of service since: routed again)
+            await self.cancel_prepared_hop(self.agents[next_agent_name])
+        assert self.handled_box is not None
         target = self.handled_box.current_target
-        next_dir, next_agent_name = self.router.get_next_direction(self.name, target)
-        await self.forward_to_async(next_dir, self.agents[next_agent_name])
+        assert target is not None
+        while not self.router.is_reachable(self.name, target):
+            # (e.g. modules out of service, routes are updated by the router)
+            await asyncio.sleep(REROUTE_INTERVAL)
+            target = self.handled_box.current_target
+            assert target is not None
+        next_dir, next_agent_name = self.router.route(
+            self.handled_box.name, self.name, target, asyncio.get_running_loop().time()
+        )
+        next_dir, neighbour = await self.wait_for_admission(
+            next_dir, self.agents[next_agent_name]
+        )
+        await self.forward_to_async(next_dir, neighbour)
 
-    async def forward_to_async(self, direction: Dir, neighbour: "ModuleAgent"):
-        command = COMMAND_MAP[Skill.FORWARD_TO][direction]
-        self.module_connection.send(command)  # start prepare forward to
-        neighbour.handled_box = self.handled_box
-        await neighbour.prepare_receive_from_async(
-            # opposite direction (tbd: depend on module orientation)
-            Dir(((direction.value + 1) % len(Dir)) + 1)
+    def is_valid_hop(self, neighbour: str) -> bool:
+        # link enabled and the target of the box reachable via the neighbour
+        assert self.handled_box is not None
+        target = self.handled_box.current_target
+        assert target is not None
+        return self.router.graph.has_edge(self.name, neighbour) and (
+            neighbour == target or self.router.is_reachable(neighbour, target)
         )
+
+    async def cancel_prepared_hop(self, neighbour: "ModuleAgent") -> None:
+        # forward command and reservation of the neighbour withdrawn
+        self.module_connection.send(CANCEL)
+        assert neighbour.reservation is not None
+        await neighbour.reservation[1]  # (readiness is confirmed before a cancel)
+        neighbour.module_connection.send(CANCEL)
+        neighbour.reservation = None
+        neighbour.busy = False
+        neighbour.stop_occupied()
+        neighbour.dispatch()
+
+    async def wait_for_admission(
+        self, direction: Dir, neighbour: "ModuleAgent"
+    ) -> Tuple[Dir, "ModuleAgent"]:
+        # queued at the neighbour until it is free, returns the admitting neighbour
+        # (the request may be replaced to resolve a cyclic wait)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.request = neighbour.request_receive(self, get_opposite(direction))
+        self.waiting_for = neighbour
+        while not self.request.admitted.done():
+            cycle = self.find_wait_cycle()
+            if cycle and self.name == min(cycle):  # (one agent per cycle resolves)
+                if self.resolve_deadlock(cycle):
+                    self.deadlocks += 1
+                    continue
+            await asyncio.wait([self.request.admitted], timeout=REROUTE_INTERVAL)
+        direction = get_opposite(self.request.direction)
+        neighbour = self.waiting_for
+        self.request = None
+        self.waiting_for = None
+        self.admission_wait_time += loop.time() - start
+        return direction, neighbour
+
+    def request_receive(
+        self, sender: "ModuleAgent", direction: Dir, urgent: bool = False
+    ) -> ReceiveRequest:
+        assert sender.handled_box is not None
+        request = ReceiveRequest(
+            sender.name,
+            sender.handled_box,
+            direction,
+            asyncio.get_running_loop().time(),
+            urgent,
+        )
+        self.inbound.add(request)
+        self.dispatch()
+        return request
+
+    def is_free(self) -> bool:
+        return self.handled_box is None and not self.busy and self.reservation is None
+
+    def dispatch(self) -> None:
+        # admits the next queued box, once the module is free
+        if not self.is_free() or len(self.inbound) == 0:
+            return
+        self.busy = True  # (until the sender reserved)
+        self.inbound.pop().admitted.set_result(None)
+
+    def find_wait_cycle(self) -> List[str]:
+        # agents waiting for each other to admit their boxes, starting with this one
+        # (empty: no cyclic wait)
+        cycle = [self.name]
+        agent = self.waiting_for
+        while agent is not None and agent is not self:
+            if agent.name in cycle:
+                return []  # (cycle without this agent)
+            cycle.append(agent.name)
+            agent = agent.waiting_for
+        return cycle if agent is self else []
+
+    def is_blocked(self) -> bool:
+        # box waiting for admission, not making way
+        return (
+            self.request is not None
+            and not self.request.urgent
+            and not self.request.admitted.done()
+        )
+
+    def resolve_deadlock(self, cycle: List[str]) -> bool:
+        # boxes on the shortest path from the cycle to a free module make way,
+        # each one module along the path (starting at the free module,
+        # urgent admission), so that the box of the cycle leaves it
+        # (false: cycle already resolving, or no free module reachable)
+        agents = [self.agents[name] for name in cycle]
+        if not all(agent.is_blocked() for agent in agents):
+            return False
+        previous: Dict[str, Optional[str]] = {name: None for name in cycle}
+        queue = deque(cycle)
+        while queue:
+            name = queue.popleft()
+            for neighbour_name in self.router.mapp[name]:
+                neighbour = self.agents.get(neighbour_name)
+                if (
+                    neighbour is None
+                    or neighbour_name in previous
+                    or not self.router.graph.has_edge(name, neighbour_name)
+                ):
+                    continue
+                previous[neighbour_name] = name
+                if neighbour.is_free():
+                    self.make_way_along(neighbour_name, previous)
+                    return True
+                if neighbour.handled_box is not None and neighbour.is_blocked():
+                    queue.append(neighbour_name)
+        return False
+
+    def make_way_along(self, free: str, previous: Dict[str, Optional[str]]) -> None:
+        # (requests replaced at once: admitted before any other box)
+        name, sender = free, previous[free]
+        while sender is not None:
+            agent = self.agents[sender]
+            assert agent.request is not None and agent.waiting_for is not None
+            agent.waiting_for.inbound.withdraw(agent.request)
+            agent.request.admitted.cancel()  # (wakes the agent)
+            direction = self.router.mapp[agent.name][name]["dir"]
+            agent.waiting_for = self.agents[name]
+            agent.request = agent.waiting_for.request_receive(
+                agent, get_opposite(direction), urgent=True
+            )
+            name, sender = sender, previous[sender]
+
+    def get_occupied_time(self, now: float) -> float:
+        # (utilization: divided by the elapsed time)
+        if self.occupied_since is None:
+            return self.occupied_time
+        return self.occupied_time + now - self.occupied_since
+
+    async def forward_to_async(
+        self, direction: Dir, neighbour: "ModuleAgent", command_sent: bool = False
+    ):
+        # (neighbour admitted the box)
+        if not command_sent:
+            command = COMMAND_MAP[Skill.FORWARD_TO][direction]
+            self.module_connection.send(command)  # start prepare forward to
+        neighbour.handled_box = self.handled_box
+        ready = neighbour.reserve(get_opposite(direction))
+        if neighbour.pipelined:
+            neighbour.prepare_next_hop()
+        await ready
+        neighbour.reservation = None
         self.module_connection.send(20)  # start translation
         await neighbour.receive_from_async()  # wait for confirmation of receipt
         self.module_connection.send(20)  # confirm translation, stop belt
         self.busy = False
         self.handled_box = None
+        self.stop_occupied()
         print(self.name + " forwarding done.")
+        self.dispatch()
 
-    async def prepare_receive_from_async(self, direction: Dir) -> None:
+    def stop_occupied(self) -> None:
+        if self.occupied_since is not None:
+            self.occupied_time += (
+                asyncio.get_running_loop().time() - self.occupied_since
+            )
+            self.occupied_since = None
+
+    def reserve(self, direction: Dir) -> "asyncio.Task[None]":
+        # starts to prepare receiving from the given direction (once),
+        # the task is done on confirmation of readiness
+        if self.reservation is not None:
+            if self.reservation[0] != direction:
+                raise RuntimeError(self.name + " already reserved")
+            return self.reservation[1]
         self.busy = True
+        self.occupied_since = asyncio.get_running_loop().time()
         command = COMMAND_MAP[Skill.RECEIVE_FROM][direction]
         self.module_connection.send(command)
-        await self.wait_for_confirmation_async()  # 1: confirmation of readiness
+        ready = asyncio.ensure_future(
+            self.wait_for_confirmation_async("ready")  # 1: confirmation of readiness
+        )
+        self.reservation = (direction, ready)
+        return ready
+
+    def prepare_next_hop(self) -> None:
+        # (pipelined) if the next module is free: reserved ahead,
+        # forward command queued behind the receive command
+        box = self.handled_box
+        assert box is not None and box.current_target is not None
+        target = box.current_target
+        if target == self.name or not self.router.is_reachable(self.name, target):
+            return  # (next target only known after the receipt)
+        next_dir, next_agent_name = self.router.route(
+            box.name, self.name, target, self.get_expected_receipt()
+        )
+        neighbour = self.agents[next_agent_name]
+        if not neighbour.is_free() or len(neighbour.inbound) > 0:
+            return  # (queued once the box is received)
+        self.module_connection.send(COMMAND_MAP[Skill.FORWARD_TO][next_dir])
+        self.next_hop = (next_dir, next_agent_name)
+        neighbour.reserve(get_opposite(next_dir))
+
+    def get_expected_receipt(self) -> float:
+        # event loop time the box being received arrives (handoff from here on)
+        # mean handshake latencies so far, hop time until measured
+        now = asyncio.get_running_loop().time()
+        if self.latencies["received"].count() == 0:
+            return now + HOP_TIME
+        latency_ms = (
+            self.latencies["ready"].mean_ms() + self.latencies["received"].mean_ms()
+        )
+        return now + latency_ms / 1000
+
+    async def prepare_receive_from_async(self, direction: Dir) -> None:
+        await self.reserve(direction)
+        self.reservation = None
 
     async def receive_from_async(self) -> None:
-        await self.wait_for_confirmation_async()  # 2: confirmation of retrieval
+        await self.wait_for_confirmation_async(
+            "received"
+        )  # 2: confirmation of retrieval
         print(self.name + " box received")
+        self.boxes_received += 1
+        assert self.handled_box is not None
         self.handled_box.update_location(self.name)
         asyncio.create_task(
             self.forward_box_async(),
         )
 
-    async def wait_for_confirmation_async(self) -> None:
+    async def wait_for_confirmation_async(self, step: str) -> None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
         await self.wait_for_confirmation()
+        self.latencies[step].add(loop.time() - start)
 
     async def wait_for_confirmation(self) -> None:
-        while not self.module_connection.poll(timeout=0):
-            await asyncio.sleep(0.025)  # blocking wait for confirmation
+        await wait_readable(self.module_connection)  # wakes up on arrival
         result = self.module_connection.recv()
         # print(self.name + " read confirmation: " + str(result))
@@ -0,0 +1,126 @@
+# congestion aware routing: boxes reserve the modules of their planned routes
+# for time windows, next hops minimize the expected arrival time of a box
+# given the reservations of all other boxes (instead of the static shortest path)
+
+import heapq
+from bisect import insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from server.module_agent.dir import Dir
+from server.routing.router import UNREACHABLE, Map, Router
+
+HOP_TIME: float = 2.0  # s, expected time to move a box to a neighbour module
+# (rotation + translation of the world 1 turntables, plus confirmations)
+
+Window = Tuple[float, float, str]  # (start, end, box)
+
+
+class ReservationTable:
+    # time windows per module, sorted by start, and the modules of each box
+    # (windows ended before the current time are dropped once their module is
+    # reserved, at the front, or their box released)
+    def __init__(self) -> None:
+        self.windows: Dict[str, List[Window]] = {}
+        self.modules: Dict[str, Set[str]] = {}  # (by box)
+        self.now = float("-inf")
+
+    def advance(self, now: float) -> None:
+        self.now = max(self.now, now)
+
+    def reserve(self, module: str, start: float, end: float, box: str) -> None:
+        if end < start:
+            raise ValueError("invalid window: " + str(start) + " - " + str(end))
+        windows = self.windows.setdefault(module, [])
+        insort(windows, (start, end, box))
+        while windows[0][1] < self.now:  # (sorted by start: ended ones first)
+            windows.pop(0)
+        self.modules.setdefault(box, set()).add(module)
+
+    def release(self, box: str) -> None:
+        # all windows of the box
+        for module in self.modules.pop(box, set()):
+            windows = [
+                window
+                for window in self.windows.get(module, [])
+                if window[1] >= self.now and window[2] != box
+            ]
+            if windows:
+                self.windows[module] = windows
+            else:
+                self.windows.pop(module, None)
+
+    def get_free_start(
+        self, module: str, earliest: float, duration: float, box: str
+    ) -> float:
+        # first start >= earliest without overlapping windows of other boxes
+        start = earliest
+        for window_start, window_end, window_box in self.windows.get(module, []):
+            if window_box == box or window_end <= start:
+                continue
+            if window_start >= start + duration:
+                break
+            start = window_end
+        return start
+
+
+class ReservationRouter(Router):
+    # each module hands over one box at a time (hop time), boxes wait in front
+    # of busy modules: the route of a box is planned whenever it is handed over
+    # (time-dependent A*, heuristic: remaining hops * hop time) and the handoffs
+    # of the route are reserved, replacing the previous reservations of the box
+    def __init__(self, mapp: Optional[Map] = None, hop_time: float = HOP_TIME) -> None:
+        super().__init__(mapp)
+        self.hop_time = hop_time
+        self.reservations = ReservationTable()
+
+    def route(self, box: str, frm: str, to: str, time: float) -> Tuple[Dir, str]:
+        # (handoff from frm starts at the given time)
+        if frm == to:
+            raise ValueError(frm + " (frm) == (to) " + to)
+        # (route times may be ahead by up to a hop, e.g. prepared during a receipt)
+        self.reservations.advance(time - self.hop_time)
+        self.release(box)
+        path = self.plan(box, frm, to, time)
+        if not path:
+            raise ValueError("no path from " + frm + " to " + to)
+        for module, start in path:
+            self.reservations.reserve(module, start, start + self.hop_time, box)
+        next_module = path[1][0] if len(path) > 1 else to
+        return self.mapp[frm][next_module]["dir"], next_module
+
+    def release(self, box: str) -> None:
+        # e.g. box removed from the plant
+        self.reservations.release(box)
+
+    def plan(self, box: str, frm: str, to: str, time: float) -> List[Tuple[str, float]]:
+        # modules of the route with the start times of their handoffs
+        # (target excluded, empty if the target is not reachable)
+        start_index, target = self.index[frm], self.index[to]
+        remaining = self.get_distances_to(to)
+        if remaining[start_index] == UNREACHABLE:
+            return []
+        arrivals = {start_index: time}
+        starts = {start_index: time}
+        previous: Dict[int, int] = {}
+        queue = [(time + remaining[start_index] * self.hop_time, time, start_index)]
+        while queue:
+            _, arrival, i = heapq.heappop(queue)
+            if i == target:
+                break
+            if arrival > arrivals[i]:
+                continue  # (outdated entry)
+            if i != start_index:  # (once i is free)
+                starts[i] = self.reservations.get_free_start(
+                    self.names[i], arrival, self.hop_time, box
+                )
+            for j in map(int, self.neighbours[:, i]):
+                j_arrival = starts[i] + self.hop_time
+                if j >= 0 and j_arrival < arrivals.get(j, float("inf")):
+                    arrivals[j] = j_arrival
+                    previous[j] = i
+                    estimate = j_arrival + remaining[j] * self.hop_time
+                    heapq.heappush(queue, (estimate, j_arrival, j))
+        path = [previous[target]]
+        while path[-1] != start_index:
+            path.append(previous[path[-1]])
+        return [(self.names[i], starts[i]) for i in reversed(path)]
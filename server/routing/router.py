@@ -1,6 +1,9 @@
 # top of the control hierarchy, providing info of where to move boxes to reach specified target modules
 
-import networkx as nx
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import networkx as nx  # type: ignore
+import numpy as np
 from server.module_agent.dir import Dir
 from instances.instance_1.instance_1 import X as grid_x
 from instances.instance_1.instance_1 import Y as grid_y
@@ -18,19 +21,26 @@ directions = {
 }
 
 
-def get_map():
+Map = Dict[str, Dict[str, Dict[str, Dir]]]  # module -> neighbour -> {"dir": dir}
+
+
+def get_map(
+    grid_x: int = X,
+    grid_y: int = Y,
+    is_excluded: Callable[[int, int], bool] = excluded,
+) -> Map:
     mapp = {}
-    for x in range(1, X + 1):
-        for y in range(1, Y + 1):
-            if excluded(x, y):
+    for x in range(1, grid_x + 1):
+        for y in range(1, grid_y + 1):
+            if is_excluded(x, y):
                 continue
             neighbours = {}
             for dir, coords in directions.items():
                 x_ = x + coords[0]  # possible neighbours
                 y_ = y + coords[1]
-                if excluded(x_, y_):
+                if is_excluded(x_, y_):
                     continue
-                if 0 < x_ <= X and 0 < y_ <= Y:  # (valid neighbour)
+                if 0 < x_ <= grid_x and 0 < y_ <= grid_y:  # (valid neighbour)
                     neighbours[name(x_, y_)] = {"dir": dir}
             mapp[name(x, y)] = neighbours
     return mapp
@@ -40,21 +50,373 @@ def name(x, y):
     return "t_" + str(x) + "_" + str(y)
 
 
+def get_neighbour_table(mapp: Map, index: Dict[str, int]) -> np.ndarray:
+    # neighbour index of each module per direction (-1: none), shape (len(Dir), n)
+    neighbours = np.full((len(Dir), len(index)), -1, dtype=np.int32)
+    for frm, frm_neighbours in mapp.items():
+        for to, attributes in frm_neighbours.items():
+            d = attributes["dir"].value - 1
+            if neighbours[d, index[frm]] != -1:
+                raise ValueError("several neighbours of " + frm + " to " + str(d + 1))
+            neighbours[d, index[frm]] = index[to]
+    return neighbours
+
+
+def get_links(neighbours: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    # (start modules, end modules) of all links per direction
+    links = []
+    for nb in neighbours:
+        starts = np.flatnonzero(nb >= 0)
+        links.append((starts, nb[starts]))
+    return links
+
+
+def get_bits(count: int) -> Tuple[np.ndarray, np.ndarray]:
+    # (word, bit) of positions 0..count-1 in rows of uint64 words
+    positions = np.arange(count)
+    return positions // 64, np.left_shift(1, positions % 64).astype("<u8")
+
+
+def unpack_planes(planes: np.ndarray, count: int) -> np.ndarray:
+    table = np.zeros((planes.shape[1], count), dtype=np.uint8)
+    for bit, plane in enumerate(planes):
+        unpacked = np.unpackbits(plane.view(np.uint8), axis=1, bitorder="little")
+        table |= unpacked[:, :count] << bit
+    return table
+
+
+def get_next_hop_table(
+    neighbours: np.ndarray, targets: Optional[np.ndarray] = None
+) -> np.ndarray:
+    # direction (Dir value) of the next hop from all modules to the targets, 0: none,
+    # shape (n, len(targets)), uint8 (default: all modules, n^2 bytes)
+    # one breadth-first search for all targets at once (against the links),
+    # level by level: per module, targets are bits of uint64 words (reached / frontier);
+    # directions are collected in bit planes, unpacked once at the end
+    n = neighbours.shape[1]
+    if targets is None:
+        targets = np.arange(n)
+    words, bits = get_bits(len(targets))
+    reached = np.zeros((n, words.size and words[-1] + 1), dtype="<u8")
+    reached[targets, words] = bits
+    frontier = reached.copy()
+    planes = np.zeros((3,) + reached.shape, dtype="<u8")  # (Dir value bits)
+    links = get_links(neighbours)
+    in_frontier = np.asarray(frontier.any(axis=1))
+    while in_frontier.any():
+        next_frontier = np.zeros_like(frontier)
+        for d, (starts, ends) in enumerate(links):
+            # (only links to modules in the frontier, e.g. few targets)
+            selected = in_frontier[ends]
+            frm, to = starts[selected], ends[selected]  # (frm unique per direction)
+            # targets reached by the neighbour in the last level and not yet by frm
+            new = frontier[to] & ~reached[frm]  # (first direction wins)
+            reached[frm] |= new
+            next_frontier[frm] |= new
+            for bit, plane in enumerate(planes):
+                if (d + 1) >> bit & 1:
+                    plane[frm] |= new
+        frontier = next_frontier
+        in_frontier = np.asarray(frontier.any(axis=1))
+    return unpack_planes(planes, len(targets))
+
+
+def get_unique_batches(indices: np.ndarray) -> List[np.ndarray]:
+    # positions of the indices, split into batches without duplicate indices
+    if np.unique(indices).size == indices.size:
+        return [np.arange(indices.size)]
+    order = np.argsort(indices, kind="stable")
+    ordered = indices[order]
+    positions = np.arange(indices.size)
+    first = np.concatenate([[True], ordered[1:] != ordered[:-1]])
+    rank = positions - np.maximum.accumulate(np.where(first, positions, 0))
+    return [order[rank == r] for r in range(rank.max() + 1)]
+
+
+def get_first_hop_table(neighbours: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    # direction (Dir value) of the next hop from the sources to all modules, 0: none,
+    # shape (len(sources), n), uint8
+    # same search as get_next_hop_table, from the sources along the links:
+    # reached modules inherit the first hop of the module they are reached from
+    n = neighbours.shape[1]
+    words, bits = get_bits(len(sources))
+    reached = np.zeros((n, words.size and words[-1] + 1), dtype="<u8")
+    reached[sources, words] = bits
+    frontier = np.zeros_like(reached)
+    planes = np.zeros((3,) + reached.shape, dtype="<u8")  # (Dir value bits)
+    for d, nb in enumerate(neighbours):  # (first hops, first direction wins)
+        j = np.flatnonzero(nb[sources] >= 0)
+        to = nb[sources[j]]
+        new = (reached[to, words[j]] & bits[j]) == 0
+        to, w, b = to[new], words[j][new], bits[j][new]
+        np.bitwise_or.at(reached, (to, w), b)  # (to may repeat)
+        np.bitwise_or.at(frontier, (to, w), b)
+        for bit, plane in enumerate(planes):
+            if (d + 1) >> bit & 1:
+                np.bitwise_or.at(plane, (to, w), b)
+    links = get_links(neighbours)
+    # (no module with several links to it from the same direction, e.g. grids)
+    unique_ends = all(np.unique(ends).size == ends.size for _, ends in links)
+    in_frontier = np.asarray(frontier.any(axis=1))
+    while in_frontier.any():
+        next_frontier = np.zeros_like(frontier)
+        for starts, ends in links:
+            selected = in_frontier[starts]
+            frm, to = starts[selected], ends[selected]
+            batches = [slice(None)] if unique_ends else get_unique_batches(to)
+            for batch in batches:  # (first link wins)
+                f, t = frm[batch], to[batch]
+                new = frontier[f] & ~reached[t]
+                reached[t] |= new
+                next_frontier[t] |= new
+                planes[:, t] |= planes[:, f] & new
+        frontier = next_frontier
+        in_frontier = np.asarray(frontier.any(axis=1))
+    return unpack_planes(planes, len(sources)).T.copy()
+
+
+UNREACHABLE: int = np.iinfo(np.int32).max // 2
+
+
+def get_distances(
+    neighbours: np.ndarray, module: int, reverse: bool = False
+) -> np.ndarray:
+    # hops from the module to all modules (reverse: from all modules to the module),
+    # UNREACHABLE if there is no path
+    n = neighbours.shape[1]
+    distances = np.full(n, UNREACHABLE, dtype=np.int32)
+    distances[module] = 0
+    if reverse:  # (starts of the links to each module: starts[bounds[j]:bounds[j + 1]])
+        ends = neighbours.ravel()
+        order = np.argsort(ends, kind="stable")[np.count_nonzero(ends < 0) :]
+        starts = order % n
+        bounds = np.searchsorted(ends[order], np.arange(n + 1))
+    frontier = np.array([module])
+    level = 0
+    while frontier.size > 0:
+        level += 1
+        if reverse:
+            first, count = bounds[frontier], np.diff(bounds)[frontier]
+            offsets = np.repeat(first - np.cumsum(count) + count, count)
+            reachable = starts[offsets + np.arange(offsets.size)]
+        else:
+            reachable = neighbours[:, frontier].ravel()
+            reachable = reachable[reachable >= 0]
+        frontier = np.unique(reachable[distances[reachable] == UNREACHABLE])
+        distances[frontier] = level
+    return distances
+
+
+def get_linked(neighbours: np.ndarray) -> np.ndarray:
+    # modules with at least one link to them
+    linked = np.zeros(neighbours.shape[1], dtype=bool)
+    linked[neighbours[neighbours >= 0]] = True
+    return linked
+
+
+def get_linking(neighbours: np.ndarray) -> np.ndarray:
+    # modules with at least one link from them
+    return np.asarray((neighbours >= 0).any(axis=0))
+
+
+REBUILD_SHARE: float = 0.5  # (rows + columns of all modules) to update: full rebuild
+
+
 class Router:
-    def __init__(self) -> None:
-        self.mapp = get_map()
-        self.graph = nx.from_dict_of_dicts(self.mapp)
+    # next hops of all module pairs are precomputed (shortest paths), O(1) lookups
+    # modules and links can be disabled / enabled at runtime: only the next hops
+    # between affected sources and targets are recomputed (rows or columns)
+    def __init__(self, mapp: Optional[Map] = None) -> None:
+        self.mapp = mapp if mapp is not None else get_map()
+        self.graph = nx.from_dict_of_dicts(self.mapp)  # (enabled links only)
 
-    def get_next_direction(self, frm: str, to: str) -> Dir:
+        self.names = list(self.mapp.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.all_neighbours = get_neighbour_table(self.mapp, self.index)
+        self.neighbours = self.all_neighbours.copy()  # (enabled links only)
+        self.next_hops = get_next_hop_table(self.neighbours)
+        self.distances_to: Dict[int, np.ndarray] = {}  # (by target, until links change)
+
+        self.disabled_modules: Set[str] = set()
+        self.disabled_links: Set[Tuple[str, str]] = set()  # (both directions)
+
+    def get_next_direction(self, frm: str, to: str) -> Tuple[Dir, str]:
         if frm == to:
             raise ValueError(frm + " (frm) == (to) " + to)
-        shortest_path = nx.shortest_path(self.graph, frm, to)
-        return self.mapp[frm][shortest_path[1]]["dir"], shortest_path[1]
+        i = self.index[frm]
+        d = int(self.next_hops[i, self.index[to]])
+        if d == 0:
+            raise ValueError("no path from " + frm + " to " + to)
+        return Dir(d), self.names[self.neighbours[d - 1, i]]
+
+    def route(self, box: str, frm: str, to: str, time: float) -> Tuple[Dir, str]:
+        # next hop of the given box at the given time
+        # (static routes: the same for all boxes, see reservation_router)
+        return self.get_next_direction(frm, to)
+
+    def get_hops(self, frm: str, to: str) -> int:
+        # length of the route, ValueError if there is no path
+        hops = int(self.get_distances_to(to)[self.index[frm]])
+        if hops == UNREACHABLE:
+            raise ValueError("no path from " + frm + " to " + to)
+        return hops
+
+    def get_distances_to(self, to: str) -> np.ndarray:
+        # hops from all modules to the given one (one search per target)
+        target = self.index[to]
+        if target not in self.distances_to:
+            self.distances_to[target] = get_distances(self.neighbours, target, True)
+        return self.distances_to[target]
+
+    def is_reachable(self, frm: str, to: str) -> bool:
+        return frm == to or self.next_hops[self.index[frm], self.index[to]] != 0
+
+    def disable_module(self, name: str) -> None:
+        # e.g. turntable out of service: no routes from, to or via the module
+        self.disabled_modules.add(name)
+        self._update_links(self._get_links(name)[::-1])  # (links to the module first)
+
+    def enable_module(self, name: str) -> None:
+        self.disabled_modules.discard(name)
+        self._update_links(self._get_links(name))
+
+    def disable_link(self, a: str, b: str) -> None:
+        self._check_link(a, b)
+        self.disabled_links.update([(a, b), (b, a)])
+        self._update_links([(a, b), (b, a)])
+
+    def enable_link(self, a: str, b: str) -> None:
+        self._check_link(a, b)
+        self.disabled_links.difference_update([(a, b), (b, a)])
+        self._update_links([(a, b), (b, a)])
+
+    def _check_link(self, a: str, b: str) -> None:
+        if b not in self.mapp[a] and a not in self.mapp[b]:
+            raise ValueError("no link between " + a + " and " + b)
+
+    def _get_links(self, name: str) -> List[Tuple[str, str]]:
+        # all links from and to the module (from first: while enabling the module,
+        # routes from it are set before other modules route via it)
+        return [(name, to) for to in self.mapp[name]] + [
+            (frm, name) for frm in self.mapp if name in self.mapp[frm]
+        ]
+
+    def _is_enabled(self, frm: str, to: str) -> bool:
+        return (
+            frm not in self.disabled_modules
+            and to not in self.disabled_modules
+            and (frm, to) not in self.disabled_links
+        )
+
+    def _update_links(self, links: List[Tuple[str, str]]) -> None:
+        # applies the enabled state of the given (directed) links at once
+        # (one search per changed link at most, e.g. all links of a module)
+        disabled: List[Tuple[int, int]] = []  # (module, direction)
+        enabled: List[Tuple[int, int]] = []
+        for frm, to in links:
+            if to not in self.mapp[frm]:
+                continue
+            i, d = self.index[frm], self.mapp[frm][to]["dir"].value - 1
+            is_enabled = self._is_enabled(frm, to)
+            if is_enabled != (self.neighbours[d, i] != -1):
+                (enabled if is_enabled else disabled).append((i, d))
+        if disabled:
+            self._disable_links(disabled)
+        if enabled:
+            self._enable_links(enabled)
+
+    def _disable_links(self, links: List[Tuple[int, int]]) -> None:
+        # distances only grow, affected pairs s -> t are routed over a disabled link:
+        # - columns: targets whose distance from i grows (first disabled link i -> j
+        #   of the route, i without links to it afterwards: only its row)
+        # - rows: sources with a shortest path to j over the link (last disabled
+        #   link, j without links from it afterwards: only its column)
+        remaining = self.neighbours.copy()
+        for i, d in links:
+            remaining[d, i] = -1
+        first = [(i, j) for i, j in self._get_ends(links) if get_linked(remaining)[i]]
+        last = [(i, j) for i, j in self._get_ends(links) if get_linking(remaining)[j]]
+        from_before = {i: get_distances(self.neighbours, i) for i, _ in first}
+        to = {k: get_distances(self.neighbours, k, True) for k in np.unique(last)}
+        for i, d in links:
+            self._set_link(i, d, -1)
+        targets = np.zeros(len(self.names), dtype=bool)
+        for i, distances in from_before.items():
+            targets |= get_distances(self.neighbours, i) > distances
+        sources = np.zeros(len(self.names), dtype=bool)
+        for i, j in last:
+            sources |= to[i] + 1 == to[j]
+        self._recompute(links, last, sources, targets)
+
+    def _enable_links(self, links: List[Tuple[int, int]]) -> None:
+        # distances only shrink, a shorter route s -> t uses a new link:
+        # - columns: first new link i -> j, the route is also shorter from i
+        #   (i without old links to it: only its row)
+        # - rows: last new link i -> j, the route to j is shorter from s
+        #   (j without old links from it: only its column)
+        # next hops of all other pairs stay on shortest paths
+        ends = self._get_ends(links)
+        first = [(i, j) for i, j in ends if get_linked(self.neighbours)[i]]
+        last = [(i, j) for i, j in ends if get_linking(self.neighbours)[j]]
+        from_before = {i: get_distances(self.neighbours, i) for i, _ in first}
+        to_before = {j: get_distances(self.neighbours, j, True) for _, j in last}
+        for i, d in links:
+            self._set_link(i, d, self.all_neighbours[d, i])
+        targets = np.zeros(len(self.names), dtype=bool)
+        from_j: Dict[int, np.ndarray] = {}
+        for i, j in first:
+            if j not in from_j:
+                from_j[j] = get_distances(self.neighbours, j)
+            targets |= from_j[j] + 1 < from_before[i]
+        sources = np.zeros(len(self.names), dtype=bool)
+        to_i: Dict[int, np.ndarray] = {}
+        for i, j in last:
+            if i not in to_i:
+                to_i[i] = get_distances(self.neighbours, i, True)
+            sources |= to_i[i] + 1 < to_before[j]
+        self._recompute(links, last, sources, targets)
+
+    def _get_ends(self, links: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        # (module, direction) -> (module, neighbour)
+        return [(i, int(self.all_neighbours[d, i])) for i, d in links]
+
+    def _set_link(self, i: int, d: int, to: int) -> None:
+        self.neighbours[d, i] = to
+        self.distances_to.clear()
+        a, b = self.names[i], self.names[self.all_neighbours[d, i]]
+        if to == -1:
+            if self.graph.has_edge(a, b):
+                self.graph.remove_edge(a, b)
+        else:
+            self.graph.add_edge(a, b, **self.mapp[a][b])
+
+    def _recompute(
+        self,
+        links: List[Tuple[int, int]],
+        last: List[Tuple[int, int]],
+        sources: np.ndarray,
+        targets: np.ndarray,
+    ) -> None:
+        # rows of the sources or columns of the targets, whichever are fewer
+        # (the rows of the link starts / the columns of ends skipped for the rows
+        # always), many: one search for all modules is about as fast
+        ends = self._get_ends(links)
+        starts = np.unique([i for i, _ in ends])
+        rows = np.union1d(np.flatnonzero(sources), starts)
+        columns = np.setdiff1d([j for _, j in ends], [j for _, j in last])
+        if len(rows) + len(columns) > len(starts) + np.count_nonzero(targets):
+            rows, columns = starts, np.flatnonzero(targets)
+        if len(rows) + len(columns) > len(self.names) * REBUILD_SHARE:
+            self.next_hops = get_next_hop_table(self.neighbours)
+            return
+        self.next_hops[rows] = get_first_hop_table(self.neighbours, rows)
+        if len(columns) > 0:
+            self.next_hops[:, columns] = get_next_hop_table(self.neighbours, columns)
 
 
 if __name__ == "__main__":
     router = Router()
     print(router.graph)
-    print(nx.shortest_path(router.graph, "t_1_1", "t_8_5"))
-    print(router.get_next_direction("t_1_1", "t_2_2"))
-    print(router.get_next_direction("t_1_1", "t_8_5"))
+    print(nx.shortest_path(router.graph, "t_1_1", "t_6_3"))
+    print(router.get_next_direction("t_1_1", "t_3_2"))
+    print(router.get_next_direction("t_1_1", "t_6_3"))
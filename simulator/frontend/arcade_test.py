@@ -4,8 +4,6 @@ import sys
 
 sys.path.append(".")
 
-import asyncio
-import threading
 from typing import Dict, List
 
 import arcade
@@ -16,8 +14,10 @@ from instances.instance_1.instance_1 import World1
 from root import root_directory
 from server.module_agent.module_agent import Box, ModuleAgent
 from server.routing.router import Router
-from simulator.module_level.module_level import Module2ControlParent
+from simulator.module_level.module_level import ModuleControls, create_controls
 from simulator.modules.turntable import WIDTH as MODULE_WIDTH
+from simulator.scheduler.scheduler import Scheduler
+from simulator.scheduler.virtual_time_loop import VirtualTimeLoop
 from simulator.space.collidable_element import CollidableElement, Rectangle, Segment
 from simulator.space.element import Element
 from simulator.space.world import World
@@ -152,10 +152,10 @@ class MyView(arcade.View):
         """Draw this view. GUI elements are automatically drawn."""
         arcade.start_render()
         if step != 0:
-            self.world_drawer.world.step(time=step)
-            for c in controller:
-                c.loop(int(1000 / 60))
+            scheduler.tick()  # world + controllers with the same time step
         self.world_drawer.draw_world()
+        if box.current_target is None:
+            return  # (no target yet)
         arcade.draw_text(
             "current_target: " + box.current_target, 50, 400, arcade.color.BLACK
         )
@@ -179,9 +179,10 @@ def add_sprite(element: CollidableElement):
     sprites[element] = sprite
 
 
-controller: List[Module2ControlParent] = []
+controller: ModuleControls
 agents: List[ModuleAgent] = []
 box: Box
+scheduler: Scheduler
 
 
 def create_world() -> World:
@@ -189,15 +190,18 @@ def create_world() -> World:
     world = World1()
     router = Router()
     agent_dict = {}
+    global controller  # all modules hosted by one worker process per core
+    controller = create_controls(sum(world.modules, []))
+    connections = controller.get_connections()
     for t in sum(world.modules, []):
         add_sprite(t.belt.belt_sprite_holder)
 
-        control = Module2ControlParent(t)
-        controller.append(control)
-        agent = ModuleAgent(
-            t.name, control.module_parent_connection, router, agent_dict
-        )
+        agent = ModuleAgent(t.name, connections[t.name], router, agent_dict)
         agents.append(agent)
+    global scheduler
+    # agents run on simulated time, before the module controls of each tick
+    # (confirmations of the last controller tick are delivered at its time)
+    scheduler = Scheduler(world, [event_loop, controller], physics_step=STEP)
     global box  # show current target
     box = Box("box_1", list(router.mapp.keys()))
     box.current_target = "t_1_2"
@@ -206,13 +210,11 @@ def create_world() -> World:
     global BUTTON_2_ACTION
     BUTTON_2_ACTION = world.modules[0][0].spawn_box  # physical box_1
     global BUTTON_3_ACTION
-    BUTTON_3_ACTION = lambda: asyncio.run_coroutine_threadsafe(
-        agents[0].forward_box_async(), event_loop
-    )
+    BUTTON_3_ACTION = lambda: event_loop.create_task(agents[0].forward_box_async())
     return world
 
 
-event_loop = asyncio.new_event_loop()
+event_loop = VirtualTimeLoop()
 
 
 def main():
@@ -220,7 +222,6 @@ def main():
     world = create_world()
     view = MyView(WorldDrawer(world))
     window.show_view(view)
-    threading.Thread(target=event_loop.run_forever).start()
     BUTTON_2_ACTION()
     BUTTON_3_ACTION()
     arcade.run()
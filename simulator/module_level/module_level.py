@@ -1,64 +1,450 @@
 # helper class to connect a running simulation with emulated module controls running in own processes
 # just passes control to the sub-process and waits for confirmation signal
 
-from multiprocessing import Array, Pipe, Process
+import math
+import os
+import time
+from contextlib import contextmanager
+from enum import Enum
+from multiprocessing import Pipe, Process
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
 
-from module_control.emulation.cffi.module import AIV, start
+from module_control.emulation.cffi.module import (
+    InstanceHost,
+    InstanceIO,
+    ModuleInstance,
+    load_module,
+    start,
+    start_pool_worker,
+)
+from module_control.emulation.clock import ClockMode, LockstepClock, create_clock
+from module_control.emulation.local_connection import LocalPipe
+from module_control.emulation.process_image import Input, Output, ProcessImage
+from module_control.emulation.ring_buffer import RingPipe
 from simulator.modules.turntable import TurnTable
 
 
-def bool_2_int(value: bool) -> int:
-    return 1 if value else 0  # tbd: needed?
+def apply_rotation(tt: TurnTable, rotation: int) -> None:
+    # rotation: -1, 0, 1
+    if tt.current_rotation_direction() != rotation:
+        if tt.current_rotation_direction() != 0:
+            tt.stop_turning()
+        if rotation == 1:
+            tt.turn_clockwise()
+        if rotation == -1:
+            tt.turn_counter_clockwise()
 
 
-class Module2ControlParent:
-    def __init__(self, tt: TurnTable) -> None:
+def apply_translation(tt: TurnTable, translation: int) -> None:
+    # translation: -1, 0, 1
+    if tt.belt.current_direction != translation:
+        if tt.current_translation_direction() != 0:
+            tt.stop_move()
+        if translation == 1:
+            tt.start_move_forward()
+        if translation == -1:
+            tt.start_move_backward()
+
+
+class ModuleSlot:
+    # shared memory of one emulated module: part of a process image + serial line
+    # (allocated before the module process is started, can be reused by other modules)
+    def __init__(self, image: Optional[ProcessImage] = None, index: int = 0) -> None:
+        self.image = image if image is not None else ProcessImage(1)
+        self.index = index
+
+        # serial line (shared memory ring buffers, 64 bytes per direction)
+        self.module_parent_connection, self.module_child_connection = RingPipe()
+
+    def reset(self) -> None:
+        # (only while no module process is using the slot)
+        self.image.clear(self.index)
+        self.module_parent_connection.clear()
+
+
+def create_slots(count: int) -> List[ModuleSlot]:
+    # slots sharing one process image
+    image = ProcessImage(max(1, count))
+    return [ModuleSlot(image, i) for i in range(count)]
+
+
+class ModuleIO:
+    # parent side of one emulated module: process image + serial connection
+    def __init__(self, tt: TurnTable, slot: Optional[ModuleSlot] = None) -> None:
         self.tt = tt
+        slot = slot if slot is not None else ModuleSlot()
+        self.image = slot.image
+        self.index = slot.index
+        self.module_parent_connection = slot.module_parent_connection
+        self.module_child_connection = slot.module_child_connection
 
-        self.clock_connection, clock_connection = Pipe()
-        ack_connection, self.ack_connection = Pipe()  # todo: replace by duplex clock
+        # last written values (change detection)
+        self.inputs = self.image.read_inputs(self.index)
 
-        self.module_parent_connection, module_child_connection = Pipe()
-        # tbd: limit capacity (64 Byte), inject from outside
+    def get_instance(self) -> ModuleInstance:
+        # child side
+        return ModuleInstance(
+            self.image, self.index, self.module_child_connection, self.tt.name
+        )
 
-        self.array = Array("i", AIV.SIZE)  # tbd: proper enum
+    def write_sensors(self) -> None:
+        # only changed sensor bits are written
+        inputs = 0
+        if self.tt.is_light_barrier_active_sensor():
+            inputs |= 1 << Input.LIGHT_BARRIER
+        if self.tt.is_not_turned_sensor():
+            inputs |= 1 << Input.ENDLAGE_0
+        if self.tt.is_fully_turned_sensor():
+            inputs |= 1 << Input.ENDLAGE_90
+        if inputs != self.inputs:
+            self.image.toggle_inputs(self.index, inputs ^ self.inputs)
+            self.inputs = inputs
+
+    def apply_actuators(self) -> None:
+        # only outputs differing from the state of the turntable start / stop it
+        # (compared with the turntable: it also stops by itself, e.g. when reset)
+        apply_rotation(self.tt, self.image.read_output(self.index, Output.ROTATION))
+        apply_translation(
+            self.tt, self.image.read_output(self.index, Output.TRANSLATION)
+        )
+
+
+class Module2ControlParent(ModuleIO):
+    # one module control process per module
+    def __init__(
+        self,
+        tt: TurnTable,
+        clock_mode: ClockMode = ClockMode.PIPE,
+        slot: Optional[ModuleSlot] = None,
+    ) -> None:
+        super().__init__(tt, slot)
+
+        self.clock = create_clock(clock_mode)
 
         self.conveyor_control_proc = Process(
             target=start,
             args=(
-                clock_connection,
-                ack_connection,
-                self.array,
-                module_child_connection,
+                self.clock,
+                self.image,
+                self.index,
+                self.module_child_connection,
                 self.tt.name,
             ),
         )
         self.conveyor_control_proc.start()
 
     def loop(self, passed_time_ms: int) -> None:
-        self.array[AIV.LIGHT_BARRIER] = bool_2_int(
-            self.tt.is_light_barrier_active_sensor()
+        self.write_sensors()
+        self.release(passed_time_ms)
+        self.wait_ack()
+        self.apply_actuators()
+
+    def release(self, passed_time_ms: int) -> None:
+        self.clock.release(passed_time_ms)  # passes control to module-process
+
+    def wait_ack(self) -> None:
+        self.clock.wait_ack()  # blocks
+
+
+class ControllerGroup:
+    # ticks all module controls at once: all processes are released before waiting,
+    # so the C loops run in parallel (per tick: max instead of sum of loop times)
+    def __init__(self, controllers: Sequence[Module2ControlParent]) -> None:
+        self.controllers = list(controllers)
+
+    def get_connections(self) -> Dict[str, Any]:
+        # serial connections to the modules (for module agents) by module name
+        return {c.tt.name: c.module_parent_connection for c in self.controllers}
+
+    def loop(self, passed_time_ms: int) -> None:
+        for controller in self.controllers:
+            controller.write_sensors()
+        for controller in self.controllers:
+            controller.release(passed_time_ms)
+        for controller in self.controllers:
+            controller.wait_ack()
+        for controller in self.controllers:
+            controller.apply_actuators()
+
+    def terminate(self) -> None:
+        for controller in self.controllers:
+            controller.conveyor_control_proc.terminate()
+
+
+class StartupReport:
+    # wall time per startup phase (s)
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase: str, duration: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def report(self) -> str:
+        return ", ".join(
+            [
+                phase + ": " + "%.1f" % (d * 1000) + " ms"
+                for phase, d in self.phases.items()
+            ]
+            + ["total: " + "%.1f" % (self.total() * 1000) + " ms"]
+        )
+
+
+SLOTS_PER_WORKER: int = 64  # max. modules per worker and assignment
+
+
+class WorkerPool:
+    # pre-started ("warm") worker processes: the C module is loaded before forking,
+    # shared memory for the modules is allocated up front (inherited by the workers),
+    # so assigning modules only sets up the C states (no process start, no import);
+    # workers are recycled between scenario runs
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,  # None: number of cores
+        slots_per_worker: int = SLOTS_PER_WORKER,
+        clock_mode: ClockMode = ClockMode.SHARED_MEMORY,
+    ) -> None:
+        if pool_size is None:
+            pool_size = os.cpu_count() or 1
+        if pool_size < 1:
+            raise ValueError("invalid pool_size: " + str(pool_size))
+        if slots_per_worker < 1:
+            raise ValueError("invalid slots_per_worker: " + str(slots_per_worker))
+        self.slots_per_worker = slots_per_worker
+        self.startup = StartupReport()
+
+        with self.startup.measure("import"):
+            load_module()  # (inherited by forked workers)
+
+        with self.startup.measure("allocate"):
+            self.clocks = [create_clock(clock_mode) for _ in range(pool_size)]
+            all_slots = create_slots(pool_size * slots_per_worker)
+            self.slots = [
+                all_slots[i * slots_per_worker : (i + 1) * slots_per_worker]
+                for i in range(pool_size)
+            ]
+            self.control_connections = []
+            child_connections = []
+            for _ in range(pool_size):
+                parent_connection, child_connection = Pipe()
+                self.control_connections.append(parent_connection)
+                child_connections.append(child_connection)
+
+        with self.startup.measure("fork"):
+            self.worker_procs: List[Process] = []
+            for i in range(pool_size):
+                slots = [
+                    (slot.image, slot.index, slot.module_child_connection)
+                    for slot in self.slots[i]
+                ]
+                proc = Process(
+                    target=start_pool_worker,
+                    args=(
+                        self.clocks[i],
+                        child_connections[i],
+                        slots,
+                        "worker_" + str(i),
+                    ),
+                )
+                proc.start()
+                self.worker_procs.append(proc)
+
+        with self.startup.measure("warm up"):
+            # (includes the slowest worker loading the C module)
+            warm_up_times = [c.recv() for c in self.control_connections]
+        self.worker_warm_up_time = max(warm_up_times)
+
+        self.active_workers: Optional[List[int]] = None  # (None: not assigned)
+
+    @property
+    def pool_size(self) -> int:
+        return len(self.worker_procs)
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size * self.slots_per_worker
+
+    def assign(
+        self, tts: Sequence[TurnTable]
+    ) -> List[Tuple[LockstepClock, List[ModuleIO]]]:
+        # distributes the modules round-robin, returns (clock, modules) per active worker
+        if self.active_workers is not None:
+            raise RuntimeError("worker pool already assigned")
+        if len(tts) > self.capacity:
+            raise ValueError("too many modules: " + str(len(tts)))
+        assigned: List[Tuple[LockstepClock, List[ModuleIO]]] = []
+        with self.startup.measure("assign"):
+            self.active_workers = list(range(min(self.pool_size, len(tts))))
+            for i in self.active_workers:
+                worker_tts = tts[i :: self.pool_size]
+                modules = []
+                for slot, tt in zip(self.slots[i], worker_tts):
+                    slot.reset()
+                    modules.append(ModuleIO(tt, slot))
+                self.control_connections[i].send(
+                    [(s, tt.name) for s, tt in enumerate(worker_tts)]
+                )
+                assigned.append((self.clocks[i], modules))
+            for i in self.active_workers:
+                self.control_connections[i].recv()  # modules set up
+        return assigned
+
+    def recycle(self) -> None:
+        # ends the current assignment, workers keep running (warm)
+        if self.active_workers is None:
+            return
+        for i in self.active_workers:
+            self.clocks[i].stop()
+        for i in self.active_workers:
+            self.clocks[i].wait_ack()
+        self.active_workers = None
+
+    def shutdown(self) -> None:
+        for proc in self.worker_procs:
+            proc.terminate()
+        for proc in self.worker_procs:
+            proc.join()
+        self.active_workers = None
+
+
+class ControllerPool:
+    # many modules per worker process: process count scales with cores, not modules
+    # (modules of a worker are looped one after the other, workers in parallel)
+    # runs on a given (pre-started) worker pool, or on an own one
+    def __init__(
+        self,
+        tts: Sequence[TurnTable],
+        pool_size: Optional[int] = None,  # None: number of cores
+        clock_mode: ClockMode = ClockMode.SHARED_MEMORY,
+        worker_pool: Optional[WorkerPool] = None,
+    ) -> None:
+        self.owns_worker_pool = worker_pool is None
+        if worker_pool is None:
+            if pool_size is None:
+                pool_size = os.cpu_count() or 1
+            if pool_size < 1:
+                raise ValueError("invalid pool_size: " + str(pool_size))
+            pool_size = max(1, min(pool_size, len(tts)))
+            worker_pool = WorkerPool(
+                pool_size, max(1, math.ceil(len(tts) / pool_size)), clock_mode
+            )
+        self.worker_pool = worker_pool
+
+        assigned = worker_pool.assign(tts)
+        self.clocks = [clock for clock, _ in assigned]
+        modules_by_worker = [modules for _, modules in assigned]
+        self.modules: List[ModuleIO] = []  # (same order as tts)
+        for i in range(len(tts)):
+            self.modules.append(
+                modules_by_worker[i % len(assigned)][i // len(assigned)]
+            )
+
+    def get_connections(self) -> Dict[str, Any]:
+        return {m.tt.name: m.module_parent_connection for m in self.modules}
+
+    def loop(self, passed_time_ms: int) -> None:
+        for module in self.modules:
+            module.write_sensors()
+        for clock in self.clocks:
+            clock.release(passed_time_ms)
+        for clock in self.clocks:
+            clock.wait_ack()
+        for module in self.modules:
+            module.apply_actuators()
+
+    def terminate(self) -> None:
+        # a given worker pool is only recycled (can be assigned again)
+        if self.owns_worker_pool:
+            self.worker_pool.shutdown()
+        else:
+            self.worker_pool.recycle()
+
+
+class TurnTableIO(InstanceIO):
+    # in-process: C callbacks bound to the turntable directly (no process image)
+    def __init__(self, tt: TurnTable) -> None:
+        self.tt = tt
+        self.name = tt.name
+        self.module_parent_connection, self.module_child_connection = LocalPipe()
+
+    def light_barrier(self) -> bool:
+        return self.tt.is_light_barrier_active_sensor()
+
+    def endlage_0(self) -> bool:
+        return self.tt.is_not_turned_sensor()
+
+    def endlage_90(self) -> bool:
+        return self.tt.is_fully_turned_sensor()
+
+    def set_rotation(self, dir: int) -> None:
+        apply_rotation(self.tt, dir)
+
+    def set_translation(self, dir: int) -> None:
+        apply_translation(self.tt, dir)
+
+    def serial_read(self) -> int:
+        if self.module_child_connection.poll():
+            return self.module_child_connection.recv()
+        return -1
+
+    def serial_write(self, b: int) -> None:
+        self.module_child_connection.send(b)
+
+
+class InProcessController:
+    # all module controls run in the simulation process (no processes, no IPC),
+    # e.g. for small layouts and tests
+    def __init__(self, tts: Sequence[TurnTable]) -> None:
+        self.modules = [TurnTableIO(tt) for tt in tts]
+        self.host = InstanceHost(self.modules)
+
+    def loop(self, passed_time_ms: int) -> None:
+        self.host.loop(passed_time_ms)
+
+    def get_connections(self) -> Dict[str, Any]:
+        return {m.tt.name: m.module_parent_connection for m in self.modules}
+
+    def terminate(self) -> None:
+        self.host.close()
+
+
+class ControlMode(Enum):
+    PROCESS_PER_MODULE = "process_per_module"
+    POOL = "pool"  # several modules per worker process
+    IN_PROCESS = "in_process"
+
+
+class ModuleControls(Protocol):
+    def loop(self, passed_time_ms: int) -> None: ...
+
+    def get_connections(self) -> Dict[str, Any]: ...
+
+    def terminate(self) -> None: ...
+
+
+def create_controls(
+    tts: Sequence[TurnTable], mode: ControlMode = ControlMode.POOL
+) -> ModuleControls:
+    # controls of all given modules, ticked together
+    if mode == ControlMode.PROCESS_PER_MODULE:
+        return ControllerGroup(
+            [
+                Module2ControlParent(tt, ClockMode.SHARED_MEMORY, slot)
+                for tt, slot in zip(tts, create_slots(len(tts)))
+            ]
         )
-        self.array[AIV.ENDLAGE_0] = bool_2_int(self.tt.is_not_turned_sensor())
-        self.array[AIV.ENDLAGE_90] = bool_2_int(self.tt.is_fully_turned_sensor())
-
-        self.clock_connection.send(passed_time_ms)  # passes control to module-process
-        success: bool = self.ack_connection.recv()  # blocks
-
-        rotation: int = self.array[AIV.ROTATION]  # -1, 0, 1
-        if self.tt.current_rotation_direction() != rotation:
-            if self.tt.current_rotation_direction() != 0:
-                self.tt.stop_turning()
-            if rotation == 1:
-                self.tt.turn_clockwise()
-            if rotation == -1:
-                self.tt.turn_counter_clockwise()
-
-        translation: int = self.array[AIV.TRANSLATION]  # -1, 0, 1
-        if self.tt.belt.current_direction != translation:
-            if self.tt.current_translation_direction() != 0:
-                self.tt.stop_move()
-            if translation == 1:
-                self.tt.start_move_forward()
-            if translation == -1:
-                self.tt.start_move_backward()
+    if mode == ControlMode.POOL:
+        return ControllerPool(tts)
+    if mode == ControlMode.IN_PROCESS:
+        return InProcessController(tts)
+    raise ValueError("unknown control mode: " + str(mode))
@@ -0,0 +1,129 @@
+# headless driver of a simulation: advances the world and all module controllers
+# in lockstep, independent of any frontend frame rate
+
+import time
+from typing import Optional, Protocol, Sequence
+
+from simulator.space.world import World
+
+PHYSICS_STEP: float = 1 / 30  # s
+
+
+class Controller(Protocol):
+    def loop(self, passed_time_ms: int) -> None: ...
+
+
+class Scheduler:
+    def __init__(
+        self,
+        world: World,
+        controllers: Sequence[Controller] = (),
+        physics_step: float = PHYSICS_STEP,
+        sub_steps: int = 1,  # physics steps per controller tick
+        real_time_factor: Optional[float] = None,  # None: as fast as possible
+        event_driven: bool = False,  # jump between events within a tick
+    ) -> None:
+        if physics_step <= 0 or sub_steps < 1:
+            raise ValueError("invalid step: " + str((physics_step, sub_steps)))
+        if real_time_factor is not None and real_time_factor <= 0:
+            raise ValueError("invalid real_time_factor: " + str(real_time_factor))
+        self.world = world
+        self.controllers = list(controllers)
+        self.physics_step = physics_step
+        self.sub_steps = sub_steps
+        self.real_time_factor = real_time_factor
+        self.event_driven = event_driven
+
+        self.simulated_time = 0.0  # s
+        self.wall_time = 0.0  # s, spent in run/tick
+        self.ticks = 0
+        self.physics_steps = 0
+        self._passed_ms_remainder = 0.0  # (controllers get whole ms)
+
+    def get_tick_time(self) -> float:
+        return self.physics_step * self.sub_steps
+
+    def tick(self) -> None:
+        # 1. physics, 2. controllers (with the time passed in the meantime)
+        start = time.perf_counter()
+        if self.event_driven:
+            remaining = self.get_tick_time()
+            while remaining > 0:
+                remaining -= self.world.step_to_next_event(
+                    max_time=remaining, fixed_step=self.physics_step
+                )
+                self.physics_steps += 1
+        else:
+            for _ in range(self.sub_steps):
+                self.world.step(self.physics_step)
+                self.physics_steps += 1
+        self.simulated_time += self.get_tick_time()
+
+        passed_ms = self._passed_ms_remainder + self.get_tick_time() * 1000
+        passed_ms_int = int(passed_ms)
+        self._passed_ms_remainder = passed_ms - passed_ms_int
+        for controller in self.controllers:
+            controller.loop(passed_ms_int)
+        self.ticks += 1
+        self.wall_time += time.perf_counter() - start
+
+    def run(self, duration: float) -> None:
+        # runs ticks for the given simulated time (s)
+        end = self.simulated_time + duration
+        start_wall = time.perf_counter()
+        start_simulated = self.simulated_time
+        while self.simulated_time < end - 1e-9:
+            self.tick()
+            if self.real_time_factor is not None:
+                target_wall = (
+                    start_wall
+                    + (self.simulated_time - start_simulated) / self.real_time_factor
+                )
+                sleep_start = time.perf_counter()
+                if target_wall > sleep_start:
+                    time.sleep(target_wall - sleep_start)
+                    # (actual time slept, may be longer than requested)
+                    self.wall_time += time.perf_counter() - sleep_start
+
+    def get_speed(self) -> float:
+        # achieved simulated seconds per wall-clock second
+        if self.wall_time == 0:
+            return 0
+        return self.simulated_time / self.wall_time
+
+    def report(self) -> str:
+        return (
+            "simulated: "
+            + str(round(self.simulated_time, 3))
+            + " s, wall: "
+            + str(round(self.wall_time, 3))
+            + " s, speed: "
+            + str(round(self.get_speed(), 1))
+            + "x, ticks: "
+            + str(self.ticks)
+            + ", physics steps: "
+            + str(self.physics_steps)
+        )
+
+
+if __name__ == "__main__":
+    # headless run of the sample layout with emulated module controls
+    from instances.instance_1.instance_1 import World1
+    import sys
+
+    from simulator.module_level.module_level import (
+        ControlMode,
+        ControllerPool,
+        create_controls,
+    )
+
+    # optional argument: control mode (pool, process_per_module, in_process)
+    mode = ControlMode(sys.argv[1]) if len(sys.argv) > 1 else ControlMode.POOL
+    world = World1()
+    controls = create_controls(sum(world.modules, []), mode)
+    if isinstance(controls, ControllerPool):
+        print("startup - " + controls.worker_pool.startup.report())
+    scheduler = Scheduler(world, [controls], sub_steps=2)
+    scheduler.run(duration=60)
+    print(mode.value + " - " + scheduler.report())
+    controls.terminate()
@@ -0,0 +1,72 @@
+# asyncio event loop on simulated time: timers (asyncio.sleep, call_later, ...) fire
+# when the simulation reaches their time, independent of the wall-clock time
+# driven by the scheduler like a module controller (no own thread, no run_forever)
+# connections (e.g. serial lines to the modules) can be waited for without polling
+# timers: readable connections are detected whenever the loop runs
+
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    def __init__(self) -> None:
+        super().__init__()
+        self._virtual_time = 0.0  # s
+        self._readable_waiters: List[Tuple[Any, "asyncio.Future[None]"]] = []
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def loop(self, passed_time_ms: int) -> None:
+        # (scheduler controller interface)
+        self.advance(passed_time_ms / 1000)
+
+    def advance(self, seconds: float) -> None:
+        # runs all callbacks due until the new time, timers at their own time
+        if seconds < 0:
+            raise ValueError("invalid time: " + str(seconds))
+        end = self._virtual_time + seconds
+        self.run_until_idle()
+        next_timer = self._get_next_timer()
+        while next_timer is not None and next_timer <= end:
+            self._virtual_time = max(self._virtual_time, next_timer)
+            self.run_until_idle()
+            next_timer = self._get_next_timer()
+        self._virtual_time = end
+        self.run_until_idle()
+
+    def wait_readable(self, connection: Any) -> "asyncio.Future[None]":
+        # done as soon as the connection has data to read (connection.poll())
+        future = self.create_future()
+        self._readable_waiters.append((connection, future))
+        return future
+
+    def _notify_readable(self) -> bool:
+        # True if any waiter was woken up
+        waiting = []
+        notified = False
+        for connection, future in self._readable_waiters:
+            if future.done():  # (cancelled)
+                continue
+            if connection.poll():
+                future.set_result(None)
+                notified = True
+            else:
+                waiting.append((connection, future))
+        self._readable_waiters = waiting
+        return notified
+
+    def run_until_idle(self) -> None:
+        # runs ready callbacks (and polls for i/o) until nothing is left at this time
+        while True:
+            self._notify_readable()
+            self.call_soon(self.stop)
+            self.run_forever()  # (one iteration, never waits)
+            if not self._ready and not self._notify_readable():  # type: ignore
+                next_timer = self._get_next_timer()
+                if next_timer is None or next_timer > self._virtual_time:
+                    return
+
+    def _get_next_timer(self) -> Optional[float]:
+        timers = self._scheduled  # type: ignore
+        return min((t.when() for t in timers if not t.cancelled()), default=None)
@@ -1,23 +1,41 @@
-from typing import Any, Dict, Iterable, Set
+from typing import Dict, Optional, Set
 
+from simulator.space.broad_phase import BroadPhase
 from simulator.space.collidable_element import CollidableElement, Tag, TagCombination
-from simulator.space.collision_checker import check_collisions
-from simulator.space.element import Element
+from simulator.space.collision_checker import check_collisions, get_elements_with_tag
+from simulator.space.contact_cache import ContactCache
+from simulator.space.tag_registry import TaggedElements, TagRegistry
 
 
-def update_element_attachments(elements: Iterable[Element[Any]]) -> None:
+def update_element_attachments(
+    elements: TaggedElements,
+    broad_phase: Optional[BroadPhase] = None,
+    contact_cache: Optional[ContactCache] = None,
+) -> None:
     # change element attachments according to collisions (Tags 3/4)
-    collisions = check_collisions(elements, TagCombination.POINT_AND_MOVING_SHAPE)
+    # with contact_cache, only elements which moved or changed contacts are checked
+    if not isinstance(elements, TagRegistry):
+        elements = list(elements)  # (attachments change the tree)
     collisions_dict: Dict[CollidableElement, Set[CollidableElement]] = {}
-    for movable_point, point_moving_shape in collisions:
-        collisions_dict[movable_point] = collisions_dict.get(movable_point, set())
-        collisions_dict[movable_point].add(point_moving_shape)
-    for child in elements:
-        if isinstance(child, CollidableElement) and Tag.MOVABLE_POINT in child.tags:
-            colliding_with = collisions_dict.get(child, set())
-            # 1. check for tagged children not colliding with parents (and detach)
-            if child._parent not in colliding_with and child._parent is not None:
-                child._parent.detach(child)
-                # 2. check for these children for new collisions (and attach)
-                if len(colliding_with) > 0:
-                    colliding_with.pop().attach(child)
+    changed: Optional[Set[CollidableElement]] = None
+    if contact_cache is not None:
+        changed = contact_cache.update(elements).get_elements()
+    else:
+        collisions = check_collisions(
+            elements, TagCombination.POINT_AND_MOVING_SHAPE, broad_phase=broad_phase
+        )
+        for movable_point, point_moving_shape in collisions:
+            collisions_dict[movable_point] = collisions_dict.get(movable_point, set())
+            collisions_dict[movable_point].add(point_moving_shape)
+    for child in get_elements_with_tag(elements, Tag.MOVABLE_POINT):
+        if contact_cache is not None and changed is not None:
+            if child._sleeping and child not in changed:
+                continue  # same as last check
+            collisions_dict[child] = contact_cache.get_partners(child).copy()
+        colliding_with = collisions_dict.get(child, set())
+        # 1. check for tagged children not colliding with parents (and detach)
+        if child._parent not in colliding_with and child._parent is not None:
+            child._parent.detach(child)
+            # 2. check for these children for new collisions (and attach)
+            if len(colliding_with) > 0:
+                colliding_with.pop().attach(child)
@@ -0,0 +1,122 @@
+# broad phase of the collision detection:
+# cheap pre-selection of element pairs which might collide,
+# only these candidates are passed to the (more expensive) exact checks
+
+import math
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from simulator.space.collidable_element import CollidableElement
+
+CELL_SIZE: float = 10
+AABB_MARGIN: float = 1e-9  # keep bounds conservative despite rounding errors
+
+AABB = Tuple[float, float, float, float]  # x_min, y_min, x_max, y_max
+Pair = Tuple[CollidableElement, CollidableElement]
+
+
+def get_global_aabb(element: CollidableElement, radius: float) -> AABB:
+    # axis-aligned bounds of the circle around the elements global position
+    x, y, _ = element.get_global_xy_rot()
+    r = radius + AABB_MARGIN
+    return (x - r, y - r, x + r, y + r)
+
+
+class BroadPhase:
+    def get_candidate_pairs(
+        self,
+        tagged_1s: Iterable[CollidableElement],
+        tagged_2s: Iterable[CollidableElement],
+        radius_1: Callable[[CollidableElement], float],
+        radius_2: Callable[[CollidableElement], float],
+        only_awake: bool = False,
+    ) -> Iterable[Pair]:
+        # only_awake: skip pairs of two sleeping elements
+        raise NotImplementedError()
+
+
+class AllPairs(BroadPhase):
+    # reference mode: every element is a candidate for every other element
+    def get_candidate_pairs(
+        self,
+        tagged_1s: Iterable[CollidableElement],
+        tagged_2s: Iterable[CollidableElement],
+        radius_1: Callable[[CollidableElement], float],
+        radius_2: Callable[[CollidableElement], float],
+        only_awake: bool = False,
+    ) -> Iterable[Pair]:
+        tagged_2s = list(tagged_2s)
+        return [
+            (t1, t2)
+            for t1 in tagged_1s
+            for t2 in tagged_2s
+            if not (only_awake and t1._sleeping and t2._sleeping)
+        ]
+
+
+class SpatialHash(BroadPhase):
+    # uniform grid, elements are hashed into all cells touched by their global AABB
+    # pairs sharing at least one cell are candidates
+    def __init__(self, cell_size: float = CELL_SIZE) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive: " + str(cell_size))
+        self.cell_size = cell_size
+
+    def _get_cells(self, aabb: AABB) -> Iterable[Tuple[int, int]]:
+        x_min, y_min, x_max, y_max = aabb
+        i_min = math.floor(x_min / self.cell_size)
+        i_max = math.floor(x_max / self.cell_size)
+        j_min = math.floor(y_min / self.cell_size)
+        j_max = math.floor(y_max / self.cell_size)
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                yield (i, j)
+
+    def get_candidate_pairs(
+        self,
+        tagged_1s: Iterable[CollidableElement],
+        tagged_2s: Iterable[CollidableElement],
+        radius_1: Callable[[CollidableElement], float],
+        radius_2: Callable[[CollidableElement], float],
+        only_awake: bool = False,
+    ) -> Iterable[Pair]:
+        tagged_2s = list(tagged_2s)
+        grid = self._create_grid(tagged_2s, radius_2)
+        if not only_awake:
+            return self._query_grid(grid, tagged_1s, radius_1)
+        # awake 1s are checked against all 2s, sleeping 1s only against awake 2s
+        awake_1s: List[CollidableElement] = []
+        sleeping_1s: List[CollidableElement] = []
+        for t1 in tagged_1s:
+            (sleeping_1s if t1._sleeping else awake_1s).append(t1)
+        result = self._query_grid(grid, awake_1s, radius_1)
+        awake_grid = self._create_grid(
+            (t2 for t2 in tagged_2s if not t2._sleeping), radius_2
+        )
+        result.update(self._query_grid(awake_grid, sleeping_1s, radius_1))
+        return result
+
+    def _create_grid(
+        self,
+        elements: Iterable[CollidableElement],
+        radius: Callable[[CollidableElement], float],
+    ) -> Dict[Tuple[int, int], List[CollidableElement]]:
+        grid: Dict[Tuple[int, int], List[CollidableElement]] = {}
+        for elem in elements:
+            for cell in self._get_cells(get_global_aabb(elem, radius(elem))):
+                grid.setdefault(cell, []).append(elem)
+        return grid
+
+    def _query_grid(
+        self,
+        grid: Dict[Tuple[int, int], List[CollidableElement]],
+        elements: Iterable[CollidableElement],
+        radius: Callable[[CollidableElement], float],
+    ) -> Set[Pair]:
+        result: Set[Pair] = set()
+        if len(grid) == 0:
+            return result
+        for elem in elements:
+            for cell in self._get_cells(get_global_aabb(elem, radius(elem))):
+                for other in grid.get(cell, ()):
+                    result.add((elem, other))
+        return result
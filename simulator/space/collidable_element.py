@@ -1,24 +1,33 @@
+import math
 from enum import Enum
 from simulator.space.element import Vector
-from typing import Optional, Set, Tuple
+from typing import AbstractSet, Optional, Set, Tuple
 
 from simulator.space.moving_element import MovingElement
 
 
 class Shape:
-    pass
+    def get_bounding_radius(self) -> float:
+        # radius of the smallest circle around the center containing the shape
+        raise NotImplementedError()
 
 
 class Segment(Shape):
     def __init__(self, length: float) -> None:
         self.length = length
 
+    def get_bounding_radius(self) -> float:
+        return self.length / 2
+
 
 class Rectangle(Shape):
     def __init__(self, width: float, height: float) -> None:
         self.width = width  # x
         self.height = height  # y
 
+    def get_bounding_radius(self) -> float:
+        return math.sqrt((self.width ** 2) + (self.height ** 2)) / 2
+
 
 class Tag(Enum):
     # checked pair 1:
@@ -36,6 +45,8 @@ class TagCombination(Enum):
 
 
 class CollidableElement(MovingElement):
+    __slots__ = ("shape", "_tags", "is_colliding")
+
     def __init__(
         self,
         position: Vector = Vector(0, 0),
@@ -47,6 +58,31 @@ class CollidableElement(MovingElement):
     ) -> None:
         super().__init__(position=position, rotation=rotation, name=name, parent=parent)
         self.shape: Optional[Shape] = shape
-        self.tags: Set[Tag] = tags.copy()
+        self._tags: Set[Tag] = tags.copy()
 
         self.is_colliding = False
+
+        registry = self._get_tag_registry()
+        if registry is not None:
+            registry.add(self)
+
+    @property
+    def tags(self) -> AbstractSet[Tag]:
+        # (changed via add_tag/remove_tag, to keep the tag registry up to date)
+        return self._tags
+
+    def add_tag(self, tag: Tag) -> None:
+        if tag not in self._tags:
+            self._tags.add(tag)
+            registry = self._get_tag_registry()
+            if registry is not None:
+                registry.add_tag(self, tag)
+            self.wake()  # (checked again)
+
+    def remove_tag(self, tag: Tag) -> None:
+        if tag in self._tags:
+            self._tags.remove(tag)
+            registry = self._get_tag_registry()
+            if registry is not None:
+                registry.remove_tag(self, tag)
+            self.wake()
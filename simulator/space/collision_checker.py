@@ -1,21 +1,30 @@
 import math
-from typing import Any, Callable, Dict, Iterable, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
+
+from simulator.space.broad_phase import BroadPhase
 from simulator.space.cohen_sutherland import cohen_sutherland
 from simulator.space.collidable_element import (
     CollidableElement,
+    Shape,
     Rectangle,
     Segment,
     Tag,
     TagCombination,
 )
+from simulator.space.collision_kernel import (
+    get_segment_endpoints,
+    segments_hit_rectangles,
+)
 from simulator.space.element import (
     ARRAY,
-    Element,
     Vector,
     get_rot_0_359,
-    get_rotated_position,
+    get_sin_cos,
+    rotate_xy,
 )
+from simulator.space.tag_registry import TaggedElements, TagRegistry
 
 
 def _cohen_sutherland(
@@ -27,10 +36,10 @@ def _cohen_sutherland(
 ) -> bool:
     xmin, xmax = -(rect_width / 2), +(rect_width / 2)
     ymin, ymax = -(rect_height / 2), +(rect_height / 2)
-    seg_rot_rad = math.radians(segment_rot)
+    seg_rot_sin, seg_rot_cos = get_sin_cos(segment_rot)
     seg_center_x, seg_center_y = segment_center
-    segment_top_rel_x = math.sin(seg_rot_rad) * segment_length / 2
-    segment_top_rel_y = math.cos(seg_rot_rad) * segment_length / 2
+    segment_top_rel_x = seg_rot_sin * segment_length / 2
+    segment_top_rel_y = seg_rot_cos * segment_length / 2
     x1, y1 = seg_center_x + segment_top_rel_x, seg_center_y + segment_top_rel_y
     x2, y2 = seg_center_x - segment_top_rel_x, seg_center_y - segment_top_rel_y
     return cohen_sutherland(xmin, ymax, xmax, ymin, x1, y1, x2, y2)
@@ -48,20 +57,21 @@ def check_collision_segment_shape(
         (rect.width ** 2) + (rect.height ** 2)
     )  # tbd: move function to shape (+cache?)
     segment_radius = segment.length / 2
-    rect_gl_pos, rect_gl_rot = shape_element.get_global_coordinates()
-    segment_gl_pos, segment_gl_rot = segment_element.get_global_coordinates()
-    segment_rel_pos: ARRAY = segment_gl_pos - rect_gl_pos  # = distance_vector
-    center_distance = math.sqrt((segment_rel_pos[0] ** 2) + segment_rel_pos[1] ** 2)
+    rect_gl_x, rect_gl_y, rect_gl_rot = shape_element.get_global_xy_rot()
+    segment_gl_x, segment_gl_y, segment_gl_rot = segment_element.get_global_xy_rot()
+    # distance_vector:
+    segment_rel_x, segment_rel_y = segment_gl_x - rect_gl_x, segment_gl_y - rect_gl_y
+    center_distance = math.sqrt((segment_rel_x ** 2) + segment_rel_y ** 2)
     if center_distance > rect_radius + segment_radius:
         return False
     # 1. relative position
-    segment_rel_pos = get_rotated_position(segment_rel_pos, -rect_gl_rot)
+    segment_rel_x, segment_rel_y = rotate_xy(segment_rel_x, segment_rel_y, -rect_gl_rot)
     segment_rel_rot = get_rot_0_359(segment_gl_rot - rect_gl_rot)
     # 2. cohen sutherland
     return _cohen_sutherland(
         rect.width,
         rect.height,
-        Vector(segment_rel_pos[0], segment_rel_pos[1]),
+        Vector(segment_rel_x, segment_rel_y),
         segment_rel_rot,
         segment.length,
     )
@@ -76,19 +86,19 @@ def check_collision_point_shape(
     rect_radius = math.sqrt(
         (rect.width ** 2) + (rect.height ** 2)
     )  # tbd: move function to shape (+cache?)
-    rect_gl_pos, rect_gl_rot = shape_element.get_global_coordinates()
-    point_gl_pos = point_element.get_global_coordinates()[0]
-    point_rel_pos: ARRAY = point_gl_pos - rect_gl_pos
-    point_distance = math.sqrt(point_rel_pos[0] ** 2 + point_rel_pos[1] ** 2)
+    rect_gl_x, rect_gl_y, rect_gl_rot = shape_element.get_global_xy_rot()
+    point_gl_x, point_gl_y, _ = point_element.get_global_xy_rot()
+    point_rel_x, point_rel_y = point_gl_x - rect_gl_x, point_gl_y - rect_gl_y
+    point_distance = math.sqrt(point_rel_x ** 2 + point_rel_y ** 2)
     if point_distance > rect_radius:
         return False
     # 1. relative rotated position
-    point_rel_pos = get_rotated_position(point_rel_pos, rect_gl_rot)
+    point_rel_x, point_rel_y = rotate_xy(point_rel_x, point_rel_y, -rect_gl_rot)
     # 3. check dimensions
     return _cohen_sutherland(
         rect.width,
         rect.height,
-        Vector(point_rel_pos[0], point_rel_pos[1]),
+        Vector(point_rel_x, point_rel_y),
         0,
         0,  # point = segment of length 0
     )
@@ -102,13 +112,91 @@ collision_checks: Dict[
 }
 
 
-def check_collisions(
-    elements: Iterable[Element[Any]],
+def _get_point_radius(point_element: CollidableElement) -> float:
+    return 0
+
+
+def _get_shape_radius(shape_element: CollidableElement) -> float:
+    assert shape_element.shape is not None
+    return shape_element.shape.get_bounding_radius()
+
+
+# bounding radii of (tag_1, tag_2) elements as seen by the respective collision check
+bounding_radii: Dict[
+    TagCombination,
+    Tuple[Callable[[CollidableElement], float], Callable[[CollidableElement], float]],
+] = {
+    TagCombination.SEGMENT_AND_SHAPE: (_get_shape_radius, _get_shape_radius),
+    TagCombination.POINT_AND_MOVING_SHAPE: (_get_point_radius, _get_shape_radius),
+}
+
+
+def _get_global_coordinates_arrays(
+    elements: Sequence[CollidableElement],
+) -> Tuple[ARRAY, ARRAY]:
+    store = elements[0]._store if len(elements) > 0 else None
+    if store is not None and all(elem._store is store for elem in elements):
+        element_ids = np.array([elem._store_id for elem in elements])
+        return store.get_global_coordinates_arrays(element_ids)
+    positions = np.empty((len(elements), 2))
+    rotations = np.empty(len(elements))
+    for i, elem in enumerate(elements):
+        positions[i, 0], positions[i, 1], rotations[i] = elem.get_global_xy_rot()
+    return positions, rotations
+
+
+def _get_rectangle_half_extents(shape: Optional[Shape]) -> Tuple[float, float]:
+    assert isinstance(shape, Rectangle)
+    return (shape.width / 2, shape.height / 2)
+
+
+def check_collisions_batched(
+    pairs: Iterable[Tuple[CollidableElement, CollidableElement]],
     tag_combination: TagCombination,
 ) -> Set[Tuple[CollidableElement, CollidableElement]]:
-    # check for collisions between tagged CollidableElement's
-    # (t1 child of t2 if only_direct_children)
-    # returns set of all colliding element pairs
+    # vectorized narrow phase for all given candidate pairs,
+    # equivalent to calling collision_checks[tag_combination] for each pair
+    pairs = list(pairs)
+    if len(pairs) == 0:
+        return set()
+    # global coordinates are gathered only once per element
+    indices_1: Dict[CollidableElement, int] = {}
+    indices_2: Dict[CollidableElement, int] = {}
+    pair_indices = np.array(
+        [
+            (
+                indices_1.setdefault(t1, len(indices_1)),
+                indices_2.setdefault(t2, len(indices_2)),
+            )
+            for t1, t2 in pairs
+        ]
+    )
+    elements_1: List[CollidableElement] = list(indices_1)
+    elements_2: List[CollidableElement] = list(indices_2)
+    positions_1, rotations_1 = _get_global_coordinates_arrays(elements_1)
+    positions_2, rotations_2 = _get_global_coordinates_arrays(elements_2)
+    # t1: segment or point (bounding radius == half length)
+    radius_1, _ = bounding_radii[tag_combination]
+    half_lengths_1 = np.array([radius_1(t1) for t1 in elements_1])
+    half_extents_2 = np.array(
+        [_get_rectangle_half_extents(t2.shape) for t2 in elements_2]
+    )
+
+    i_1, i_2 = pair_indices[:, 0], pair_indices[:, 1]
+    starts, ends = get_segment_endpoints(
+        positions_1[i_1], rotations_1[i_1], half_lengths_1[i_1]
+    )
+    hits = segments_hit_rectangles(
+        starts, ends, positions_2[i_2], half_extents_2[i_2], rotations_2[i_2]
+    )
+    return {pair for pair, hit in zip(pairs, hits) if hit}
+
+
+def get_tagged_elements(
+    elements: TaggedElements, tag_combination: TagCombination
+) -> Tuple[Set[CollidableElement], Set[CollidableElement]]:
+    if isinstance(elements, TagRegistry):
+        return elements.get_tagged_elements(tag_combination)
     tag_1: Tag
     tag_2: Tag
     tag_1, tag_2 = tag_combination.value
@@ -121,6 +209,49 @@ def check_collisions(
                 tagged_1s.add(elem)
             elif tag_2 in elem.tags:
                 tagged_2s.add(elem)
+    return tagged_1s, tagged_2s
+
+
+def get_elements_with_tag(
+    elements: TaggedElements, tag: Tag
+) -> List[CollidableElement]:
+    if isinstance(elements, TagRegistry):
+        return elements.get_elements(tag)
+    return [
+        elem
+        for elem in elements
+        if isinstance(elem, CollidableElement) and tag in elem.tags
+    ]
+
+
+def get_all_tagged_elements(elements: TaggedElements) -> List[CollidableElement]:
+    if isinstance(elements, TagRegistry):
+        return elements.get_all()
+    return [
+        elem
+        for elem in elements
+        if isinstance(elem, CollidableElement) and len(elem.tags) > 0
+    ]
+
+
+def check_collisions(
+    elements: TaggedElements,
+    tag_combination: TagCombination,
+    broad_phase: Optional[BroadPhase] = None,
+) -> Set[Tuple[CollidableElement, CollidableElement]]:
+    # check for collisions between tagged CollidableElement's
+    # (t1 child of t2 if only_direct_children)
+    # without broad_phase, all pairs are checked (reference mode)
+    # returns set of all colliding element pairs
+    tagged_1s, tagged_2s = get_tagged_elements(elements, tag_combination)
+
+    if broad_phase is not None:
+        # check only candidates which might collide, all at once
+        radius_1, radius_2 = bounding_radii[tag_combination]
+        candidates = broad_phase.get_candidate_pairs(
+            tagged_1s, tagged_2s, radius_1, radius_2
+        )
+        return check_collisions_batched(candidates, tag_combination)
 
     # check for all possible collisions
     collision_check = collision_checks[tag_combination]
@@ -0,0 +1,61 @@
+# batched (vectorized) narrow phase of the collision detection
+# checks many segment/rectangle pairs at once, points are segments of length 0
+
+import numpy as np
+
+from simulator.space.element import ARRAY
+
+
+def get_segment_endpoints(
+    centers: ARRAY,  # (n, 2)
+    rotations: ARRAY,  # (n,) deg clockwise, 0 = segment along y-axis
+    half_lengths: ARRAY,  # (n,)
+) -> ARRAY:  # (2, n, 2): start points, end points
+    rotations_rad = np.deg2rad(rotations)
+    top_rel = np.stack(
+        (np.sin(rotations_rad) * half_lengths, np.cos(rotations_rad) * half_lengths),
+        axis=-1,
+    )
+    return np.stack((centers + top_rel, centers - top_rel))
+
+
+def to_local_frame(points: ARRAY, centers: ARRAY, rotations: ARRAY) -> ARRAY:
+    # inverse of the parent-to-global transformation (see get_rotated_position)
+    rel = points - centers
+    angle_rad = np.deg2rad(-rotations)
+    cos, sin = np.cos(angle_rad), np.sin(angle_rad)
+    x, y = rel[..., 0], rel[..., 1]
+    return np.stack((x * cos + y * sin, -1 * x * sin + y * cos), axis=-1)
+
+
+def segments_hit_rectangles(
+    segment_starts: ARRAY,  # (n, 2) global
+    segment_ends: ARRAY,  # (n, 2) global
+    rect_centers: ARRAY,  # (n, 2) global
+    rect_half_extents: ARRAY,  # (n, 2) half width, half height
+    rect_rotations: ARRAY,  # (n,) global, deg clockwise
+) -> ARRAY:  # (n,) bool mask, True if segment i touches rectangle i
+    # liang-barsky clipping of all segments against their (axis-aligned) rectangle
+    # boundaries are inclusive, same as cohen_sutherland
+    p1 = to_local_frame(segment_starts, rect_centers, rect_rotations)
+    p2 = to_local_frame(segment_ends, rect_centers, rect_rotations)
+    d = p2 - p1
+    # clip against: x_min, x_max, y_min, y_max
+    p = np.stack((-d[:, 0], d[:, 0], -d[:, 1], d[:, 1]), axis=-1)
+    q = np.stack(
+        (
+            p1[:, 0] + rect_half_extents[:, 0],
+            rect_half_extents[:, 0] - p1[:, 0],
+            p1[:, 1] + rect_half_extents[:, 1],
+            rect_half_extents[:, 1] - p1[:, 1],
+        ),
+        axis=-1,
+    )
+    parallel = p == 0
+    outside_parallel = np.any(parallel & (q < 0), axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = q / p
+    t_enter = np.max(np.where(p < 0, t, 0), axis=-1)
+    t_exit = np.min(np.where(p > 0, t, 1), axis=-1)
+    result: ARRAY = ~outside_parallel & (t_enter <= t_exit)
+    return result
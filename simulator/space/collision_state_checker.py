@@ -1,21 +1,34 @@
 # similar level to attachment_checker, but for Tags 1/2
 # gets passed tree and updates CollisionDetecting elements states
 
-from typing import Any, Iterable
+from typing import Optional
 
-from simulator.space.collidable_element import CollidableElement, TagCombination
-from simulator.space.collision_checker import check_collisions
-from simulator.space.element import Element
+from simulator.space.broad_phase import BroadPhase
+from simulator.space.collidable_element import TagCombination
+from simulator.space.collision_checker import check_collisions, get_all_tagged_elements
+from simulator.space.contact_cache import ContactCache
+from simulator.space.tag_registry import TaggedElements
 
 
-def update_collision_states(elements: Iterable[Element[Any]]) -> None:
-    for elem in elements:
-        if isinstance(elem, CollidableElement):
-            elem.is_colliding = False
+def update_collision_states(
+    elements: TaggedElements,
+    broad_phase: Optional[BroadPhase] = None,
+    contact_cache: Optional[ContactCache] = None,
+) -> None:
+    if contact_cache is not None:
+        # only elements with begun/ended contacts change their state
+        changes = contact_cache.update(elements)
+        for t in changes.get_elements():
+            t.is_colliding = contact_cache.is_in_contact(t)
+        return
+
+    for elem in get_all_tagged_elements(elements):  # (untagged never collide)
+        elem.is_colliding = False
 
     for t1, t2 in check_collisions(
         elements,
         tag_combination=TagCombination.SEGMENT_AND_SHAPE,
+        broad_phase=broad_phase,
     ):
         for t in t1, t2:
             t.is_colliding = True
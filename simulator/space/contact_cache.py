@@ -0,0 +1,79 @@
+# persistent collision results (contacts) of all element pairs of a tag combination
+# only pairs with at least one element changed (awake) since the last update are
+# checked again, changes are reported as begun/ended contacts
+
+from typing import Dict, Set, Tuple
+
+from simulator.space.broad_phase import BroadPhase
+from simulator.space.collidable_element import CollidableElement, TagCombination
+from simulator.space.collision_checker import (
+    bounding_radii,
+    check_collisions_batched,
+    get_tagged_elements,
+)
+from simulator.space.tag_registry import TaggedElements
+
+Pair = Tuple[CollidableElement, CollidableElement]
+
+
+class ContactChanges:
+    def __init__(self, begun: Set[Pair], ended: Set[Pair]) -> None:
+        self.begun = begun
+        self.ended = ended
+
+    def get_elements(self) -> Set[CollidableElement]:
+        # all elements with changed contacts
+        return {t for pair in self.begun | self.ended for t in pair}
+
+
+class ContactCache:
+    def __init__(
+        self, tag_combination: TagCombination, broad_phase: BroadPhase
+    ) -> None:
+        self.tag_combination = tag_combination
+        self.broad_phase = broad_phase
+        self.contacts: Set[Pair] = set()
+        self._partners: Dict[CollidableElement, Set[CollidableElement]] = {}
+
+    def get_partners(self, element: CollidableElement) -> Set[CollidableElement]:
+        # all elements currently in contact with the given element
+        return self._partners.get(element, set())
+
+    def is_in_contact(self, element: CollidableElement) -> bool:
+        return len(self.get_partners(element)) > 0
+
+    def update(self, elements: TaggedElements) -> ContactChanges:
+        tagged_1s, tagged_2s = get_tagged_elements(elements, self.tag_combination)
+        radius_1, radius_2 = bounding_radii[self.tag_combination]
+        candidates = self.broad_phase.get_candidate_pairs(
+            tagged_1s, tagged_2s, radius_1, radius_2, only_awake=True
+        )
+        collisions = check_collisions_batched(candidates, self.tag_combination)
+
+        ended: Set[Pair] = set()
+        for pair in self.contacts:
+            t1, t2 = pair
+            if pair in collisions:
+                continue
+            if t1._sleeping and t2._sleeping and t1 in tagged_1s and t2 in tagged_2s:
+                continue  # unchanged
+            ended.add(pair)
+        begun = collisions - self.contacts
+
+        for t1, t2 in ended:
+            self.contacts.remove((t1, t2))
+            self._remove_partner(t1, t2)
+            self._remove_partner(t2, t1)
+        for t1, t2 in begun:
+            self.contacts.add((t1, t2))
+            self._partners.setdefault(t1, set()).add(t2)
+            self._partners.setdefault(t2, set()).add(t1)
+        return ContactChanges(begun, ended)
+
+    def _remove_partner(
+        self, element: CollidableElement, partner: CollidableElement
+    ) -> None:
+        partners = self._partners[element]
+        partners.remove(partner)
+        if len(partners) == 0:
+            del self._partners[element]
@@ -1,8 +1,29 @@
-from typing import Any, Generic, List, NamedTuple, Optional, Set, Tuple, TypeVar
+import math
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
 
 import numpy as np
 import numpy.typing as npt
 
+if TYPE_CHECKING:
+    from simulator.space.transform_store import TransformStore
+
 T = TypeVar("T", bound="Element[Any]")
 
 ARRAY = npt.NDArray[Any]
@@ -17,13 +38,21 @@ def xy2arr(xy: Vector) -> ARRAY:
     return np.array(xy, dtype=float)
 
 
-def get_rotated_position(position: ARRAY, angle_deg: float) -> ARRAY:
-    x = position[0]
-    y = position[1]
-    angle_rad = np.deg2rad(angle_deg)
+@lru_cache(maxsize=4096)  # (most elements keep their rotation)
+def get_sin_cos(angle_deg: float) -> Tuple[float, float]:
+    angle_rad = math.radians(angle_deg)
+    return math.sin(angle_rad), math.cos(angle_rad)
+
+
+def rotate_xy(x: float, y: float, angle_deg: float) -> Tuple[float, float]:
+    # scalar version of get_rotated_position (without array allocation)
+    sin, cos = get_sin_cos(angle_deg)
     # coord-sys rotation counter-clock-wise:
-    x_new = x * np.cos(angle_rad) + y * np.sin(angle_rad)
-    y_new = -1 * x * np.sin(angle_rad) + y * np.cos(angle_rad)
+    return x * cos + y * sin, -1 * x * sin + y * cos
+
+
+def get_rotated_position(position: ARRAY, angle_deg: float) -> ARRAY:
+    x_new, y_new = rotate_xy(float(position[0]), float(position[1]), angle_deg)
     return xy2arr(Vector(x_new, y_new))
 
 
@@ -31,8 +60,69 @@ def get_rot_0_359(value: float) -> float:
     return ((value % 360) + 360) % 360
 
 
+class ChildrenView(Sequence[T]):
+    # read-only view of (grand-) children, level by level (no copy of the levels)
+    # (live for the index of a root element, a snapshot for all other elements;
+    # attach / detach while iterating a live view: iterate over list(view) instead)
+    # indexing: O(1), flat list built on the first index after a change of the index
+    __slots__ = ("_levels", "_root", "_flat", "_flat_version")
+
+    def __init__(
+        self, levels: Sequence[Collection[T]], root: Optional["Element[Any]"] = None
+    ) -> None:
+        self._levels = levels  # level -> elements (e.g. insertion-ordered dict keys)
+        self._root = root  # (keeping the index, None: snapshot)
+        self._flat: Optional[List[T]] = None
+        self._flat_version = 0
+
+    def __iter__(self) -> Iterator[T]:
+        for level in self._levels:
+            yield from level
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self._levels)
+
+    def __contains__(self, element: object) -> bool:
+        return any(element in level for level in self._levels)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        version = self._root._children_version if self._root is not None else 0
+        if self._flat is None or self._flat_version != version:
+            self._flat = list(self)
+            self._flat_version = version
+        return self._flat[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return "ChildrenView(" + repr(list(self)) + ")"
+
+
 class Element(Generic[T]):  # T = Type of the parent / children
     # base class of an entity existing in 2D space
+    __slots__ = (
+        "_position",
+        "_rotation",
+        "name",
+        "_store",
+        "_store_id",
+        "_sleeping",
+        "_parent",
+        "_children",
+        "_global_cache",
+        "_children_levels",
+        "_children_version",
+    )
+
     def __init__(
         self,
         position: Vector = Vector(0, 0),
@@ -49,58 +139,97 @@ class Element(Generic[T]):  # T = Type of the parent / children
 
         self.name = name
 
+        # optional (world-level) storage of coordinates, replaces _position/_rotation
+        self._store: Optional["TransformStore"] = None
+        self._store_id: int = -1
+
+        # sleeping: transform unchanged since the last collision checks
+        self._sleeping = False
+
+        # global coordinates cache (x, y, rotation):
+        self._global_cache: Optional[Tuple[float, float, float]] = None
+        # breadth-first index of all (grand-) children by level,
+        # only kept by top-level parents (built on first use)
+        self._children_levels: Optional[List[Dict[T, None]]] = None
+        self._children_version = 0  # (changes of the index)
+
         # hierarchy:
         self._parent = parent
+        self._children: Set[T] = set()
         if parent is not None:
             parent._children.add(self)  # not 'attach', position is already relative
-            parent.invalidate_children_bf_cache()
-        self._children: Set[T] = set()
-        # global coordinates cache:
-        self._global_position_cache: Optional[ARRAY] = None
-        self._global_rotation_cache: Optional[float] = None
-        self._children_breadth_first_cache: Optional[List[T]] = None
+            parent._add_to_children_index(self)
+            if parent._store is not None:
+                parent._store.add(self)
 
     @property
     def position(self) -> ARRAY:
+        if self._store is not None:
+            return self._store.local_positions[self._store_id]  # view
         return self._position
 
     @position.setter
     def position(self, value: ARRAY) -> None:
+        if self._store is not None:
+            self._store.set_position(self._store_id, value)
+            self.wake()
+            return
         self.invalidate_global_coord_cache()
         self._position = value
 
     @property
     def rotation(self) -> float:
+        if self._store is not None:
+            return float(self._store.local_rotations[self._store_id])
         return self._rotation
 
     @rotation.setter
     def rotation(self, value: float) -> None:
+        if self._store is not None:
+            self._store.set_rotation(self._store_id, get_rot_0_359(value))
+            self.wake()
+            return
         self.invalidate_global_coord_cache()
         self._rotation = get_rot_0_359(value)
 
     def invalidate_global_coord_cache(self) -> None:
-        self._global_position_cache = None
-        self._global_rotation_cache = None
+        self._global_cache = None
+        self._sleeping = False
         for child in self._children:
             child.invalidate_global_coord_cache()
 
+    def wake(self) -> None:
+        # (grand-) children are moved as well
+        self._sleeping = False
+        for child in self._children:
+            child.wake()
+
     # global coordinates:
     def get_global_coordinates(self) -> Tuple[ARRAY, float]:
         # relative to top-level parent
-        if not (
-            self._global_position_cache is None or self._global_rotation_cache is None
-        ):
-            return self._global_position_cache.copy(), self._global_rotation_cache
+        if self._store is not None:
+            return self._store.get_global_coordinates(self._store_id)
+        x, y, rotation = self.get_global_xy_rot()
+        return xy2arr(Vector(x, y)), rotation
+
+    def get_global_xy_rot(self) -> Tuple[float, float, float]:
+        # same as get_global_coordinates, as plain floats (no allocations if cached)
+        if self._store is not None:
+            return self._store.get_global_xy_rot(self._store_id)
+        if self._global_cache is not None:
+            return self._global_cache
+        x, y = self._position  # (array or Vector)
+        x, y = float(x), float(y)
         if self._parent is None:
-            return self.position, self.rotation
-        parent_gl_pos, parent_gl_rot = self._parent.get_global_coordinates()
-        gl_pos_rel = get_rotated_position(self.position, parent_gl_rot)
-        gl_pos: ARRAY = parent_gl_pos + gl_pos_rel
-        gl_rot = get_rot_0_359(parent_gl_rot + self.rotation)
-        # cache:
-        self._global_position_cache = gl_pos
-        self._global_rotation_cache = gl_rot
-        return (gl_pos.copy(), gl_rot)
+            return x, y, self._rotation
+        parent_x, parent_y, parent_rot = self._parent.get_global_xy_rot()
+        x_rel, y_rel = rotate_xy(x, y, parent_rot)
+        self._global_cache = (
+            parent_x + x_rel,
+            parent_y + y_rel,
+            get_rot_0_359(parent_rot + self._rotation),
+        )
+        return self._global_cache
 
     # attach / detach:
     def get_children(self: T) -> Set[T]:
@@ -111,42 +240,86 @@ class Element(Generic[T]):  # T = Type of the parent / children
             child._parent.detach(child)
         self.update_local_child_position(child)
         child._parent = self
+        child._children_levels = None  # no longer top-level
         self._children.add(child)
-        self.invalidate_children_bf_cache()
+        self._add_to_children_index(child)
+        if child._store is not self._store:
+            if child._store is not None:
+                child._store.remove(child)
+            if self._store is not None:
+                self._store.add(child)
+        elif self._store is not None:
+            self._store.set_parent(child, self)
 
     def update_local_child_position(self, child: T) -> None:
-        child_gl_pos, child_gl_rot = child.get_global_coordinates()
-        new_parent_gl_pos, new_parent_gl_rot = self.get_global_coordinates()
-        child_rel_pos = get_rotated_position(
-            child_gl_pos - new_parent_gl_pos, -new_parent_gl_rot
+        child_gl_x, child_gl_y, child_gl_rot = child.get_global_xy_rot()
+        new_parent_gl_x, new_parent_gl_y, new_parent_gl_rot = self.get_global_xy_rot()
+        child_rel_x, child_rel_y = rotate_xy(
+            child_gl_x - new_parent_gl_x,
+            child_gl_y - new_parent_gl_y,
+            -new_parent_gl_rot,
         )
-        child.position = child_rel_pos
+        child.position = xy2arr(Vector(child_rel_x, child_rel_y))
         child.rotation = child_gl_rot - new_parent_gl_rot
 
     def detach(self, child: T) -> None:
-        child_gl_pos, child_gl_rot = child.get_global_coordinates()
+        child_gl_x, child_gl_y, child_gl_rot = child.get_global_xy_rot()
         if child in self._children:
+            self._remove_from_children_index(child)
             self._children.remove(child)
         child._parent = None
-        child.position = child_gl_pos
+        if child._store is not None:
+            child._store.set_parent(child, None)
+        child.position = xy2arr(Vector(child_gl_x, child_gl_y))
         child.rotation = child_gl_rot
-        self.invalidate_children_bf_cache()
-
-    def invalidate_children_bf_cache(self) -> None:
-        self._children_breadth_first_cache = None
-        if self._parent is not None:
-            self._parent.invalidate_children_bf_cache()
 
     # all (grand-) children:
-    def get_all_children_breadth_first(self) -> List[T]:
-        if self._children_breadth_first_cache is not None:
-            return self._children_breadth_first_cache.copy()
-        # possible speedup: cached "distance_to_origin"/"_level_cache" int for simple sorting ?
-        result = []
-        to_be_visited = list(self._children)
-        while len(to_be_visited) > 0:
-            visited = to_be_visited.pop(0)
-            to_be_visited.extend(visited._children)
-            result.append(visited)
-        self._children_breadth_first_cache = result
-        return result
+    def get_all_children_breadth_first(self) -> Sequence[T]:
+        if self._parent is not None:  # (snapshot, only roots keep an index)
+            return ChildrenView(self._get_subtree_levels()[1:])
+        if self._children_levels is None:
+            self._children_levels = [
+                dict.fromkeys(level) for level in self._get_subtree_levels()[1:]
+            ]
+        return ChildrenView(self._children_levels, self)
+
+    def _get_subtree_levels(self) -> List[List[T]]:
+        # self and all (grand-) children, level by level
+        levels: List[List[Any]] = [[self]]
+        while True:
+            next_level = [child for elem in levels[-1] for child in elem._children]
+            if len(next_level) == 0:
+                return levels
+            levels.append(next_level)
+
+    def _get_root_and_depth(self) -> Tuple["Element[Any]", int]:
+        root: Element[Any] = self
+        depth = 0
+        while root._parent is not None:
+            root = root._parent
+            depth += 1
+        return root, depth
+
+    def _add_to_children_index(self, child: T) -> None:
+        # index only the moved subtree, instead of rebuilding the whole index
+        root, depth = self._get_root_and_depth()
+        levels = root._children_levels
+        if levels is None:
+            return
+        root._children_version += 1
+        for i, subtree_level in enumerate(child._get_subtree_levels()):
+            if depth + i >= len(levels):
+                levels.append({})
+            levels[depth + i].update(dict.fromkeys(subtree_level))
+
+    def _remove_from_children_index(self, child: T) -> None:
+        root, depth = self._get_root_and_depth()
+        levels = root._children_levels
+        if levels is None:
+            return
+        root._children_version += 1
+        for i, subtree_level in enumerate(child._get_subtree_levels()):
+            for elem in subtree_level:
+                del levels[depth + i][elem]
+        while len(levels) > 0 and len(levels[-1]) == 0:
+            levels.pop()
@@ -0,0 +1,195 @@
+# analytic computation of the time until the next observable event
+# (contact begin/end between tagged elements, end of limited rotations)
+# all movements are piecewise constant, so contact changes of elements moving
+# relative to each other with constant velocity can be computed in closed form
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from simulator.space.broad_phase import BroadPhase
+from simulator.space.collidable_element import (
+    CollidableElement,
+    Rectangle,
+    TagCombination,
+)
+from simulator.space.collision_checker import bounding_radii, get_tagged_elements
+from simulator.space.element import ARRAY, Element, get_rotated_position
+from simulator.space.movements import (
+    ChildElementTranslation,
+    ElementMovement,
+    LimitedAngleRotation,
+    Rotation,
+    Translation,
+)
+from simulator.space.moving_element import MovingElement
+from simulator.space.tag_registry import TaggedElements
+
+NO_EVENT = math.inf
+
+
+class Motion:
+    # current global motion of an element
+    def __init__(self) -> None:
+        self.velocity: ARRAY = np.zeros(2)  # (only valid if not rotating)
+        self.rotating = False
+        self.pivot_distance = 0.0  # max. distance to the center of a rotating ancestor
+        self.movements: Set[ElementMovement] = set()  # moving the element
+
+
+def _is_rotating(movement: Rotation) -> bool:
+    return not movement.done and movement.deg_s != 0
+
+
+def get_motion(element: Element[Any]) -> Motion:
+    motion = Motion()
+    gl_pos = element.get_global_coordinates()[0]
+    current: Optional[Element[Any]] = element
+    while current is not None:
+        parent = current._parent
+        for movement in getattr(current, "_movements", ()):
+            if isinstance(movement, Rotation):
+                if not _is_rotating(movement):
+                    continue
+                motion.rotating = True
+                pivot = current.get_global_coordinates()[0]
+                motion.pivot_distance = max(
+                    motion.pivot_distance, float(np.linalg.norm(gl_pos - pivot))
+                )
+            elif isinstance(movement, ChildElementTranslation):
+                if current is element:
+                    continue  # moves the children only
+                host_rot = current.get_global_coordinates()[1]
+                motion.velocity += get_rotated_position(movement.m_s, host_rot)
+            elif isinstance(movement, Translation):
+                parent_rot = parent.get_global_coordinates()[1] if parent else 0
+                motion.velocity += get_rotated_position(movement.m_s, parent_rot)
+            else:
+                motion.rotating = True  # unknown movement, no closed form
+            motion.movements.add(movement)
+        current = parent
+    return motion
+
+
+def get_time_to_rotation_end(elements: Iterable[MovingElement]) -> float:
+    result = NO_EVENT
+    for elem in elements:
+        for movement in elem._movements:
+            if isinstance(movement, LimitedAngleRotation) and _is_rotating(movement):
+                result = min(result, movement.remaining / abs(movement.deg_s))
+    return result
+
+
+def get_contact_intervals(
+    centers_1: ARRAY,  # (n, 2) segments / points
+    rotations_1: ARRAY,  # (n,)
+    half_lengths_1: ARRAY,  # (n,)
+    centers_2: ARRAY,  # (n, 2) rectangles
+    rotations_2: ARRAY,  # (n,)
+    half_extents_2: ARRAY,  # (n, 2)
+    velocities: ARRAY,  # (n, 2) of 1 relative to 2
+) -> Tuple[ARRAY, ARRAY]:  # (n,) begin, (n,) end of contact (relative to now)
+    # separating axis test of the moving convex shapes:
+    # axes are the rectangle axes and the segment normal
+    def axis(angle_deg: ARRAY, local: Tuple[float, float]) -> ARRAY:
+        rad = np.deg2rad(angle_deg)
+        x, y = local
+        return np.stack(
+            (x * np.cos(rad) + y * np.sin(rad), -1 * x * np.sin(rad) + y * np.cos(rad)),
+            axis=-1,
+        )
+
+    rect_x, rect_y = axis(rotations_2, (1, 0)), axis(rotations_2, (0, 1))
+    segment_dir, segment_normal = axis(rotations_1, (0, 1)), axis(rotations_1, (1, 0))
+    t_begin = np.full(len(centers_1), -np.inf)
+    t_end = np.full(len(centers_1), np.inf)
+    for normal in rect_x, rect_y, segment_normal:
+        half_1 = half_lengths_1 * np.abs(np.sum(segment_dir * normal, axis=-1))
+        half_2 = half_extents_2[:, 0] * np.abs(
+            np.sum(rect_x * normal, axis=-1)
+        ) + half_extents_2[:, 1] * np.abs(np.sum(rect_y * normal, axis=-1))
+        reach = half_1 + half_2
+        distance = np.sum((centers_1 - centers_2) * normal, axis=-1)
+        speed = np.sum(velocities * normal, axis=-1)
+        if normal is segment_normal:  # (points have no segment axis)
+            reach = np.where(half_lengths_1 > 0, reach, np.inf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_a = (-reach - distance) / speed
+            t_b = (reach - distance) / speed
+        moving = speed != 0
+        overlapping = np.abs(distance) <= reach
+        low = np.where(
+            moving, np.minimum(t_a, t_b), np.where(overlapping, -np.inf, np.inf)
+        )
+        high = np.where(
+            moving, np.maximum(t_a, t_b), np.where(overlapping, np.inf, -np.inf)
+        )
+        t_begin = np.maximum(t_begin, low)
+        t_end = np.minimum(t_end, high)
+    return t_begin, t_end
+
+
+def get_time_to_next_contact_change(
+    elements: TaggedElements,
+    tag_combination: TagCombination,
+    broad_phase: BroadPhase,
+    horizon: float,
+    motions: Dict[Element[Any], Motion],
+) -> Tuple[float, bool]:
+    # returns time of the next contact begin/end within horizon (or NO_EVENT),
+    # and whether pairs in reach move in a non-linear way (no closed form)
+    tagged_1s, tagged_2s = get_tagged_elements(elements, tag_combination)
+    radius_1, radius_2 = bounding_radii[tag_combination]
+
+    def get_motion_cached(elem: CollidableElement) -> Motion:
+        if elem not in motions:
+            motions[elem] = get_motion(elem)
+        return motions[elem]
+
+    def get_swept_radius(elem: CollidableElement, radius: float) -> float:
+        motion = get_motion_cached(elem)
+        reach = float(np.linalg.norm(motion.velocity)) * horizon
+        if motion.rotating:
+            reach += motion.pivot_distance * 2
+        return radius + reach
+
+    candidates = broad_phase.get_candidate_pairs(
+        tagged_1s,
+        tagged_2s,
+        lambda t1: get_swept_radius(t1, radius_1(t1)),
+        lambda t2: get_swept_radius(t2, radius_2(t2)),
+    )
+    linear_pairs: List[Tuple[CollidableElement, CollidableElement, ARRAY]] = []
+    for t1, t2 in candidates:
+        motion_1, motion_2 = get_motion_cached(t1), get_motion_cached(t2)
+        if motion_1.movements == motion_2.movements:
+            continue  # moving together (or not at all)
+        if motion_1.rotating or motion_2.rotating:
+            return NO_EVENT, True
+        relative_velocity = motion_1.velocity - motion_2.velocity
+        if np.any(relative_velocity != 0):
+            linear_pairs.append((t1, t2, relative_velocity))
+    if len(linear_pairs) == 0:
+        return NO_EVENT, False
+
+    coordinates_1 = [t1.get_global_coordinates() for t1, _, _ in linear_pairs]
+    coordinates_2 = [t2.get_global_coordinates() for _, t2, _ in linear_pairs]
+    half_extents = []
+    for _, t2, _ in linear_pairs:
+        assert isinstance(t2.shape, Rectangle)
+        half_extents.append((t2.shape.width / 2, t2.shape.height / 2))
+    t_begin, t_end = get_contact_intervals(
+        np.array([pos for pos, _ in coordinates_1]),
+        np.array([rot for _, rot in coordinates_1]),
+        np.array([radius_1(t1) for t1, _, _ in linear_pairs]),
+        np.array([pos for pos, _ in coordinates_2]),
+        np.array([rot for _, rot in coordinates_2]),
+        np.array(half_extents),
+        np.array([velocity for _, _, velocity in linear_pairs]),
+    )
+    # not yet in contact: next event is the begin, else the end of the contact
+    in_contact = (t_begin <= 0) & (t_end >= 0)
+    events = np.where(t_begin <= t_end, np.where(in_contact, t_end, t_begin), np.inf)
+    events = events[events >= 0]
+    return (float(np.min(events)) if len(events) > 0 else NO_EVENT), False
@@ -0,0 +1,42 @@
+# flat registry of all active movements of a world
+# stepping iterates only the active movements (not the element tree),
+# movements of the same type are stepped together (batched)
+
+from typing import Dict, List, Tuple, Type
+
+from simulator.space.movements import ElementMovement
+from simulator.space.moving_element import MovingElement
+
+Entry = Tuple[MovingElement, ElementMovement]
+
+
+class MovementRegistry:
+    def __init__(self) -> None:
+        # (dicts as ordered sets)
+        self._entries: Dict[Type[ElementMovement], Dict[Entry, None]] = {}
+
+    def add(self, element: MovingElement, movement: ElementMovement) -> None:
+        self._entries.setdefault(type(movement), {})[(element, movement)] = None
+
+    def remove(self, element: MovingElement, movement: ElementMovement) -> None:
+        entries = self._entries[type(movement)]
+        del entries[(element, movement)]
+        if len(entries) == 0:
+            del self._entries[type(movement)]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def get_elements(self) -> List[MovingElement]:
+        # all elements with active movements
+        return list(
+            {
+                element: None
+                for entries in self._entries.values()
+                for element, _ in entries
+            }
+        )
+
+    def step(self, time: float) -> None:
+        for movement_type, entries in list(self._entries.items()):
+            movement_type.step_all(list(entries), time)
@@ -2,11 +2,24 @@
 # -> position/rotation changes over time
 
 import math
-from typing import Any
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
 
 import numpy as np
 from simulator.space.element import Element, Vector
 
+if TYPE_CHECKING:
+    from simulator.space.transform_store import TransformStore
+
+
+def get_common_store(elements: Sequence[Element[Any]]) -> Optional["TransformStore"]:
+    # store of all elements (None if not stored or in different stores)
+    if len(elements) == 0:
+        return None
+    store = elements[0]._store
+    if store is None or any(elem._store is not store for elem in elements):
+        return None
+    return store
+
 
 class ElementMovement:
     done = False
@@ -14,6 +27,14 @@ class ElementMovement:
     def step(self, element: Element[Any], time: float) -> None:
         raise NotImplementedError()
 
+    @classmethod
+    def step_all(
+        cls, entries: Sequence[Tuple[Element[Any], "ElementMovement"]], time: float
+    ) -> None:
+        # steps all given movements of this type (can be overridden for batching)
+        for element, movement in entries:
+            movement.step(element, time)
+
 
 class LimitedMovement:
     def __init__(self) -> None:
@@ -58,9 +79,36 @@ class Translation(ElementMovement):  # relative to parent
     def step(self, element: Element[Any], time: float) -> None:
         element.position += self.m_s * time
 
+    @classmethod
+    def step_all(
+        cls, entries: Sequence[Tuple[Element[Any], ElementMovement]], time: float
+    ) -> None:
+        moved: List[Element[Any]] = []
+        velocities: List[Any] = []
+        for element, movement in entries:
+            assert isinstance(movement, Translation)
+            for moved_element in movement.get_moved_elements(element):
+                moved.append(moved_element)
+                velocities.append(movement.m_s)
+        store = get_common_store(moved)
+        if store is None:
+            super().step_all(entries, time)
+            return
+        # all positions at once
+        element_ids = np.array([elem._store_id for elem in moved])
+        store.add_positions(element_ids, np.array(velocities, dtype=float) * time)
+        for elem in moved:
+            elem.wake()
+
+    def get_moved_elements(self, element: Element[Any]) -> Sequence[Element[Any]]:
+        return (element,)
+
 
 class ChildElementTranslation(Translation):
     # apply translation to all children
     def step(self, element: Element[Element[Any]], time: float) -> None:
         for child in element._children:
             super().step(child, time)
+
+    def get_moved_elements(self, element: Element[Any]) -> Sequence[Element[Any]]:
+        return list(element._children)
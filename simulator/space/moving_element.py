@@ -1,11 +1,21 @@
-from typing import Optional, Set
+from typing import TYPE_CHECKING, Iterable, Optional, Set, Tuple
 
 from simulator.space.element import Element, Vector
 from simulator.space.movements import ElementMovement
 
+if TYPE_CHECKING:
+    from simulator.space.movement_registry import MovementRegistry
+    from simulator.space.tag_registry import TagRegistry
+
 
 class MovingElement(Element["MovingElement"]):
     # element subclass which supports moving in space
+    __slots__ = (
+        "_movements",
+        "_subtree_movement_count",
+        "_movement_registry",
+        "_tag_registry",
+    )
 
     def __init__(
         self,
@@ -16,18 +26,92 @@ class MovingElement(Element["MovingElement"]):
     ) -> None:
         super().__init__(position=position, rotation=rotation, name=name, parent=parent)
         self._movements: Set[ElementMovement] = set()
+        # number of movements of this element and all (grand-) children
+        self._subtree_movement_count = 0
+        # registry of all movements of the tree (only set for the top-level parent)
+        self._movement_registry: Optional["MovementRegistry"] = None
+        # registry of all tagged elements of the tree (only set for the top-level parent)
+        self._tag_registry: Optional["TagRegistry"] = None
 
     def start_movement(self, movement: ElementMovement) -> None:
-        self._movements.add(movement)
+        if movement not in self._movements:
+            self._movements.add(movement)
+            self._change_subtree_movement_count(+1)
+            registry = self._get_movement_registry()
+            if registry is not None:
+                registry.add(self, movement)
+        self.wake()
 
     def end_movement(self, movement: ElementMovement) -> None:
         self._movements.remove(movement)
+        self._change_subtree_movement_count(-1)
+        registry = self._get_movement_registry()
+        if registry is not None:
+            registry.remove(self, movement)
+
+    def _change_subtree_movement_count(self, change: int) -> None:
+        element: Optional[MovingElement] = self
+        while element is not None:
+            element._subtree_movement_count += change
+            element = element._parent
+
+    def _get_movement_registry(self) -> Optional["MovementRegistry"]:
+        element = self
+        while element._parent is not None:
+            element = element._parent
+        return getattr(element, "_movement_registry", None)  # (root may be an Element)
+
+    def _get_tag_registry(self) -> Optional["TagRegistry"]:
+        element = self
+        while element._parent is not None:
+            element = element._parent
+        return getattr(element, "_tag_registry", None)
+
+    def _get_subtree_movements(
+        self,
+    ) -> Iterable[Tuple["MovingElement", ElementMovement]]:
+        for movement in self._movements:
+            yield self, movement
+        for child in self._children:
+            if child._subtree_movement_count > 0:
+                yield from child._get_subtree_movements()
+
+    def attach(self, child: "MovingElement") -> None:
+        super().attach(child)  # (detaches from previous parent)
+        self._change_subtree_movement_count(child._subtree_movement_count)
+        if child._subtree_movement_count > 0:
+            registry = self._get_movement_registry()
+            if registry is not None:
+                for element, movement in child._get_subtree_movements():
+                    registry.add(element, movement)
+        tag_registry = self._get_tag_registry()
+        if tag_registry is not None:
+            tag_registry.add_subtree(child)
+
+    def detach(self, child: "MovingElement") -> None:
+        was_attached = child in self._children
+        super().detach(child)
+        if was_attached:
+            self._change_subtree_movement_count(-child._subtree_movement_count)
+            if child._subtree_movement_count > 0:
+                registry = self._get_movement_registry()
+                if registry is not None:
+                    for element, movement in child._get_subtree_movements():
+                        registry.remove(element, movement)
+            tag_registry = self._get_tag_registry()
+            if tag_registry is not None:
+                tag_registry.remove_subtree(child)
 
-    def step(self, time: float) -> None:
+    def step(self, time: float) -> int:
+        # steps all movements of the tree (without movement registry)
+        # returns number of stepped elements,
+        # subtrees without any movement are skipped (sleeping)
         for move in self._movements:
             move.step(self, time)
 
+        stepped = 1
         for child in self._children:
             # children are all of this class, thanks to generics (type parameter):
-            child.step(time)
-            child.get_all_children_breadth_first()
+            if child._subtree_movement_count > 0:
+                stepped += child.step(time)
+        return stepped
@@ -0,0 +1,66 @@
+# registry of all tagged collidable elements of a world, by tag
+# checkers get the tagged elements without scanning the whole element tree
+# (untagged elements like outlines or sprite holders are never visited)
+
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union
+
+from simulator.space.collidable_element import CollidableElement, Tag, TagCombination
+from simulator.space.element import Element
+
+
+class TagRegistry:
+    def __init__(self) -> None:
+        # (dicts as ordered sets)
+        self._elements: Dict[Tag, Dict[CollidableElement, None]] = {
+            tag: {} for tag in Tag
+        }
+
+    def add(self, element: CollidableElement) -> None:
+        for tag in element.tags:
+            self._elements[tag][element] = None
+
+    def remove(self, element: CollidableElement) -> None:
+        for tag in element.tags:
+            self._elements[tag].pop(element, None)
+
+    def add_subtree(self, element: Element[Any]) -> None:
+        # element and all (grand-) children
+        for level in element._get_subtree_levels():
+            for elem in level:
+                if isinstance(elem, CollidableElement):
+                    self.add(elem)
+
+    def remove_subtree(self, element: Element[Any]) -> None:
+        for level in element._get_subtree_levels():
+            for elem in level:
+                if isinstance(elem, CollidableElement):
+                    self.remove(elem)
+
+    def add_tag(self, element: CollidableElement, tag: Tag) -> None:
+        self._elements[tag][element] = None
+
+    def remove_tag(self, element: CollidableElement, tag: Tag) -> None:
+        self._elements[tag].pop(element, None)
+
+    def get_elements(self, tag: Tag) -> List[CollidableElement]:
+        return list(self._elements[tag])
+
+    def get_all(self) -> List[CollidableElement]:
+        # all elements with at least one tag
+        return list(
+            {elem: None for elements in self._elements.values() for elem in elements}
+        )
+
+    def get_tagged_elements(
+        self, tag_combination: TagCombination
+    ) -> Tuple[Set[CollidableElement], Set[CollidableElement]]:
+        # same as collision_checker.get_tagged_elements
+        # (elements with both tags only count as tag_1)
+        tag_1, tag_2 = tag_combination.value
+        tagged_1s = set(self._elements[tag_1])
+        tagged_2s = set(self._elements[tag_2]) - tagged_1s
+        return tagged_1s, tagged_2s
+
+
+# checkers accept either the registry or (reference mode) all elements of the tree
+TaggedElements = Union[TagRegistry, Iterable[Element[Any]]]
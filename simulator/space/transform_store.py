@@ -0,0 +1,178 @@
+# optional structure-of-arrays storage for the coordinates of all elements of a world
+# local coordinates are stored in contiguous arrays indexed by element id,
+# global coordinates of all elements are updated in one vectorized pass (level by level)
+
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+import numpy as np
+
+from simulator.space.element import ARRAY
+
+if TYPE_CHECKING:
+    from simulator.space.element import Element
+
+INITIAL_CAPACITY = 64
+NO_PARENT = -1
+
+
+class TransformStore:
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        self.local_positions: ARRAY = np.zeros((capacity, 2))
+        self.local_rotations: ARRAY = np.zeros(capacity)
+        self.global_positions: ARRAY = np.zeros((capacity, 2))
+        self.global_rotations: ARRAY = np.zeros(capacity)
+        self.parents: ARRAY = np.full(capacity, NO_PARENT, dtype=np.intp)
+
+        self._elements: List[Optional["Element[Any]"]] = []  # index = id
+        self._free_ids: List[int] = []
+        self._levels: Optional[List[ARRAY]] = None  # ids of each level (level order)
+        self._dirty = False  # global coordinates outdated
+
+    # registration:
+    def add(self, element: "Element[Any]") -> None:
+        # adds element and all (grand-) children, local coordinates are moved to the store
+        assert element._store is None
+        parent = element._parent
+        parent_id = NO_PARENT
+        if parent is not None and parent._store is self:
+            parent_id = parent._store_id
+        element_id = self._get_free_id()
+        self._elements[element_id] = element
+        self.local_positions[element_id] = element._position
+        self.local_rotations[element_id] = element._rotation
+        self.parents[element_id] = parent_id
+        element._store = self
+        element._store_id = element_id
+        self.invalidate_levels()
+        for child in element._children:
+            self.add(child)
+
+    def remove(self, element: "Element[Any]") -> None:
+        # removes element and all (grand-) children,
+        # local coordinates are moved back to the elements
+        for child in element._children:
+            self.remove(child)
+        element_id = element._store_id
+        element._position = self.local_positions[element_id].copy()
+        element._rotation = float(self.local_rotations[element_id])
+        element._global_cache = None
+        element._store = None
+        element._store_id = NO_PARENT
+        self._elements[element_id] = None
+        self.parents[element_id] = NO_PARENT
+        self._free_ids.append(element_id)
+        self.invalidate_levels()
+
+    def set_parent(
+        self, element: "Element[Any]", parent: Optional["Element[Any]"]
+    ) -> None:
+        parent_id = NO_PARENT
+        if parent is not None:
+            assert parent._store is self
+            parent_id = parent._store_id
+        self.parents[element._store_id] = parent_id
+        self.invalidate_levels()
+
+    def _get_free_id(self) -> int:
+        if len(self._free_ids) > 0:
+            return self._free_ids.pop()
+        element_id = len(self._elements)
+        if element_id == len(self.parents):
+            self._grow()
+        self._elements.append(None)
+        return element_id
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.parents)
+        self.local_positions = np.resize(self.local_positions, (capacity, 2))
+        self.local_rotations = np.resize(self.local_rotations, capacity)
+        self.global_positions = np.resize(self.global_positions, (capacity, 2))
+        self.global_rotations = np.resize(self.global_rotations, capacity)
+        parents = np.full(capacity, NO_PARENT, dtype=np.intp)
+        parents[: len(self.parents)] = self.parents
+        self.parents = parents
+
+    # local coordinates:
+    def set_position(self, element_id: int, value: ARRAY) -> None:
+        self.local_positions[element_id] = value
+        self._dirty = True
+
+    def add_positions(self, element_ids: ARRAY, changes: ARRAY) -> None:
+        np.add.at(self.local_positions, element_ids, changes)
+        self._dirty = True
+
+    def set_rotation(self, element_id: int, value: float) -> None:
+        self.local_rotations[element_id] = value
+        self._dirty = True
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    # global coordinates:
+    def invalidate_levels(self) -> None:
+        self._levels = None
+        self._dirty = True
+
+    def _get_levels(self) -> List[ARRAY]:
+        if self._levels is not None:
+            return self._levels
+        count = len(self._elements)
+        parents = self.parents[:count]
+        used = np.array([e is not None for e in self._elements], dtype=bool)
+        # depth via repeated parent lookups (one iteration per level)
+        depths = np.zeros(count, dtype=np.intp)
+        ancestors = parents.copy()
+        while np.any(ancestors != NO_PARENT):
+            has_ancestor = ancestors != NO_PARENT
+            depths[has_ancestor] += 1
+            ancestors[has_ancestor] = parents[ancestors[has_ancestor]]
+        ids = np.flatnonzero(used)
+        ids = ids[np.argsort(depths[ids], kind="stable")]
+        level_starts = np.flatnonzero(np.diff(depths[ids], prepend=-1))
+        self._levels = np.split(ids, level_starts[1:])
+        return self._levels
+
+    def update(self) -> None:
+        # recomputes global coordinates of all elements (if changed)
+        if not self._dirty:
+            return
+        levels = self._get_levels()
+        if len(levels) > 0 and len(levels[0]) > 0:
+            roots = levels[0]
+            self.global_positions[roots] = self.local_positions[roots]
+            self.global_rotations[roots] = self.local_rotations[roots]
+        for ids in levels[1:]:
+            parent_ids = self.parents[ids]
+            parent_rotations = self.global_rotations[parent_ids]
+            angle_rad = np.deg2rad(parent_rotations)
+            cos, sin = np.cos(angle_rad), np.sin(angle_rad)
+            x = self.local_positions[ids, 0]
+            y = self.local_positions[ids, 1]
+            # same rotation as get_rotated_position:
+            self.global_positions[ids, 0] = (
+                self.global_positions[parent_ids, 0] + x * cos + y * sin
+            )
+            self.global_positions[ids, 1] = (
+                self.global_positions[parent_ids, 1] + -1 * x * sin + y * cos
+            )
+            # same as get_rot_0_359:
+            self.global_rotations[ids] = (
+                ((parent_rotations + self.local_rotations[ids]) % 360) + 360
+            ) % 360
+        self._dirty = False
+
+    def get_global_coordinates(self, element_id: int) -> Tuple[ARRAY, float]:
+        self.update()
+        return (
+            self.global_positions[element_id].copy(),
+            float(self.global_rotations[element_id]),
+        )
+
+    def get_global_xy_rot(self, element_id: int) -> Tuple[float, float, float]:
+        self.update()
+        x, y = self.global_positions[element_id].tolist()
+        return x, y, float(self.global_rotations[element_id])
+
+    def get_global_coordinates_arrays(self, element_ids: ARRAY) -> Tuple[ARRAY, ARRAY]:
+        self.update()
+        return self.global_positions[element_ids], self.global_rotations[element_ids]
@@ -1,21 +1,136 @@
-from typing import Any, Sequence
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 from simulator.space.attachment_checker import update_element_attachments
+from simulator.space.broad_phase import CELL_SIZE, AllPairs, BroadPhase, SpatialHash
+from simulator.space.collidable_element import CollidableElement, TagCombination
 from simulator.space.collision_state_checker import update_collision_states
+from simulator.space.contact_cache import ContactCache
 from simulator.space.element import Element
+from simulator.space.events import (
+    Motion,
+    get_time_to_next_contact_change,
+    get_time_to_rotation_end,
+)
+from simulator.space.movement_registry import MovementRegistry
 from simulator.space.moving_element import MovingElement
+from simulator.space.tag_registry import TagRegistry
+from simulator.space.transform_store import TransformStore
+
+FIXED_STEP: float = 1 / 30  # for non-linear motions (rotations) in event stepping
+EVENT_EPSILON: float = 1e-6  # step slightly past events (inclusive boundaries)
+
+
+class StepCounters:
+    # work done / skipped during the last step
+    def __init__(self) -> None:
+        self.stepped_elements = 0  # elements with movements
+        self.skipped_elements = 0  # elements without movements
+        self.awake_collidables = 0  # checked for collisions
+        self.sleeping_collidables = 0  # not checked, contacts taken from cache
 
 
 class World:
     # manages all elements + movements
 
-    def __init__(self) -> None:
+    def __init__(
+        self, cell_size: Optional[float] = CELL_SIZE, transform_store: bool = False
+    ) -> None:
         self.origin = MovingElement(name="origin")
+        self.movements = MovementRegistry()  # all active movements
+        self.origin._movement_registry = self.movements
+        self.tagged = TagRegistry()  # all tagged (collision checked) elements
+        self.origin._tag_registry = self.tagged
+        # cell_size=None: check all pairs of elements for collisions (reference mode)
+        self.broad_phase: Optional[BroadPhase] = (
+            SpatialHash(cell_size) if cell_size is not None else None
+        )
+        # transform_store: coordinates of all elements stored in (vectorized) arrays
+        self.transform_store: Optional[TransformStore] = None
+        if transform_store:
+            self.transform_store = TransformStore()
+            self.transform_store.add(self.origin)
+
+        self.counters = StepCounters()
+        # contacts are kept between steps, pairs of sleeping elements are not checked
+        self.attachment_contacts: Optional[ContactCache] = None
+        self.collision_contacts: Optional[ContactCache] = None
+        if self.broad_phase is not None:
+            self.attachment_contacts = ContactCache(
+                TagCombination.POINT_AND_MOVING_SHAPE, self.broad_phase
+            )
+            self.collision_contacts = ContactCache(
+                TagCombination.SEGMENT_AND_SHAPE, self.broad_phase
+            )
 
     def step(self, time: float) -> None:
-        self.origin.step(time)  # execute all movements
-        update_element_attachments(self.origin.get_all_children_breadth_first())
-        update_collision_states(self.origin.get_all_children_breadth_first())
+        self.movements.step(time)  # execute all movements
+        stepped = len(
+            [e for e in self.movements.get_elements() if e is not self.origin]
+        )
+        if self.transform_store is not None:
+            self.transform_store.update()  # all global coordinates at once
+        update_element_attachments(
+            self.tagged, self.broad_phase, self.attachment_contacts
+        )
+        update_collision_states(self.tagged, self.broad_phase, self.collision_contacts)
+        tagged = self.tagged.get_all()
+        self._update_counters(tagged, stepped)
+        self._put_to_sleep(tagged)
+
+    def _update_counters(
+        self, tagged: Sequence[CollidableElement], stepped: int
+    ) -> None:
+        self.counters.stepped_elements = stepped
+        self.counters.skipped_elements = (
+            len(self.origin.get_all_children_breadth_first()) - stepped
+        )
+        self.counters.awake_collidables = 0
+        self.counters.sleeping_collidables = 0
+        for elem in tagged:
+            if elem._sleeping:
+                self.counters.sleeping_collidables += 1
+            else:
+                self.counters.awake_collidables += 1
+
+    def _put_to_sleep(self, tagged: Sequence[CollidableElement]) -> None:
+        # until woken by a change of the transform (movement, attach/detach, ...)
+        # (only tagged elements are checked for collisions, and added tags wake up)
+        for elem in tagged:
+            elem._sleeping = True
+
+    # event stepping:
+    def get_time_to_next_event(self, horizon: float) -> Tuple[float, bool]:
+        # returns time until the next contact change or end of a limited rotation,
+        # and whether there are non-linear motions to be stepped with fixed steps
+        time = get_time_to_rotation_end(self.movements.get_elements())
+        if self.origin._subtree_movement_count == 0:
+            return time, False
+        broad_phase = self.broad_phase if self.broad_phase is not None else AllPairs()
+        motions: Dict[Element[Any], Motion] = {}
+        requires_fixed_step = False
+        for tag_combination in TagCombination:
+            contact_change, non_linear = get_time_to_next_contact_change(
+                self.tagged, tag_combination, broad_phase, horizon, motions
+            )
+            time = min(time, contact_change)
+            requires_fixed_step = requires_fixed_step or non_linear
+        return time, requires_fixed_step
+
+    def step_to_next_event(
+        self, max_time: float, fixed_step: float = FIXED_STEP
+    ) -> float:
+        # steps straight to (slightly past) the next event, but not further than max_time
+        # returns the stepped time
+        if not math.isfinite(max_time):
+            raise ValueError("max_time must be finite: " + str(max_time))
+        time, requires_fixed_step = self.get_time_to_next_event(max_time)
+        time += EVENT_EPSILON
+        if requires_fixed_step:
+            time = min(time, fixed_step)
+        time = min(time, max_time)
+        self.step(time)
+        return time
 
     def get_elements_breadth_first(self) -> Sequence[Element[Any]]:
         return self.origin.get_all_children_breadth_first()
@@ -0,0 +1,92 @@
+from collections import deque
+from typing import Deque, List
+
+import pytest
+
+from module_control.emulation.cffi.module import InstanceHost, InstanceIO
+
+
+class ScriptedIO(InstanceIO):
+    def __init__(self) -> None:
+        self.name = "t_1_1"
+        self.inbox: Deque[int] = deque()  # (serial line)
+        self.outbox: List[int] = []
+        self.translation = 0
+
+    def light_barrier(self) -> bool:
+        return False
+
+    def endlage_0(self) -> bool:
+        return True
+
+    def endlage_90(self) -> bool:
+        return False
+
+    def set_rotation(self, dir: int) -> None:
+        pass
+
+    def set_translation(self, dir: int) -> None:
+        self.translation = dir
+
+    def serial_read(self) -> int:
+        return self.inbox.popleft() if self.inbox else -1
+
+    def serial_write(self, b: int) -> None:
+        self.outbox.append(b)
+
+
+def test_command_during_forward_is_started_next():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    io = ScriptedIO()
+    host = InstanceHost([io])
+    io.inbox.extend([6, 0])  # forward to right, (pipelined) receive from left
+    for _ in range(3):
+        host.loop(10)
+    assert io.translation == 0  # (receive command is no confirmation)
+    io.inbox.append(20)  # start translation
+    host.loop(10)
+    host.loop(10)
+    assert io.translation == 1 and io.outbox == []
+    io.inbox.append(20)  # stop belt
+    host.loop(10)
+    assert io.translation == 0
+    host.loop(10)  # (receive from left, no rotation needed)
+    assert io.outbox == [10]  # ready to receive
+    host.close()
+
+
+def test_unexpected_byte_is_no_confirmation():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    io = ScriptedIO()
+    host = InstanceHost([io])
+    io.inbox.extend([6, 10])  # forward to right, (unexpected) ready to receive
+    for _ in range(3):
+        host.loop(10)
+    assert io.translation == 0
+    io.inbox.append(20)  # start translation
+    host.loop(10)
+    host.loop(10)
+    assert io.translation == 1
+    host.close()
+
+
+def test_cancel_aborts_receive_and_forward():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    io = ScriptedIO()
+    host = InstanceHost([io])
+    io.inbox.append(0)  # receive from left
+    for _ in range(3):
+        host.loop(10)
+    assert io.outbox == [10] and io.translation != 0  # ready, belt running
+    io.inbox.append(30)  # cancel
+    host.loop(10)
+    assert io.translation == 0
+    io.inbox.extend([6, 30, 20])  # forward to right, cancel, (ignored) confirmation
+    for _ in range(4):
+        host.loop(10)
+    assert io.translation == 0
+    io.inbox.extend([6, 20])  # forward to right, start translation
+    for _ in range(4):
+        host.loop(10)
+    assert io.translation == 1
+    host.close()
@@ -0,0 +1,36 @@
+from multiprocessing import Process, RawValue
+
+import pytest
+
+from module_control.emulation.clock import ClockMode, LockstepClock, create_clock
+
+
+def accumulate(clock: LockstepClock, millis) -> None:
+    while True:
+        passed_time_ms = clock.wait_release()
+        if passed_time_ms is None:
+            millis.value = -1  # (stopped)
+        else:
+            millis.value += passed_time_ms
+        clock.ack()
+
+
+@pytest.mark.parametrize("mode", list(ClockMode))
+def test_lockstep(mode):
+    clock = create_clock(mode)
+    millis = RawValue("i", 0)
+    proc = Process(target=accumulate, args=(clock, millis), daemon=True)
+    proc.start()
+    try:
+        for tick in range(1, 101):
+            clock.release(tick)
+            clock.wait_ack()
+            assert millis.value == tick * (tick + 1) // 2  # child finished its loop
+        clock.release(0)  # (no stop: a step without passed time)
+        clock.wait_ack()
+        assert millis.value == 5050
+        clock.stop()
+        clock.wait_ack()
+        assert millis.value == -1
+    finally:
+        proc.terminate()
@@ -0,0 +1,29 @@
+import pytest
+
+from module_control.emulation.process_image import Input, Output, ProcessImage
+
+
+def test_inputs_are_bit_packed_per_module():
+    image = ProcessImage(8)
+    assert len(image.inputs) == 3  # 8 * 3 bits
+    image.toggle_inputs(2, 1 << Input.ENDLAGE_90)  # (crosses a byte boundary)
+    image.toggle_inputs(5, 1 << Input.LIGHT_BARRIER | 1 << Input.ENDLAGE_0)
+    assert [image.read_inputs(m) for m in range(8)] == [0, 0, 4, 0, 0, 3, 0, 0]
+    assert image.read_input(2, Input.ENDLAGE_90)
+    assert not image.read_input(2, Input.ENDLAGE_0)
+    image.toggle_inputs(5, 1 << Input.ENDLAGE_0)  # (others untouched)
+    assert [image.read_inputs(m) for m in range(8)] == [0, 0, 4, 0, 0, 1, 0, 0]
+    with pytest.raises(IndexError):
+        image.toggle_inputs(8, 1)
+
+
+def test_outputs_and_clear():
+    image = ProcessImage(2)
+    image.write_output(1, Output.ROTATION, -1)
+    image.write_output(1, Output.TRANSLATION, 1)
+    image.toggle_inputs(1, 7)
+    assert image.read_output(1, Output.ROTATION) == -1
+    assert image.read_output(0, Output.ROTATION) == 0
+    image.clear(1)
+    assert image.read_inputs(1) == 0
+    assert image.read_output(1, Output.TRANSLATION) == 0
@@ -0,0 +1,56 @@
+from multiprocessing import Process
+
+import pytest
+
+from module_control.emulation.ring_buffer import RingBuffer, RingConnection, RingPipe
+
+
+@pytest.mark.parametrize("ordered_stores", [True, False])
+def test_wrap_around(ordered_stores: bool):
+    ring = RingBuffer(capacity=5, ordered_stores=ordered_stores)
+    assert ring.write(b"abc") == 3
+    assert ring.read(2) == b"ab"
+    assert ring.write(b"defgh") == 4  # full
+    assert not ring.write_byte(1)
+    assert len(ring) == 5
+    assert ring.read() == b"cdefg"
+    assert ring.read_byte() == -1 and ring.read() == b""
+    assert ring.write_byte(1) and ring.read_byte() == 1
+
+
+def test_connection_interface():
+    a, b = RingPipe()
+    assert not b.poll()
+    a.send(7)
+    a.write(bytes([1, 2]))
+    assert b.poll()
+    assert b.recv() == 7
+    assert b.read() == bytes([1, 2])
+    with pytest.raises(ValueError):
+        a.send(256)
+    a.write(b"xy")
+    b.write(b"z")
+    a.clear()
+    assert not a.poll() and not b.poll()
+
+
+def echo_all(connection: RingConnection) -> None:
+    while True:
+        connection.send(connection.recv())
+
+
+@pytest.mark.parametrize("ordered_stores", [True, False])  # (False: under a lock)
+def test_between_processes(ordered_stores: bool):
+    parent, child = RingPipe(capacity=8, ordered_stores=ordered_stores)
+    proc = Process(target=echo_all, args=(child,), daemon=True)
+    proc.start()
+    try:
+        data = bytes(range(100))
+        received = b""
+        written = 0
+        while len(received) < len(data):
+            written += parent.write(data[written:])
+            received += parent.read()
+        assert received == data
+    finally:
+        proc.terminate()
@@ -0,0 +1,43 @@
+import asyncio
+from typing import List
+
+from server.module_agent.dir import Dir
+from server.module_agent.inbound_queue import (
+    DispatchPolicy,
+    InboundQueue,
+    ReceiveRequest,
+)
+from server.module_agent.module_agent import Box
+from server.routing.router import Router, get_map
+
+
+def pop_all(policy: DispatchPolicy, urgent: str = "") -> List[str]:
+    # senders in the order of admission: box 1 far with late due,
+    # box 2 near with early due, box 3 in between
+    router = Router(get_map(4, 1, is_excluded=lambda x, y: False))
+    queue = InboundQueue("t_1_1", router, policy)
+
+    async def add_requests():
+        for sender, target, due in (
+            ("a", "t_4_1", 30.0),
+            ("b", "t_2_1", 10.0),
+            ("c", "t_3_1", 20.0),
+        ):
+            box = Box("box_" + sender, router.names, due=due)
+            box.current_target = target
+            queue.add(ReceiveRequest(sender, box, Dir.LEFT, 0, sender == urgent))
+
+    asyncio.run(add_requests())
+    assert len(queue) == queue.max_length == 3
+    return [queue.pop().sender for _ in range(3)]
+
+
+def test_dispatch_policies():
+    assert pop_all(DispatchPolicy.FIFO) == ["a", "b", "c"]
+    assert pop_all(DispatchPolicy.EARLIEST_DUE) == ["b", "c", "a"]
+    assert pop_all(DispatchPolicy.SHORTEST_REMAINING_ROUTE) == ["b", "c", "a"]
+
+
+def test_urgent_requests_first():
+    assert pop_all(DispatchPolicy.FIFO, urgent="c") == ["c", "a", "b"]
+    assert pop_all(DispatchPolicy.EARLIEST_DUE, urgent="a") == ["a", "b", "c"]
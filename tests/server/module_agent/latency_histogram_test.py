@@ -0,0 +1,30 @@
+import pytest
+
+from server.module_agent.latency_histogram import LatencyHistogram, merge_histograms
+
+
+def test_buckets_and_percentiles():
+    histogram = LatencyHistogram(bounds_ms=(1, 10, 100))
+    for latency_s in (0.0005, 0.001, 0.005, 0.005, 0.2):
+        histogram.add(latency_s)
+    assert histogram.counts == [2, 2, 0, 1]
+    assert histogram.count() == 5
+    assert histogram.mean_ms() == pytest.approx(42.3)
+    assert histogram.percentile_ms(0.4) == 1
+    assert histogram.percentile_ms(0.5) == 10
+    assert histogram.percentile_ms(1) == pytest.approx(200)  # (max)
+    assert "<=10 ms: 2" in histogram.report()
+    with pytest.raises(ValueError):
+        LatencyHistogram(bounds_ms=(10, 1))
+
+
+def test_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.add(0.003)
+    b.add(0.003)
+    b.add(3)
+    merged = merge_histograms([a, b])
+    assert merged.count() == 3
+    assert merged.max_ms == pytest.approx(3000)
+    with pytest.raises(ValueError):
+        a.merge(LatencyHistogram(bounds_ms=(1,)))
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+from multiprocessing import Pipe
+from typing import Dict, List, Tuple
+
+from module_control.emulation.local_connection import LocalPipe
+from module_control.emulation.module_stub import ModuleStub
+from module_control.emulation.ring_buffer import RingPipe
+from server.module_agent.dir import Dir
+from server.module_agent.module_agent import (
+    REROUTE_INTERVAL,
+    Box,
+    ModuleAgent,
+    wait_readable,
+)
+from server.routing.router import Router, get_map
+from simulator.scheduler.virtual_time_loop import VirtualTimeLoop
+
+
+def test_virtual_time_loop_wakes_up_on_arrival():
+    loop = VirtualTimeLoop()
+    agent_side, module_side = RingPipe()
+    waiter = loop.create_task(wait_readable(agent_side))
+    loop.loop(33)
+    assert not waiter.done()
+    assert loop._get_next_timer() is None  # (no polling timers)
+    module_side.send(10)
+    loop.loop(0)  # (same tick)
+    assert waiter.done() and agent_side.recv() == 10
+    loop.close()
+
+
+def test_file_descriptor_reader():
+    loop = asyncio.new_event_loop()
+    agent_side, module_side = Pipe()
+    threading.Timer(0.01, lambda: module_side.send(10)).start()
+    loop.run_until_complete(asyncio.wait_for(wait_readable(agent_side), timeout=5))
+    assert agent_side.recv() == 10
+    loop.close()
+
+
+def test_box_waits_until_target_is_reachable():
+    loop = VirtualTimeLoop()
+    router = Router()
+    agents: Dict[str, ModuleAgent] = {}
+    connections = {}
+    for name in ("t_1_1", "t_1_2"):
+        connections[name], _ = LocalPipe()
+        ModuleAgent(name, connections[name], router, agents)
+    box = Box("box_1", ["t_1_1", "t_1_2"])
+    box.current_target = "t_1_2"
+    agents["t_1_1"].handled_box = box
+    router.disable_module("t_1_2")
+    loop.create_task(agents["t_1_1"].forward_box_async())
+    loop.advance(5)
+    assert len(connections["t_1_1"]._outbox) == 0  # (no command)
+    router.enable_module("t_1_2")
+    loop.advance(REROUTE_INTERVAL)
+    assert list(connections["t_1_1"]._outbox) == [5]  # forward to top
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_idle()
+    loop.close()
+
+
+def run_boxes(boxes: Dict[str, List[str]], duration: float):
+    # boxes (name: targets) start on the last of their targets (3 modules in a row),
+    # returns the agents and the arrivals (box, module, time)
+    loop = VirtualTimeLoop()
+    router = Router(get_map(3, 1, is_excluded=lambda x, y: False))
+    agents: Dict[str, ModuleAgent] = {}
+    for name in router.names:
+        ModuleAgent(name, ModuleStub(loop), router, agents)
+    arrivals: List[Tuple[str, str, float]] = []
+
+    class RecordingBox(Box):
+        def update_location(self, location: str):
+            arrivals.append((self.name, location, loop.time()))
+            super().update_location(location)
+
+    for box_name, targets in boxes.items():
+        box = RecordingBox(box_name, targets)
+        box.current_target = targets[0]
+        agents[targets[-1]].handled_box = box
+        loop.create_task(agents[targets[-1]].forward_box_async())
+    loop.advance(duration)
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_idle()
+    loop.close()
+    return agents, arrivals
+
+
+def test_boxes_are_admitted_one_at_a_time():
+    agents, arrivals = run_boxes(
+        {"box_a": ["t_2_1", "t_1_1"], "box_b": ["t_2_1", "t_3_1"]}, 5
+    )
+    assert arrivals == [
+        ("box_a", "t_2_1", 1.5),
+        ("box_a", "t_1_1", 3.0),  # (module t_2_1 free again)
+        ("box_b", "t_2_1", 4.5),
+    ]
+    assert agents["t_2_1"].boxes_received == 2
+    assert agents["t_2_1"].inbound.max_length == 1  # (box_b queued)
+    assert agents["t_3_1"].admission_wait_time == 3.0
+    assert agents["t_2_1"].get_occupied_time(5) == 5.0  # (reserved for box_b at once)
+    assert agents["t_1_1"].get_occupied_time(5) == 5.0 - 1.5
+    assert sum(agent.deadlocks for agent in agents.values()) == 0
+
+
+def test_cyclic_wait_is_resolved():
+    # boxes swap modules: box_a makes way to the free module
+    agents, arrivals = run_boxes(
+        {"box_a": ["t_3_1", "t_2_1"], "box_b": ["t_2_1", "t_3_1"]}, 10
+    )
+    # (two swaps, each cyclic wait resolved once)
+    assert sum(agent.deadlocks for agent in agents.values()) == 2
+    assert [(box, module) for box, module, _ in arrivals] == [
+        ("box_a", "t_1_1"),
+        ("box_b", "t_2_1"),
+        ("box_b", "t_3_1"),
+        ("box_a", "t_2_1"),
+        ("box_a", "t_1_1"),
+        ("box_b", "t_2_1"),
+    ]
+
+
+def test_prepared_hop_is_routed_again_if_disabled():
+    # (pipelined) next hop prepared while the box is received, then disabled:
+    # forward command and reservation cancelled, routed via the other row
+    loop = VirtualTimeLoop()
+    router = Router(get_map(3, 2, is_excluded=lambda x, y: False))
+    agents: Dict[str, ModuleAgent] = {}
+    for name in router.names:
+        ModuleAgent(name, ModuleStub(loop), router, agents, pipelined=True)
+    locations: List[str] = []
+
+    class RecordingBox(Box):
+        def update_location(self, location: str):
+            locations.append(location)
+            super().update_location(location)
+
+    box = RecordingBox("box_a", ["t_3_1", "t_1_1"])
+    box.current_target = "t_3_1"
+    agents["t_1_1"].handled_box = box
+    loop.create_task(agents["t_1_1"].forward_box_async())
+    loop.advance(0.5)
+    assert agents["t_2_1"].next_hop == (Dir.RIGHT, "t_3_1")
+    router.disable_link("t_2_1", "t_3_1")
+    loop.advance(10)
+    # (t_3_1 free again after the cancel)
+    assert locations[:4] == ["t_2_1", "t_2_2", "t_3_2", "t_3_1"]
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_idle()
+    loop.close()
@@ -0,0 +1,70 @@
+import random
+
+import networkx as nx  # type: ignore
+import pytest
+
+from server.module_agent.dir import Dir
+from server.routing.reservation_router import (
+    HOP_TIME,
+    ReservationRouter,
+    ReservationTable,
+)
+from server.routing.router import get_map
+
+
+def test_free_start_skips_windows_of_other_boxes():
+    table = ReservationTable()
+    table.reserve("a", 2, 4, "box_1")
+    table.reserve("a", 5, 7, "box_2")
+    table.reserve("a", 4, 5, "box_3")
+    assert table.get_free_start("a", 0, 2, "box_0") == 0
+    assert table.get_free_start("a", 1, 2, "box_0") == 7
+    assert table.get_free_start("a", 1, 2, "box_1") == 1  # (own window)
+    assert table.get_free_start("a", 3, 1, "box_3") == 4
+    assert table.get_free_start("b", 1, 2, "box_0") == 1
+    table.release("box_2")
+    assert table.get_free_start("a", 1, 2, "box_0") == 5
+    with pytest.raises(ValueError):
+        table.reserve("a", 1, 0, "box_0")
+
+
+def test_past_windows_are_dropped():
+    table = ReservationTable()
+    table.reserve("a", 0, 2, "box_1")
+    table.reserve("b", 1, 3, "box_1")
+    table.reserve("a", 4, 6, "box_2")
+    table.advance(3)
+    table.reserve("a", 6, 8, "box_3")  # (drops the window of box_1)
+    assert table.windows["a"] == [(4, 6, "box_2"), (6, 8, "box_3")]
+    table.release("box_2")
+    assert table.windows == {"a": [(6, 8, "box_3")], "b": [(1, 3, "box_1")]}
+    assert set(table.modules) == {"box_1", "box_3"}
+    table.release("box_1")
+    assert table.windows == {"a": [(6, 8, "box_3")]}
+
+
+def test_shortest_paths_without_congestion():
+    random.seed(0)
+    holes = {(random.randint(1, 8), random.randint(1, 6)) for _ in range(8)}
+    router = ReservationRouter(get_map(8, 6, lambda x, y: (x, y) in holes))
+    lengths = dict(nx.all_pairs_shortest_path_length(router.graph))
+    for _ in range(50):
+        frm, to = random.sample(router.names, 2)
+        if to not in lengths[frm]:
+            with pytest.raises(ValueError):
+                router.route("box_0", frm, to, 0)
+            continue
+        direction, neighbour = router.route("box_0", frm, to, 0)
+        assert router.mapp[frm][neighbour]["dir"] == direction
+        assert lengths[neighbour][to] == lengths[frm][to] - 1
+
+
+def test_reserved_module_is_bypassed():
+    router = ReservationRouter(get_map(3, 2, lambda x, y: False))
+    assert router.route("box_0", "t_1_1", "t_3_1", 0) == (Dir.RIGHT, "t_2_1")
+    router.reservations.reserve("t_2_1", 0, 10, "box_1")
+    # (waiting for t_2_1 takes longer than the detour)
+    assert router.route("box_0", "t_1_1", "t_3_1", 0) == (Dir.TOP, "t_1_2")
+    assert router.plan("box_0", "t_1_1", "t_3_1", 0)[-1] == ("t_3_2", 3 * HOP_TIME)
+    router.release("box_1")
+    assert router.route("box_0", "t_1_1", "t_3_1", 0) == (Dir.RIGHT, "t_2_1")
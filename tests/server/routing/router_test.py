@@ -0,0 +1,88 @@
+import random
+
+import networkx as nx  # type: ignore
+import pytest
+
+import server.routing.router as router_module
+from server.module_agent.dir import Dir
+from server.routing.router import (
+    REBUILD_SHARE,
+    Router,
+    get_map,
+    get_next_hop_table,
+)
+
+
+def assert_shortest_paths(router: Router) -> None:
+    lengths = dict(nx.all_pairs_shortest_path_length(router.graph))
+    for frm in router.names:
+        for to in router.names:
+            if frm == to:
+                continue
+            if to not in lengths[frm]:
+                with pytest.raises(ValueError):
+                    router.get_next_direction(frm, to)
+                with pytest.raises(ValueError):
+                    router.get_hops(frm, to)
+                continue
+            direction, neighbour = router.get_next_direction(frm, to)
+            assert router.mapp[frm][neighbour]["dir"] == direction
+            assert lengths[neighbour][to] == lengths[frm][to] - 1
+            assert router.get_hops(frm, to) == lengths[frm][to]
+
+
+def test_sample_layout():
+    router = Router()
+    assert router.get_next_direction("t_1_1", "t_1_3") == (Dir.TOP, "t_1_2")
+    assert_shortest_paths(router)
+    with pytest.raises(ValueError):
+        router.get_next_direction("t_1_1", "t_1_1")
+
+
+def test_random_grids_with_unreachable_modules():
+    random.seed(0)
+    for _ in range(5):
+        holes = {(random.randint(1, 12), random.randint(1, 9)) for _ in range(30)}
+        assert_shortest_paths(Router(get_map(12, 9, lambda x, y: (x, y) in holes)))
+
+
+def test_invalid_map():
+    mapp = {"a": {"b": {"dir": Dir.LEFT}, "c": {"dir": Dir.LEFT}}, "b": {}, "c": {}}
+    with pytest.raises(ValueError):
+        Router(mapp)
+
+
+@pytest.mark.parametrize("rebuild_share", [REBUILD_SHARE, 1.0])  # (1: incremental)
+def test_runtime_changes_equal_rebuild(monkeypatch, rebuild_share: float):
+    monkeypatch.setattr(router_module, "REBUILD_SHARE", rebuild_share)
+    random.seed(1)
+    holes = {(random.randint(1, 10), random.randint(1, 8)) for _ in range(10)}
+    mapp = get_map(10, 8, lambda x, y: (x, y) in holes)
+    router = Router(mapp)
+    names = list(mapp)
+    for _ in range(40):
+        a = random.choice(names)
+        operation = random.random()
+        if operation < 0.3:
+            router.disable_module(a)
+        elif operation < 0.5:
+            router.enable_module(a)
+        elif mapp[a]:
+            b = random.choice(list(mapp[a]))
+            if operation < 0.8:
+                router.disable_link(a, b)
+            else:
+                router.enable_link(a, b)
+        assert_shortest_paths(router)
+        assert (
+            (get_next_hop_table(router.neighbours) != 0) == (router.next_hops != 0)
+        ).all()
+    for name in list(router.disabled_modules):
+        router.enable_module(name)
+    for a, b in list(router.disabled_links):
+        router.enable_link(a, b)
+    # (ties between shortest paths may be broken differently)
+    assert ((router.next_hops != 0) == (Router(mapp).next_hops != 0)).all()
+    assert_shortest_paths(router)
+    with pytest.raises(ValueError):
+        router.disable_link(names[0], names[0])
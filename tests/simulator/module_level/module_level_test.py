@@ -0,0 +1,170 @@
+from typing import List, Tuple
+
+import pytest
+
+from instances.instance_1.instance_1 import World1
+from module_control.emulation.process_image import Input, Output
+from server.module_agent.dir import Dir
+from server.module_agent.module_agent import COMMAND_MAP, Skill
+from server.routing.router import Router
+from simulator.module_level.module_level import (
+    ControlMode,
+    ControllerGroup,
+    ControllerPool,
+    ModuleIO,
+    WorkerPool,
+    create_controls,
+    create_slots,
+)
+
+
+class FakeController:
+    def __init__(self, name: str, calls: List[Tuple[str, str]]) -> None:
+        self.name = name
+        self.calls = calls
+
+    def write_sensors(self) -> None:
+        self.calls.append(("write_sensors", self.name))
+
+    def release(self, passed_time_ms: int) -> None:
+        self.calls.append(("release", self.name))
+
+    def wait_ack(self) -> None:
+        self.calls.append(("wait_ack", self.name))
+
+    def apply_actuators(self) -> None:
+        self.calls.append(("apply_actuators", self.name))
+
+
+def test_group_releases_all_before_waiting():
+    calls: List[Tuple[str, str]] = []
+    group = ControllerGroup([FakeController(n, calls) for n in ("a", "b")])
+    group.loop(10)
+    assert calls == [
+        (phase, name)
+        for phase in ("write_sensors", "release", "wait_ack", "apply_actuators")
+        for name in ("a", "b")
+    ]
+
+
+def test_module_io_writes_and_applies_changes_only(monkeypatch):
+    tt = World1().modules[0][0]
+    slots = create_slots(2)
+    image = slots[1].image
+    io = ModuleIO(tt, slots[1])
+    io.write_sensors()
+    assert [image.read_inputs(m) for m in range(2)] == [0, 1 << Input.ENDLAGE_0]
+
+    toggled = []
+    monkeypatch.setattr(image, "toggle_inputs", lambda *args: toggled.append(args))
+    io.write_sensors()
+    assert toggled == []  # unchanged
+
+    turned = []
+    turn_clockwise = tt.turn_clockwise
+
+    def recording_turn_clockwise() -> None:
+        turned.append(True)
+        turn_clockwise()
+
+    monkeypatch.setattr(tt, "turn_clockwise", recording_turn_clockwise)
+    image.write_output(1, Output.ROTATION, 1)
+    io.apply_actuators()
+    io.apply_actuators()
+    assert turned == [True] and tt.current_rotation_direction() == 1
+    tt.stop_turning()  # (e.g. reset, output unchanged)
+    io.apply_actuators()
+    assert turned == [True, True]
+
+
+def test_pool_keeps_module_states_apart():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    world = World1()
+    tts = sum(world.modules, [])[:3]
+    pool = ControllerPool(tts, pool_size=1)  # all modules in one process
+    try:
+        rotating, receiving, idle = pool.modules
+        rotating.module_parent_connection.send(5)  # forward to top (rotate)
+        receiving.module_parent_connection.send(0)  # receive from left
+        for _ in range(3):
+            pool.loop(10)
+        assert rotating.tt.current_rotation_direction() == 1
+        assert receiving.tt.current_rotation_direction() == 0
+        assert receiving.module_parent_connection.recv() == 10  # ready
+        assert not rotating.module_parent_connection.poll()
+        assert idle.tt.current_rotation_direction() == 0
+    finally:
+        pool.terminate()
+
+
+def test_worker_pool_is_recycled_between_runs():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    worker_pool = WorkerPool(pool_size=1, slots_per_worker=4)
+    pids = [proc.pid for proc in worker_pool.worker_procs]
+    try:
+        for _ in range(2):  # scenario runs
+            tts = sum(World1().modules, [])[:3]
+            pool = ControllerPool(tts, worker_pool=worker_pool)
+            with pytest.raises(RuntimeError):
+                worker_pool.assign(tts)
+            rotating = pool.modules[0]
+            rotating.module_parent_connection.send(5)  # forward to top (rotate)
+            for _ in range(3):
+                pool.loop(10)
+            assert rotating.tt.current_rotation_direction() == 1
+            assert pool.modules[1].tt.current_rotation_direction() == 0
+            pool.terminate()  # (recycle only)
+        assert [proc.is_alive() for proc in worker_pool.worker_procs] == [True]
+        assert [proc.pid for proc in worker_pool.worker_procs] == pids
+        assert list(worker_pool.startup.phases) == [
+            "import",
+            "allocate",
+            "fork",
+            "warm up",
+            "assign",
+        ]
+        with pytest.raises(ValueError):
+            worker_pool.assign(sum(World1().modules, [])[:5])  # > 4 slots
+    finally:
+        worker_pool.shutdown()
+
+
+def forward_box(mode: ControlMode, target: str) -> List[Tuple[int, str, str]]:
+    # synchronous version of the module agents handshakes, returns all events
+    world = World1()
+    tts = sum(world.modules, [])
+    controls = create_controls(tts, mode)
+    connections = controls.get_connections()
+    router = Router()
+    world.modules[0][0].spawn_box()
+    events: List[Tuple[int, str, str]] = []
+    current, neighbour, state = tts[0].name, "", "idle"
+    try:
+        for tick in range(300):
+            world.step(1 / 30)
+            controls.loop(33)
+            if state == "idle" and current != target:
+                direction, neighbour = router.get_next_direction(current, target)
+                connections[current].send(COMMAND_MAP[Skill.FORWARD_TO][direction])
+                opposite = Dir(((direction.value + 1) % len(Dir)) + 1)
+                command = COMMAND_MAP[Skill.RECEIVE_FROM][opposite]
+                connections[neighbour].send(command)
+                state = "ready"
+            elif state in ("ready", "received") and connections[neighbour].poll():
+                assert connections[neighbour].recv() == 10
+                connections[current].send(20)
+                events.append((tick, state, neighbour))
+                if state == "received":
+                    current, state = neighbour, "idle"
+                else:
+                    state = "received"
+    finally:
+        controls.terminate()
+    return events
+
+
+def test_in_process_equals_process_per_module():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    events = forward_box(ControlMode.IN_PROCESS, target="t_2_3")
+    assert events[-1][1:] == ("received", "t_2_3")
+    assert events == forward_box(ControlMode.PROCESS_PER_MODULE, target="t_2_3")
@@ -0,0 +1,55 @@
+from typing import List
+
+import pytest
+from instances.instance_1.instance_1 import World1
+from simulator.scheduler.scheduler import Scheduler
+from simulator.space.world import World
+
+
+class RecordingController:
+    def __init__(self, world: World) -> None:
+        self.world = world
+        self.passed_ms: List[int] = []
+
+    def loop(self, passed_time_ms: int) -> None:
+        self.passed_ms.append(passed_time_ms)
+
+
+def test_sub_steps_and_controller_time():
+    world = World()
+    controller = RecordingController(world)
+    scheduler = Scheduler(world, [controller], physics_step=1 / 60, sub_steps=2)
+    scheduler.run(duration=1)
+    assert scheduler.ticks == 30
+    assert scheduler.physics_steps == 60
+    assert scheduler.simulated_time == pytest.approx(1)
+    # whole ms, but no drift
+    assert set(controller.passed_ms) == {33, 34}
+    assert sum(controller.passed_ms) in (999, 1000)
+    assert scheduler.get_speed() > 0
+
+
+def test_event_driven_equals_fixed_steps():
+    schedulers = [
+        Scheduler(World1(), physics_step=1 / 30, sub_steps=3),
+        Scheduler(World1(), physics_step=1 / 30, sub_steps=3, event_driven=True),
+    ]
+    boxes = []
+    for scheduler in schedulers:
+        t_1_3 = scheduler.world.modules[0][2]
+        boxes.append(t_1_3.spawn_box())
+        t_1_3.start_move_forward()
+        scheduler.run(duration=1)
+    assert boxes[0].element._parent.name == boxes[1].element._parent.name
+    assert schedulers[1].physics_steps < schedulers[0].physics_steps
+
+
+def test_real_time_factor():
+    scheduler = Scheduler(World(), physics_step=0.01, real_time_factor=10)
+    scheduler.run(duration=0.5)
+    assert scheduler.get_speed() == pytest.approx(10, rel=0.5)
+
+
+def test_invalid_steps():
+    with pytest.raises(ValueError):
+        Scheduler(World(), sub_steps=0)
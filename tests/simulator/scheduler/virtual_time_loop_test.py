@@ -0,0 +1,90 @@
+import asyncio
+import random
+from typing import List, Tuple
+
+import pytest
+
+from instances.instance_1.instance_1 import World1
+from server.module_agent.latency_histogram import merge_histograms
+from server.module_agent.module_agent import Box, ModuleAgent
+from server.routing.router import Router
+from simulator.module_level.module_level import ControlMode, create_controls
+from simulator.scheduler.scheduler import Scheduler
+from simulator.scheduler.virtual_time_loop import VirtualTimeLoop
+
+
+def test_timers_fire_at_simulated_time():
+    loop = VirtualTimeLoop()
+    wake_ups: List[float] = []
+
+    async def sleeper() -> None:
+        for _ in range(3):
+            await asyncio.sleep(0.025)
+            wake_ups.append(loop.time())
+
+    task = loop.create_task(sleeper())
+    loop.loop(33)
+    assert wake_ups == [0.025]
+    loop.advance(0.1)
+    assert wake_ups == pytest.approx([0.025, 0.05, 0.075])
+    assert task.done() and loop.time() == pytest.approx(0.133)
+    with pytest.raises(ValueError):
+        loop.advance(-1)
+    loop.close()
+
+
+def run_agents(
+    duration: float, pipelined: bool = False
+) -> Tuple[List[Tuple[float, str]], List[ModuleAgent]]:
+    # returns all box locations reached by the agents (simulated time, module)
+    random.seed(0)  # (box targets)
+    world = World1()
+    tts = sum(world.modules, [])
+    controls = create_controls(tts, ControlMode.IN_PROCESS)
+    loop = VirtualTimeLoop()
+    router = Router()
+    agents: dict = {}
+    for tt in tts:
+        connection = controls.get_connections()[tt.name]
+        ModuleAgent(tt.name, connection, router, agents, pipelined)
+    locations: List[Tuple[float, str]] = []
+
+    class RecordingBox(Box):
+        def update_location(self, location: str):
+            locations.append((loop.time(), location))
+            super().update_location(location)
+
+    box = RecordingBox("box_1", list(router.mapp.keys()))
+    box.current_target = "t_2_3"
+    agents[tts[0].name].handled_box = box
+    tts[0].spawn_box()
+    loop.create_task(agents[tts[0].name].forward_box_async())
+    # (agents first: confirmations of the last controller tick are seen at its time)
+    scheduler = Scheduler(world, [loop, controls], sub_steps=2)
+    try:
+        scheduler.run(duration)
+    finally:
+        controls.terminate()
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.run_until_idle()
+        loop.close()
+    return locations, list(agents.values())
+
+
+def test_agents_are_deterministic_in_fast_forward():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    locations, agents = run_agents(duration=30)
+    assert len(locations) > 3
+    assert locations == run_agents(duration=30)[0]
+    received = merge_histograms(agent.latencies["received"] for agent in agents)
+    assert received.count() == len(locations)
+
+
+def test_pipelined_handoffs_visit_the_same_modules_faster():
+    pytest.importorskip("module_control.emulation.cffi.cffi_module")  # (generated)
+    serial, _ = run_agents(duration=30)
+    pipelined, _ = run_agents(duration=30, pipelined=True)
+    assert len(pipelined) > len(serial)
+    assert [m for _, m in pipelined[: len(serial)]] == [m for _, m in serial]
+    assert all(p <= s for (p, _), (s, _) in zip(pipelined, serial))
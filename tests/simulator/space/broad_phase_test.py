@@ -0,0 +1,80 @@
+import random
+
+import pytest
+from simulator.space.broad_phase import AllPairs, SpatialHash
+from simulator.space.collidable_element import (
+    CollidableElement,
+    Rectangle,
+    Segment,
+    Tag,
+    TagCombination,
+)
+from simulator.space.collision_checker import check_collisions
+from simulator.space.element import Vector
+from simulator.space.moving_element import MovingElement
+
+
+def create_random_elements(seed: int, count: int) -> MovingElement:
+    rnd = random.Random(seed)
+    origin = MovingElement(name="origin")
+    for i in range(count):
+        position = Vector(rnd.uniform(-50, 50), rnd.uniform(-50, 50))
+        rotation = rnd.uniform(0, 360)
+        CollidableElement(
+            position=position,
+            rotation=rotation,
+            name="segment_" + str(i),
+            parent=origin,
+            shape=Segment(rnd.uniform(0, 10)),
+            tags={Tag.SEGMENT},
+        )
+        CollidableElement(
+            position=Vector(
+                position.x + rnd.uniform(-5, 5), position.y + rnd.uniform(-5, 5)
+            ),
+            rotation=rotation,
+            name="rect_" + str(i),
+            parent=origin,
+            shape=Rectangle(rnd.uniform(0.1, 10), rnd.uniform(0.1, 10)),
+            tags={Tag.SEGMENT_COLLIDABLE, Tag.SHAPE_MOVING_POINTS},
+        )
+        CollidableElement(
+            position=Vector(rnd.uniform(-50, 50), rnd.uniform(-50, 50)),
+            name="point_" + str(i),
+            parent=origin,
+            shape=Rectangle(1, 1),
+            tags={Tag.MOVABLE_POINT},
+        )
+    return origin
+
+
+@pytest.mark.parametrize("tag_combination", list(TagCombination))
+@pytest.mark.parametrize("cell_size", [0.5, 3, 10, 1000])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_spatial_hash_equals_reference(seed, cell_size, tag_combination):
+    elements = create_random_elements(seed, 50).get_all_children_breadth_first()
+    expected = check_collisions(elements, tag_combination)
+    assert len(expected) > 0
+    assert (
+        check_collisions(elements, tag_combination, broad_phase=SpatialHash(cell_size))
+        == expected
+    )
+    assert (
+        check_collisions(elements, tag_combination, broad_phase=AllPairs()) == expected
+    )
+
+
+def test_spatial_hash_candidates_share_cell():
+    origin = MovingElement(name="origin")
+    near_1 = CollidableElement(position=Vector(1, 1), parent=origin)
+    near_2 = CollidableElement(position=Vector(2, 2), parent=origin)
+    far = CollidableElement(position=Vector(25, 25), parent=origin)
+    candidates = SpatialHash(cell_size=10).get_candidate_pairs(
+        [near_1], [near_2, far], lambda _: 0, lambda _: 1
+    )
+    assert set(candidates) == {(near_1, near_2)}
+
+
+def test_spatial_hash_invalid_cell_size():
+    with pytest.raises(ValueError):
+        SpatialHash(cell_size=0)
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+from simulator.space.collidable_element import (
+    CollidableElement,
+    Rectangle,
+    Segment,
+    TagCombination,
+)
+from simulator.space.collision_checker import (
+    check_collision_point_shape,
+    check_collision_segment_shape,
+    check_collisions_batched,
+)
+from simulator.space.collision_kernel import (
+    get_segment_endpoints,
+    segments_hit_rectangles,
+)
+from tests.simulator.space.collision_checker_test import (
+    point_shape_cases,
+    segment_shape_cases,
+)
+from tests.simulator.space.space_test import assert_equal
+
+
+def test_segment_endpoints():
+    starts, ends = get_segment_endpoints(
+        np.array([[0.0, 0.0], [1.0, 1.0]]), np.array([0.0, 90.0]), np.array([1, 2])
+    )
+    assert_equal(starts, [[0, 1], [3, 1]])
+    assert_equal(ends, [[0, -1], [-1, 1]])
+
+
+def test_segments_hit_rectangles_cases():
+    cases = segment_shape_cases + [
+        (point_pos, 0, 0, rect_pos, rect_rot, width, height, expected)
+        for point_pos, rect_pos, rect_rot, width, height, expected in point_shape_cases
+    ]
+    seg_pos, seg_rot, seg_length, rect_pos, rect_rot, width, height, expected = (
+        np.array(column, dtype=float) for column in zip(*cases)
+    )
+    starts, ends = get_segment_endpoints(seg_pos, seg_rot, seg_length / 2)
+    half_extents = np.stack((width / 2, height / 2), axis=-1)
+    hits = segments_hit_rectangles(starts, ends, rect_pos, half_extents, rect_rot)
+    assert list(hits) == list(expected.astype(bool))
+
+
+def test_batched_equals_scalar_checks():
+    rnd = random.Random(0)
+    segment_pairs = []
+    point_pairs = []
+    for i in range(500):
+        rect = CollidableElement(
+            position=(rnd.uniform(-5, 5), rnd.uniform(-5, 5)),
+            rotation=rnd.uniform(0, 360),
+            shape=Rectangle(rnd.uniform(0.1, 5), rnd.uniform(0.1, 5)),
+        )
+        segment = CollidableElement(
+            position=(rnd.uniform(-5, 5), rnd.uniform(-5, 5)),
+            rotation=rnd.uniform(0, 360),
+            shape=Segment(rnd.uniform(0, 5)),
+        )
+        point = CollidableElement(position=(rnd.uniform(-5, 5), rnd.uniform(-5, 5)))
+        segment_pairs.append((segment, rect))
+        point_pairs.append((point, rect))
+
+    expected_segments = {p for p in segment_pairs if check_collision_segment_shape(*p)}
+    expected_points = {p for p in point_pairs if check_collision_point_shape(*p)}
+    assert 0 < len(expected_segments) < len(segment_pairs)
+    assert 0 < len(expected_points) < len(point_pairs)
+    assert (
+        check_collisions_batched(segment_pairs, TagCombination.SEGMENT_AND_SHAPE)
+        == expected_segments
+    )
+    assert (
+        check_collisions_batched(point_pairs, TagCombination.POINT_AND_MOVING_SHAPE)
+        == expected_points
+    )
+
+
+def test_batched_no_pairs():
+    assert check_collisions_batched([], TagCombination.SEGMENT_AND_SHAPE) == set()
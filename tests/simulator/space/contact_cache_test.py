@@ -0,0 +1,50 @@
+from simulator.space.broad_phase import SpatialHash
+from simulator.space.collidable_element import (
+    CollidableElement,
+    Rectangle,
+    Segment,
+    Tag,
+    TagCombination,
+)
+from simulator.space.contact_cache import ContactCache
+from simulator.space.moving_element import MovingElement
+
+
+def test_contact_begin_end():
+    origin = MovingElement(name="origin")
+    segment = CollidableElement(
+        position=(5, 0), parent=origin, shape=Segment(2), tags={Tag.SEGMENT}
+    )
+    rect = CollidableElement(
+        parent=origin, shape=Rectangle(2, 2), tags={Tag.SEGMENT_COLLIDABLE}
+    )
+    cache = ContactCache(TagCombination.SEGMENT_AND_SHAPE, SpatialHash())
+
+    def update():
+        changes = cache.update(origin.get_all_children_breadth_first())
+        for elem in origin.get_all_children_breadth_first():
+            elem._sleeping = True
+        return changes
+
+    changes = update()
+    assert changes.begun == set() and changes.ended == set()
+
+    segment.position = (1, 0)  # moves into rect
+    changes = update()
+    assert changes.begun == {(segment, rect)} and changes.ended == set()
+    assert cache.get_partners(rect) == {segment}
+
+    changes = update()  # nothing changed
+    assert changes.begun == set() and changes.ended == set()
+    assert cache.contacts == {(segment, rect)}
+
+    rect.position = (5, 5)  # moves away
+    changes = update()
+    assert changes.begun == set() and changes.ended == {(segment, rect)}
+    assert not cache.is_in_contact(segment)
+
+    rect.position = (0, 0)
+    update()
+    origin.detach(rect)  # not part of the tree anymore
+    changes = update()
+    assert changes.ended == {(segment, rect)}
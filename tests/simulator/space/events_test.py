@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from instances.instance_1.instance_1 import World1
+from simulator.space.events import get_contact_intervals
+from tests.simulator.space.space_test import assert_equal
+
+
+def test_contact_intervals():
+    t_begin, t_end = get_contact_intervals(
+        np.array([[-5.0, 0.0], [0.0, 0.0], [0.0, 5.0], [0.0, 0.0]]),
+        np.array([0.0, 90.0, 0.0, 0.0]),
+        np.array([0.0, 1.0, 0.0, 0.0]),  # points, segment
+        np.zeros((4, 2)),
+        np.array([0.0, 0.0, 0.0, 90.0]),
+        np.array([[1.0, 1.0], [1.0, 1.0], [1.0, 1.0], [2.0, 1.0]]),
+        np.array([[2.0, 0.0], [-1.0, 0.0], [1.0, 0.0], [0.0, 1.0]]),
+    )
+    assert_equal(t_begin[0], 2)  # point from the left
+    assert_equal(t_end[0], 3)
+    assert_equal(t_begin[1], -2)  # horizontal segment, currently inside
+    assert_equal(t_end[1], 2)
+    assert t_begin[2] > t_end[2]  # passing by
+    assert_equal(t_end[3], 2)  # rotated rect (long side along y)
+
+
+def test_step_to_next_event_box_handover():
+    world = World1()
+    t_1_3, t_2_3 = world.modules[0][2], world.modules[1][0]
+    box = t_1_3.spawn_box()
+    world.step(0)
+    assert t_1_3.is_light_barrier_active_sensor()
+    t_1_3.start_move_forward()  # speed 20
+
+    # box leaves light barrier (box width 5)
+    assert world.step_to_next_event(max_time=10) == pytest.approx(0.125, abs=1e-5)
+    assert not t_1_3.is_light_barrier_active_sensor()
+    # box center reaches next module
+    assert world.step_to_next_event(max_time=10) == pytest.approx(0.125, abs=1e-5)
+    assert box.element._parent is t_2_3.belt.belt
+    # (nothing observable happens anymore)
+    assert world.step_to_next_event(max_time=10) == 10
+
+    t_2_3.start_move_forward()
+    assert world.step_to_next_event(max_time=10) == pytest.approx(0.125, abs=1e-5)
+    assert t_2_3.is_light_barrier_active_sensor()
+    assert box.element.get_global_coordinates()[0] == pytest.approx(
+        (17.5, 30), abs=1e-3
+    )
+
+
+def test_step_to_next_event_rotation():
+    world = World1()
+    t_1_1 = world.modules[0][0]
+    t_1_1.turn_clockwise()  # 90 deg/s
+    assert world.step_to_next_event(max_time=10) == pytest.approx(1, abs=1e-5)
+    assert t_1_1.is_fully_turned_sensor()
+
+
+def test_step_to_next_event_fixed_step_for_rotating_pairs():
+    world = World1()
+    t_1_1 = world.modules[0][0]
+    t_1_1.spawn_box()
+    t_1_1.start_move_forward()
+    t_1_1.turn_clockwise()  # box moving on a rotating table
+    assert world.step_to_next_event(max_time=10, fixed_step=0.1) == pytest.approx(0.1)
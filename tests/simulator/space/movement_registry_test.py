@@ -0,0 +1,45 @@
+from simulator.space.movements import ChildElementTranslation, Rotation, Translation
+from simulator.space.moving_element import MovingElement
+from simulator.space.world import World
+from tests.simulator.space.space_test import assert_equal
+
+
+def test_registry_follows_start_end_attach_detach():
+    world = World()
+    e1 = MovingElement(parent=world.origin)
+    e2 = MovingElement(parent=e1)
+    rotation = Rotation(10)
+    e2.start_movement(rotation)
+    assert len(world.movements) == 1
+    assert world.movements.get_elements() == [e2]
+
+    other = MovingElement()
+    other.attach(e1)  # moves out of the world
+    assert len(world.movements) == 0
+    world.origin.attach(e1)
+    assert len(world.movements) == 1
+
+    e2.end_movement(rotation)
+    assert len(world.movements) == 0
+
+
+def test_registry_batched_translations():
+    for transform_store in False, True:
+        world = World(transform_store=transform_store)
+        belt = MovingElement(parent=world.origin, rotation=90)
+        children = [MovingElement(position=(i, 0), parent=belt) for i in range(3)]
+        belt.start_movement(ChildElementTranslation((1, 0)))
+        children[0].start_movement(Translation((0, 2)))
+        world.step(time=2)
+        assert_equal(children[0].position, (2, 4))
+        assert_equal(children[2].position, (4, 0))
+        assert_equal(children[2].get_global_coordinates()[0], (0, -4))
+        assert world.counters.stepped_elements == 2
+
+
+def test_step_without_world():
+    root = MovingElement()
+    child = MovingElement(parent=root)
+    root.start_movement(ChildElementTranslation((1, 0)))
+    assert root.step(time=1) == 1
+    assert_equal(child.position, (1, 0))
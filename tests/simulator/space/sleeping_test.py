@@ -0,0 +1,68 @@
+from instances.instance_1.instance_1 import World1
+from simulator.space.movements import ChildElementTranslation
+from simulator.space.moving_element import MovingElement
+from simulator.space.world import World
+
+
+def get_state(world: World1):
+    return {
+        e.name: (
+            e._parent.name if e._parent is not None else None,
+            getattr(e, "is_colliding", None),
+        )
+        for e in world.get_elements_breadth_first()
+    }
+
+
+def test_sleeping_equals_reference():
+    worlds = [World1(cell_size=None), World1(), World1(transform_store=True)]
+    for world in worlds:
+        world.modules[0][2].spawn_box()  # t_1_3 -> t_2_3
+        world.modules[0][2].start_move_forward()
+        world.modules[5][0].spawn_box()
+        world.modules[5][0].turn_clockwise()
+    for i in range(90):
+        if i == 45:
+            for world in worlds:
+                world.modules[5][0].start_move_forward()  # rotated: downwards
+                world.modules[1][0].start_move_backward()  # t_2_3 -> t_1_3
+        for world in worlds:
+            world.step(1 / 30)
+        reference_state = get_state(worlds[0])
+        for world in worlds[1:]:
+            assert get_state(world) == reference_state
+
+
+def test_step_counters():
+    world = World1()
+    world.step(1 / 30)
+    element_count = len(world.get_elements_breadth_first())
+    assert world.counters.stepped_elements == 0
+    assert world.counters.skipped_elements == element_count
+    assert world.counters.awake_collidables > 0  # (first check)
+
+    world.step(1 / 30)
+    assert world.counters.awake_collidables == 0
+    assert world.counters.sleeping_collidables > 0
+
+    world.modules[0][0].turn_clockwise()  # wakes one module
+    world.step(1 / 30)
+    assert 0 < world.counters.stepped_elements < element_count
+    assert 0 < world.counters.awake_collidables < world.counters.sleeping_collidables
+
+
+def test_subtree_movement_count():
+    world = World()
+    e1 = MovingElement(parent=world.origin)
+    e2 = MovingElement(parent=e1)
+    e3 = MovingElement()
+    movement = ChildElementTranslation((1, 0))
+    e2.start_movement(movement)
+    assert world.origin._subtree_movement_count == 1
+    e3.attach(e2)
+    assert world.origin._subtree_movement_count == 0
+    assert e3._subtree_movement_count == 1
+    e1.attach(e2)
+    assert world.origin._subtree_movement_count == 1
+    e2.end_movement(movement)
+    assert world.origin._subtree_movement_count == 0
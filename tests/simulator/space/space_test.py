@@ -1,4 +1,6 @@
-from typing import Any
+import random
+from collections import deque
+from typing import Any, List
 
 import pytest
 from numpy import testing as npt
@@ -35,3 +37,84 @@ def test_global_coords_3_elements(
     e3_pos_gl, e3_rot_gl = e3.get_global_coordinates()  # cached
     assert_equal(e3_pos_gl, xy2arr(pos_exp))
     assert_equal(e3_rot_gl, rot_exp)
+
+
+@pytest.mark.parametrize(
+    ("pos_1, rot_1, pos_2, rot_2"),
+    [
+        ((0, 0), 0, (0, 0), 0),
+        ((1, 1), 90, (0, 1), 90),
+        ((2, 2), 45, (1, -1), 180.5),
+    ],
+)
+def test_global_xy_rot_equals_global_coords(pos_1, rot_1, pos_2, rot_2):
+    origin = Element(name="origin")
+    e1 = Element(parent=origin, position=pos_1, rotation=rot_1)
+    e2 = Element(parent=e1, position=pos_2, rotation=rot_2)
+    e2.get_global_xy_rot()  # cached
+
+    e1.position = e1.position + xy2arr((1, 0))
+    e1.rotation = e1.rotation + 10
+
+    x, y, rot = e2.get_global_xy_rot()
+    pos_gl, rot_gl = e2.get_global_coordinates()
+    assert isinstance(x, float) and isinstance(y, float)
+    assert_equal((x, y), pos_gl)
+    assert_equal(rot, rot_gl)
+
+
+def get_breadth_first(element: Element[Any]) -> List[Element[Any]]:
+    result = []
+    to_be_visited = deque(element._children)
+    while len(to_be_visited) > 0:
+        visited = to_be_visited.popleft()
+        to_be_visited.extend(visited._children)
+        result.append(visited)
+    return result
+
+
+def get_depth(element: Element[Any]) -> int:
+    return 0 if element._parent is None else get_depth(element._parent) + 1
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_children_index_after_attach_detach(seed):
+    rng = random.Random(seed)
+    origin = Element(name="origin")
+    origin.get_all_children_breadth_first()  # index is built
+    elements = [origin]
+    for i in range(30):
+        elements.append(Element(parent=rng.choice(elements), name=str(i)))
+    outside = Element(name="outside")
+    for _ in range(50):
+        child = rng.choice(elements[1:] + [outside])
+        parent = rng.choice(elements + [outside])
+        if parent is child or parent in child.get_all_children_breadth_first():
+            continue  # no cycles
+        if rng.random() < 0.2 and child._parent is not None:
+            child._parent.detach(child)
+        else:
+            parent.attach(child)
+
+        for root in (origin, outside):
+            view = root.get_all_children_breadth_first()
+            expected = get_breadth_first(root)
+            assert len(view) == len(expected)
+            assert set(view) == set(expected)
+            depths = [get_depth(e) for e in view]
+            assert depths == sorted(depths)  # parents before children
+            assert list(view) == [view[i] for i in range(len(view))]
+
+
+def test_children_view_is_read_only():
+    origin = Element(name="origin")
+    e1 = Element(parent=origin)
+    view = origin.get_all_children_breadth_first()
+    assert view == [e1]
+    assert not hasattr(view, "append")
+    e2 = Element(parent=e1)
+    assert view == [e1, e2]  # live
+    assert view[-1] is e2 and view[:1] == [e1]
+    e1.detach(e2)
+    assert e2 not in view
+    assert view[-1] is e1 and len(view) == 1  # (flat list of the indexing rebuilt)
@@ -0,0 +1,72 @@
+from instances.instance_1.instance_1 import World1
+from simulator.space.collidable_element import (
+    CollidableElement,
+    Rectangle,
+    Tag,
+    TagCombination,
+)
+from simulator.space.collision_checker import get_tagged_elements
+from simulator.space.moving_element import MovingElement
+from simulator.space.world import World
+
+
+def test_registry_follows_create_attach_detach():
+    world = World()
+    e1 = MovingElement(parent=world.origin)
+    outline = CollidableElement(parent=e1, shape=Rectangle(1, 1))
+    point = CollidableElement(parent=e1, tags={Tag.MOVABLE_POINT})
+    assert world.tagged.get_all() == [point]
+    assert outline not in world.tagged.get_all()
+
+    other = MovingElement()
+    other.attach(e1)  # moves out of the world (with all children)
+    assert world.tagged.get_all() == []
+    world.origin.attach(e1)
+    assert world.tagged.get_elements(Tag.MOVABLE_POINT) == [point]
+
+
+def test_registry_follows_tag_changes():
+    world = World()
+    elem = CollidableElement(parent=world.origin, tags={Tag.SEGMENT})
+    world.step(1)
+    assert elem._sleeping
+
+    elem.add_tag(Tag.SEGMENT_COLLIDABLE)
+    assert not elem._sleeping  # checked again
+    assert world.tagged.get_elements(Tag.SEGMENT_COLLIDABLE) == [elem]
+    elem.remove_tag(Tag.SEGMENT)
+    assert world.tagged.get_elements(Tag.SEGMENT) == []
+    assert elem.tags == {Tag.SEGMENT_COLLIDABLE}
+
+
+def assert_registry_equals_tree_scan(world: World) -> None:
+    elements = world.origin.get_all_children_breadth_first()
+    for tag in Tag:
+        assert set(world.tagged.get_elements(tag)) == {
+            e for e in elements if isinstance(e, CollidableElement) and tag in e.tags
+        }
+    for tag_combination in TagCombination:
+        assert get_tagged_elements(world.tagged, tag_combination) == (
+            get_tagged_elements(elements, tag_combination)
+        )
+
+
+def test_registry_equals_tree_scan():
+    world = World1()
+    t_1_3, t_2_3, t_6_1 = world.modules[0][2], world.modules[1][0], world.modules[5][0]
+    boxes = [t_1_3.spawn_box(), t_6_1.spawn_box()]
+    assert_registry_equals_tree_scan(world)
+    t_1_3.start_move_forward()  # t_1_3 -> t_2_3 -> t_3_3
+    t_2_3.start_move_forward()
+    t_6_1.turn_clockwise()
+    for i in range(90):
+        if i == 20:
+            boxes.append(t_1_3.spawn_box())
+        if i == 45:
+            t_6_1.start_move_forward()  # rotated: downwards, out of the plant
+        world.step(1 / 30)
+        assert_registry_equals_tree_scan(world)
+    t_3_3 = world.modules[2][2]
+    assert boxes[0].element._parent is t_3_3.belt.belt  # (handed over twice)
+    assert boxes[2].element._parent is t_3_3.belt.belt
+    assert boxes[1].element._parent is None
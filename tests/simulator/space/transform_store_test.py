@@ -0,0 +1,110 @@
+import random
+from typing import List
+
+from instances.instance_1.instance_1 import World1
+from simulator.space.element import Element, Vector
+from simulator.space.moving_element import MovingElement
+from simulator.space.world import World
+from tests.simulator.space.space_test import assert_equal
+
+
+def create_random_tree(world: World, seed: int, count: int) -> List[MovingElement]:
+    rnd = random.Random(seed)
+    elements = [world.origin]
+    for i in range(count):
+        elements.append(
+            MovingElement(
+                position=Vector(rnd.uniform(-5, 5), rnd.uniform(-5, 5)),
+                rotation=rnd.uniform(0, 360),
+                name="e_" + str(i),
+                parent=rnd.choice(elements),
+            )
+        )
+    return elements
+
+
+def assert_same_global_coordinates(
+    elements_1: List[Element], elements_2: List[Element]
+) -> None:
+    for e1, e2 in zip(elements_1, elements_2):
+        pos_1, rot_1 = e1.get_global_coordinates()
+        pos_2, rot_2 = e2.get_global_coordinates()
+        assert_equal(pos_2, pos_1)
+        assert_equal(rot_2, rot_1)
+
+
+def test_store_equals_element_coordinates():
+    world_1 = World()
+    world_2 = World(transform_store=True)
+    elements_1 = create_random_tree(world_1, 0, 200)  # > initial store capacity
+    elements_2 = create_random_tree(world_2, 0, 200)
+    assert all(e._store is world_2.transform_store for e in elements_2)
+    assert_same_global_coordinates(elements_1, elements_2)
+
+    rnd = random.Random(1)
+    for _ in range(100):
+        i = rnd.randrange(1, len(elements_1))
+        action = rnd.randrange(3)
+        if action == 0:
+            position = (rnd.uniform(-5, 5), rnd.uniform(-5, 5))
+            elements_1[i].position = position
+            elements_2[i].position = position
+        elif action == 1:
+            elements_1[i].rotation += 33
+            elements_2[i].rotation += 33
+        else:  # re-attach to a parent which is not a (grand-) child
+            j = rnd.randrange(len(elements_1))
+            if elements_1[j] in elements_1[i].get_all_children_breadth_first():
+                continue
+            elements_1[j].attach(elements_1[i])
+            elements_2[j].attach(elements_2[i])
+        assert_same_global_coordinates(elements_1, elements_2)
+
+
+def test_position_is_store_view():
+    world = World(transform_store=True)
+    e1 = MovingElement(position=(1, 1), parent=world.origin)
+    e2 = MovingElement(position=(1, 0), parent=e1)
+    e1.position += (1, 0)
+    assert_equal(world.transform_store.local_positions[e1._store_id], (2, 1))
+    assert_equal(e2.get_global_coordinates()[0], (3, 1))
+
+
+def test_detach_into_other_tree():
+    world = World(transform_store=True)
+    e1 = MovingElement(position=(1, 1), parent=world.origin)
+    e2 = MovingElement(position=(1, 0), parent=e1)
+    other = MovingElement(position=(5, 5), rotation=90)
+    other.attach(e1)  # leaves the store
+    assert e1._store is None and e2._store is None
+    assert_equal(e2.get_global_coordinates()[0], (2, 1))
+    world.origin.attach(e1)  # back again
+    assert e2._store is world.transform_store
+    assert_equal(e2.get_global_coordinates()[0], (2, 1))
+
+
+def get_name(element: Element) -> str:
+    return element.name
+
+
+def test_world_1_modules_with_store():
+    worlds = [World1(), World1(transform_store=True)]
+    boxes = []
+    for world in worlds:
+        boxes.append(world.modules[0][2].spawn_box())  # t_1_3 -> t_2_3
+        world.modules[0][2].start_move_forward()
+        world.modules[2][0].turn_clockwise()
+    for _ in range(60):
+        for world in worlds:
+            world.step(1 / 30)
+        # (order of siblings is not defined)
+        elements_1 = sorted(worlds[0].get_elements_breadth_first(), key=get_name)
+        elements_2 = sorted(worlds[1].get_elements_breadth_first(), key=get_name)
+        assert [e.name for e in elements_1] == [e.name for e in elements_2]
+        assert_same_global_coordinates(elements_1, elements_2)
+        assert [getattr(e, "is_colliding", None) for e in elements_1] == [
+            getattr(e, "is_colliding", None) for e in elements_2
+        ]
+    # box handed over to the next module in both worlds
+    for world, box in zip(worlds, boxes):
+        assert box.element._parent is world.modules[1][0].belt.belt